@@ -0,0 +1,307 @@
+"""Host de conversas do agente: várias sessões no mesmo event loop
+
+O servidor MCP, o AIService e o contexto do catálogo são compartilhados;
+cada sessão tem apenas o próprio histórico. Os front-ends (terminal, web)
+abrem sessões e repassam as mensagens para handle_message.
+"""
+
+import asyncio
+import time
+import uuid
+from typing import Dict, Any, List, Optional, Callable
+from infra.config.settings import settings
+from infra.config.prompts import Prompts
+from services.ai_service import AIService
+from services.response_service import ResponseService
+from services.intent_service import IntentService
+from infra.shared.text_utils import sanitize_text
+from infra.shared.conversation_memory import ConversationMemory
+from infra.shared.formatters import format_price_range
+from presentation.mcp import CarMCPServer, CarMCPClient, MCPConnectionPool
+
+
+class ConversationSession:
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.conversation_history = ConversationMemory()
+        # Ids da última lista exibida, na ordem mostrada: "carro 3" vira busca direta pelo id
+        self.last_shown_ids: List[int] = []
+        self.last_active = time.monotonic()
+        # Mensagens da mesma sessão são processadas em ordem
+        self.lock = asyncio.Lock()
+
+    def touch(self):
+        self.last_active = time.monotonic()
+
+
+class AgentHost:
+    def __init__(self, server=None, ai_service: Optional[AIService] = None):
+        # Serviços compartilhados entre todas as sessões
+        if server is None:
+            if settings.MCP_SERVER_URL:
+                # Servidor de catálogo em outro processo, compartilhado entre agentes
+                server = MCPConnectionPool(settings.MCP_SERVER_URL, size=settings.MCP_POOL_SIZE)
+            else:
+                server = CarMCPServer()
+        self.server = server
+        self.client = CarMCPClient(self.server)
+        self.ai_service = ai_service or AIService()
+        self.response_service = ResponseService(self.ai_service)
+        self.intent_service = IntentService()
+
+        self.car_database_context = None
+        self.sessions: Dict[str, ConversationSession] = {}
+
+    async def start(self):
+        await self.server.start()
+        await self._load_database_context()
+
+    async def stop(self):
+        self.sessions.clear()
+        await self.server.stop()
+
+    def open_session(self, session_id: Optional[str] = None) -> ConversationSession:
+        self._expire_sessions()
+        if session_id is not None and session_id in self.sessions:
+            # Substituir perderia o histórico e o lock de quem ainda usa a sessão
+            raise ValueError(f"Sessão já existe: {session_id}")
+        if len(self.sessions) >= settings.AGENT_MAX_SESSIONS:
+            raise RuntimeError("Limite de sessões simultâneas atingido")
+
+        session = ConversationSession(session_id or uuid.uuid4().hex)
+        self.sessions[session.session_id] = session
+        return session
+
+    def get_session(self, session_id: str) -> ConversationSession:
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise KeyError(f"Sessão não encontrada: {session_id}")
+        return session
+
+    def close_session(self, session_id: str):
+        self.sessions.pop(session_id, None)
+
+    def _expire_sessions(self):
+        limit = time.monotonic() - settings.AGENT_SESSION_TTL
+        for session_id in [sid for sid, session in self.sessions.items() if session.last_active < limit]:
+            del self.sessions[session_id]
+
+    async def _load_database_context(self):
+        try:
+            try:
+                context = await self.client.get_catalog_context()
+                stats, brands = context["statistics"], context["brands"]
+                price_range, year_range = context["price_range"], context["year_range"]
+            except Exception:
+                # Servidor sem o método agregado: as quatro chamadas em paralelo
+                stats, brands, price_range, year_range = await asyncio.gather(
+                    self.client.get_car_statistics(),
+                    self.client.get_available_brands(),
+                    self.client.get_price_range(),
+                    self.client.get_year_range()
+                )
+
+            self.car_database_context = {
+                "total_cars": stats["total_carros"],
+                "brands": brands["marcas"],
+                "price_range": price_range,
+                "year_range": year_range,
+                "brand_distribution": stats["por_marca"],
+                "formatted_price_range": format_price_range(price_range)
+            }
+
+        except Exception as e:
+            if settings.DEBUG:
+                print(f"Debug: Erro ao carregar contexto: {e}")
+
+            self.car_database_context = {
+                "total_cars": 0,
+                "brands": [],
+                "price_range": {"min": 0, "max": 0, "media": 0},
+                "year_range": {"min": 0, "max": 0},
+                "brand_distribution": {},
+                "formatted_price_range": "Não disponível"
+            }
+
+    async def greet(self, session: ConversationSession, on_token: Optional[Callable[[str], None]] = None) -> str:
+        session.touch()
+        return await self.ai_service.generate_response(
+            Prompts.GREETING,
+            session.conversation_history,
+            self.car_database_context,
+            on_token=on_token
+        )
+
+    async def farewell(self, session: ConversationSession, on_token: Optional[Callable[[str], None]] = None) -> str:
+        session.touch()
+        return await self.ai_service.generate_response(
+            Prompts.FAREWELL,
+            session.conversation_history,
+            self.car_database_context,
+            on_token=on_token
+        )
+
+    async def handle_message(self, session_id: str, user_input: str,
+                             on_token: Optional[Callable[[str], None]] = None) -> str:
+        session = self.get_session(session_id)
+        async with session.lock:
+            session.touch()
+            return await self.process_user_input(session, sanitize_text(user_input), on_token=on_token)
+
+    async def process_user_input(self, session: ConversationSession, user_input: str,
+                                 on_token: Optional[Callable[[str], None]] = None) -> str:
+        conversation_history = session.conversation_history
+        try:
+            # Adicionar à história
+            conversation_history.append({"role": "user", "content": user_input})
+
+            # Debug: mostrar entrada do usuário
+            if settings.DEBUG:
+                print(f"\nDEBUG - Entrada do usuário: {user_input}")
+
+            # Processar intenção do usuário
+            intent_info = self.intent_service.process_user_intent(
+                user_input,
+                self.car_database_context.get("brands", [])
+            )
+
+            # Verificar se está pedindo métricas dos carros
+            if intent_info['is_metrics_request']:
+                try:
+                    metrics_data = await self.client.get_car_metrics()
+                    response = self.intent_service.generate_metrics_response(metrics_data)
+
+                    conversation_history.append({"role": "assistant", "content": response})
+                    return response
+
+                except Exception as e:
+                    if settings.DEBUG:
+                        print(f"DEBUG - Erro ao obter métricas: {e}")
+                    return "Desculpe, não consegui obter as métricas dos carros no momento."
+
+            # Referência a um carro já exibido: sem LLM para filtros e sem refazer a busca
+            reference = self.intent_service.resolve_car_reference(user_input, session.last_shown_ids)
+            if reference is not None:
+                search_results = await self._lookup_shown_car(*reference)
+                if search_results is not None:
+                    response = await self.response_service.generate_search_response(
+                        user_input,
+                        search_results,
+                        conversation_history,
+                        self.car_database_context,
+                        on_token=on_token
+                    )
+                    response = sanitize_text(response)
+                    conversation_history.append({"role": "assistant", "content": response})
+                    return response
+
+            # Analisar intenção localmente e, se não houver confiança, com IA
+            analysis_start = time.perf_counter()
+            filters = None
+            local_analysis = self.intent_service.parse_local_query(
+                user_input,
+                self.car_database_context.get("brands", [])
+            )
+            use_local = local_analysis["intent"]["confidence"] >= settings.LOCAL_PARSER_THRESHOLD
+            if use_local:
+                intent, filters = local_analysis["intent"], local_analysis["filters"]
+            elif settings.COMBINED_INTENT_EXTRACTION:
+                analysis = await self.ai_service.analyze_intent_and_filters(
+                    user_input,
+                    self.car_database_context.get("brands", [])
+                )
+                intent, filters = analysis["intent"], analysis["filters"]
+            else:
+                intent = await self.ai_service.analyze_intent(user_input)
+
+            if settings.DEBUG:
+                print(f"DEBUG - Intent detectado: {intent}")
+                print(f"DEBUG - Intent info processado: {intent_info}")
+
+            if intent["needs_search"]:
+                # Extrair filtros e buscar
+                if filters is None:
+                    filters = await self.ai_service.extract_filters(
+                        user_input,
+                        self.car_database_context.get("brands", [])
+                    )
+
+                if settings.DEBUG:
+                    if use_local:
+                        mode = "local"
+                    else:
+                        mode = "combinada" if settings.COMBINED_INTENT_EXTRACTION else "separada"
+                    elapsed_ms = (time.perf_counter() - analysis_start) * 1000
+                    print(f"DEBUG - Análise {mode} em {elapsed_ms:.0f} ms")
+
+                # Aplicar informações de intenção aos filtros
+                if intent_info['detected_color']:
+                    filters['cor'] = intent_info['detected_color']
+
+                if intent_info['wants_details']:
+                    filters['detailed_info'] = True
+                    filters['specific_request'] = True
+
+                if intent_info['specific_car_request']:
+                    filters.update(intent_info['specific_car_request'])
+
+                if settings.DEBUG:
+                    print(f"DEBUG - Filtros extraídos: {filters}")
+
+                search_results = await self._search_cars(filters)
+
+                if settings.DEBUG:
+                    print(f"DEBUG - Resultados da busca: {search_results['total_encontrados']} carros encontrados")
+
+                response = await self.response_service.generate_search_response(
+                    user_input,
+                    search_results,
+                    conversation_history,
+                    self.car_database_context,
+                    on_token=on_token
+                )
+                # Só os carros que entraram numerados no prompt: detalhados e orçamento de tokens mostram menos
+                if search_results.get("ids_exibidos"):
+                    session.last_shown_ids = search_results["ids_exibidos"]
+            else:
+                # Resposta conversacional
+                response = await self.ai_service.generate_response(
+                    user_input,
+                    conversation_history,
+                    self.car_database_context,
+                    on_token=on_token
+                )
+
+            response = sanitize_text(response)
+            conversation_history.append({"role": "assistant", "content": response})
+
+            return response
+
+        except Exception as e:
+            error_msg = sanitize_text(str(e))
+            if settings.DEBUG:
+                print(f"DEBUG - Erro no processamento: {error_msg}")
+            return f"Desculpe, tive um problema técnico. Pode repetir sua pergunta? (Erro: {error_msg})"
+
+    async def _lookup_shown_car(self, position: int, car_id: int) -> Optional[Dict[str, Any]]:
+        """Carro da última lista pelo id; None se ele não existe mais"""
+        try:
+            result = await self.client.get_cars_by_ids([car_id])
+        except Exception as e:
+            if settings.DEBUG:
+                print(f"Debug - Lookup error: {e}")
+            return None
+        if not result["carros"]:
+            return None
+        return {"total_encontrados": 1, "carros": result["carros"], "posicoes": [position]}
+
+    async def _search_cars(self, filters: Dict[str, Any]) -> Dict[str, Any]:
+        """Busca carros com filtros"""
+        try:
+            if not filters:
+                return {"total_encontrados": 0, "carros": []}
+            return await self.client.search_cars(filters)
+        except Exception as e:
+            if settings.DEBUG:
+                print(f"Debug - Search error: {e}")
+            return {"total_encontrados": 0, "carros": []}
@@ -1,35 +1,33 @@
 import asyncio
-import json
-from typing import Dict, Any, List, Optional
+import time
+from typing import Optional, Callable
 from infra.config.settings import settings
-from infra.config.prompts import Prompts
 from infra.config.keywords import IntentKeywords
-from services.ai_service import AIService
-from services.response_service import ResponseService
-from services.intent_service import IntentService
 from infra.shared.text_utils import sanitize_text
-from infra.shared.formatters import format_price_range
-from presentation.mcp import CarMCPServer, CarMCPClient
+from agent_host import AgentHost
 
+# Front-end de terminal: uma sessão do AgentHost
 class AIVirtualCarAgent:
     def __init__(self):
         settings.validate()
         
-        # Serviços
-        self.server = CarMCPServer()
-        self.client = CarMCPClient(self.server)
-        self.ai_service = AIService()
-        self.response_service = ResponseService(self.ai_service)
-        self.intent_service = IntentService()
-        
-        # Estado
-        self.conversation_history = []
-        self.car_database_context = None
+        self.host = AgentHost()
+        self.session = self.host.open_session("terminal")
+        self._start_time = None
+        self.startup_time_ms = None
+    
+    @property
+    def conversation_history(self):
+        return self.session.conversation_history
+    
+    @property
+    def car_database_context(self):
+        return self.host.car_database_context
 
     #agente virtual 
     async def start(self):
-        await self.server.start()
-        await self._load_database_context()
+        self._start_time = time.perf_counter()
+        await self.host.start()
         
         print("\n" + "~"*60)
         print(f"{settings.APP_NAME} - Usada a API do OpenAI")
@@ -40,62 +38,36 @@ class AIVirtualCarAgent:
         
         await self._start_conversation()
         
-    async def _load_database_context(self):
-        try:
-            stats = await self.client.get_car_statistics()
-            brands = await self.client.get_available_brands()
-            price_range = await self.client.get_price_range()
-            year_range = await self.client.get_year_range()
-            
-            self.car_database_context = {
-                "total_cars": stats["total_carros"],
-                "brands": brands["marcas"],
-                "price_range": price_range,
-                "year_range": year_range,
-                "brand_distribution": stats["por_marca"],
-                "formatted_price_range": format_price_range(price_range)
-            }
-            
-        except Exception as e:
-            if settings.DEBUG:
-                print(f"Debug: Erro ao carregar contexto: {e}")
-            
-            self.car_database_context = {
-                "total_cars": 0,
-                "brands": [],
-                "price_range": {"min": 0, "max": 0, "media": 0},
-                "year_range": {"min": 0, "max": 0},
-                "brand_distribution": {},
-                "formatted_price_range": "Não disponível"
-            }
     #inicio da conversa        
     async def _start_conversation(self):
-        initial_response = await self.ai_service.generate_response(
-            Prompts.GREETING, 
-            self.conversation_history, 
-            self.car_database_context
-        )
-        print(f"Assistente: {initial_response}")
+        on_token, streamed = self._stream_printer("Assistente: ")
+        initial_response = await self.host.greet(self.session, on_token=on_token)
+        self._print_response("Assistente: ", initial_response, streamed())
+        
+        # Tempo de inicialização até o primeiro prompt
+        if self._start_time is not None:
+            self.startup_time_ms = (time.perf_counter() - self._start_time) * 1000
+            if settings.DEBUG:
+                print(f"DEBUG - Pronto para o primeiro prompt em {self.startup_time_ms:.0f} ms")
         
         while True:
             try:
-                user_input = input("\nVocê: ").strip()
+                # input() em uma thread para não bloquear o event loop
+                user_input = (await asyncio.to_thread(input, "\nVocê: ")).strip()
                 user_input = sanitize_text(user_input)
                 
                 # Usar configuração centralizada para verificar saída
                 if IntentKeywords.check_exit_intent(user_input):
-                    farewell = await self.ai_service.generate_response(
-                        Prompts.FAREWELL, 
-                        self.conversation_history, 
-                        self.car_database_context
-                    )
-                    print(f"\nAssistente: {farewell}")
+                    on_token, streamed = self._stream_printer("\nAssistente: ")
+                    farewell = await self.host.farewell(self.session, on_token=on_token)
+                    self._print_response("\nAssistente: ", farewell, streamed())
                     break
-                    
-                response = await self._process_user_input(user_input)
-                print(f"\nAssistente: {response}")
                 
-            except KeyboardInterrupt:
+                on_token, streamed = self._stream_printer("\nAssistente: ")
+                response = await self._process_user_input(user_input, on_token=on_token)
+                self._print_response("\nAssistente: ", response, streamed())
+                
+            except (KeyboardInterrupt, EOFError):
                 print("\n\nAté logo!")
                 break
             except Exception as e:
@@ -105,105 +77,31 @@ class AIVirtualCarAgent:
                 else:
                     print(f"\nErro: {error_msg}")
                 
-        await self.server.stop()
+        await self.host.stop()
+    
+    def _stream_printer(self, prefix: str):
+        """Cria o callback que imprime tokens no terminal conforme chegam"""
+        if not settings.STREAM_RESPONSES:
+            return None, lambda: False
         
-    async def _process_user_input(self, user_input: str) -> str:
-        try:
-            # Adicionar à história
-            self.conversation_history.append({"role": "user", "content": user_input})
-            
-            # Debug: mostrar entrada do usuário
-            if settings.DEBUG:
-                print(f"\nDEBUG - Entrada do usuário: {user_input}")
-            
-            # Processar intenção do usuário
-            intent_info = self.intent_service.process_user_intent(
-                user_input, 
-                self.car_database_context.get("brands", [])
-            )
-            
-            # Verificar se está pedindo métricas dos carros
-            if intent_info['is_metrics_request']:
-                try:
-                    metrics_data = await self.client.get_car_metrics()
-                    response = self.intent_service.generate_metrics_response(metrics_data)
-                    
-                    self.conversation_history.append({"role": "assistant", "content": response})
-                    return response
-                    
-                except Exception as e:
-                    if settings.DEBUG:
-                        print(f"DEBUG - Erro ao obter métricas: {e}")
-                    return "Desculpe, não consegui obter as métricas dos carros no momento."
-            
-            # Analisar intenção com IA
-            intent = await self.ai_service.analyze_intent(user_input)
-            
-            if settings.DEBUG:
-                print(f"DEBUG - Intent detectado: {intent}")
-                print(f"DEBUG - Intent info processado: {intent_info}")
-            
-            if intent["needs_search"]:
-                # Extrair filtros e buscar
-                filters = await self.ai_service.extract_filters(
-                    user_input, 
-                    self.car_database_context.get("brands", [])
-                )
-                
-                # Aplicar informações de intenção aos filtros
-                if intent_info['detected_color']:
-                    filters['cor'] = intent_info['detected_color']
-                
-                if intent_info['wants_details']:
-                    filters['detailed_info'] = True
-                    filters['specific_request'] = True
-                
-                if intent_info['specific_car_request']:
-                    filters.update(intent_info['specific_car_request'])
-                
-                if settings.DEBUG:
-                    print(f"DEBUG - Filtros extraídos: {filters}")
-                
-                search_results = await self._search_cars(filters)
-                
-                if settings.DEBUG:
-                    print(f"DEBUG - Resultados da busca: {search_results['total_encontrados']} carros encontrados")
-                
-                response = await self.response_service.generate_search_response(
-                    user_input, 
-                    search_results, 
-                    self.conversation_history, 
-                    self.car_database_context
-                )
-            else:
-                # Resposta conversacional
-                response = await self.ai_service.generate_response(
-                    user_input, 
-                    self.conversation_history, 
-                    self.car_database_context
-                )
-                
-            response = sanitize_text(response)
-            self.conversation_history.append({"role": "assistant", "content": response})
-            
-            return response
-            
-        except Exception as e:
-            error_msg = sanitize_text(str(e))
-            if settings.DEBUG:
-                print(f"DEBUG - Erro no processamento: {error_msg}")
-            return f"Desculpe, tive um problema técnico. Pode repetir sua pergunta? (Erro: {error_msg})"
+        state = {"started": False}
+        
+        def on_token(token: str):
+            if not state["started"]:
+                print(prefix, end="", flush=True)
+                state["started"] = True
+            print(token, end="", flush=True)
+        
+        return on_token, lambda: state["started"]
     
-    async def _search_cars(self, filters: Dict[str, Any]) -> Dict[str, Any]:
-        """Busca carros com filtros"""
-        try:
-            if not filters:
-                return {"total_encontrados": 0, "carros": []}
-            return await self.client.search_cars(filters)
-        except Exception as e:
-            if settings.DEBUG:
-                print(f"Debug - Search error: {e}")
-            return {"total_encontrados": 0, "carros": []}
+    def _print_response(self, prefix: str, response: str, streamed: bool):
+        if streamed:
+            print()
+        else:
+            print(f"{prefix}{response}")
+        
+    async def _process_user_input(self, user_input: str, on_token: Optional[Callable[[str], None]] = None) -> str:
+        return await self.host.handle_message(self.session.session_id, user_input, on_token=on_token)
 
 # Função principal
 async def main():
@@ -5,10 +5,16 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from model.carros import *
 from faker import Faker
 from faker.providers import automotive
+import argparse
 import random
 import json
+import string
+import time
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Iterator, Iterable, Optional
+from sqlalchemy.exc import IntegrityError
 from infra.database import DatabaseManager
 from infra.config.settings import settings
 
@@ -184,22 +190,144 @@ def salvar_carros_json(carros: List[carro], arquivo: str = "carros_gerados.json"
         json.dump(dados, f, ensure_ascii=False, indent=2)
 
 
+#geração paralela para catálogos grandes (benchmarks de busca)
+#---------------------------------------------------------------------------------------
+# Placa Mercosul LLLNLNN: 26^4 * 10^3 combinações
+TOTAL_PLACAS = 26 ** 4 * 10 ** 3
+# Multiplicador coprimo com TOTAL_PLACAS: embaralha as placas sem repetir nenhuma
+PERMUTACAO_PLACA = 1_000_003
+TOTAL_CHASSIS = 10 ** 9
+TAMANHO_BLOCO = 10_000
+
+def placa_por_indice(indice: int) -> str:
+    """Placa única para cada índice do catálogo, sem precisar guardar as já usadas"""
+    if not 0 <= indice < TOTAL_PLACAS:
+        raise ValueError(f"Índice {indice} fora do espaço de placas")
+    n = (indice * PERMUTACAO_PLACA) % TOTAL_PLACAS
+    n, d3 = divmod(n, 10)
+    n, d2 = divmod(n, 10)
+    n, l4 = divmod(n, 26)
+    n, d1 = divmod(n, 10)
+    n, l3 = divmod(n, 26)
+    l1, l2 = divmod(n, 26)
+    letras = string.ascii_uppercase
+    return f"{letras[l1]}{letras[l2]}{letras[l3]}{d1}{letras[l4]}{d2}{d3}"
+
+def chassi_por_indice(indice: int) -> str:
+    # Prefixo do VIN gerado pelo faker; os 9 últimos caracteres garantem a unicidade
+    if not 0 <= indice < TOTAL_CHASSIS:
+        raise ValueError(f"Índice {indice} fora do espaço de chassis")
+    return f"{generate_chassi()[:8]}{indice:09d}"
+
+def seed_do_bloco(seed: int, bloco: int) -> int:
+    return seed * 1_000_003 + bloco
+
+def _gerar_bloco(seed: int, bloco: int, inicio: int, quantidade: int) -> List[carro]:
+    # Semente por bloco: o resultado não depende de quantos processos foram usados
+    seed_bloco = seed_do_bloco(seed, bloco)
+    random.seed(seed_bloco)
+    fake.seed_instance(seed_bloco)
+    
+    carros = []
+    for indice in range(inicio, inicio + quantidade):
+        carro_obj = gerar_carro()
+        carro_obj.placa = placa_por_indice(indice)
+        carro_obj.chassi = chassi_por_indice(indice)
+        carros.append(carro_obj)
+    return carros
+
+def gerar_carros_paralelo(quantidade: int, workers: Optional[int] = None, seed: int = 42,
+                          inicio: int = 0, tamanho_bloco: int = TAMANHO_BLOCO) -> Iterator[carro]:
+    """Gera carros em blocos num pool de processos, devolvendo-os em ordem
+    
+    No máximo 2 blocos por processo ficam em memória; inicio desloca os índices
+    de placa/chassi para acrescentar carros a um catálogo já gerado.
+    """
+    workers = workers or os.cpu_count() or 1
+    blocos = [
+        (bloco, inicio + offset, min(tamanho_bloco, quantidade - offset))
+        for bloco, offset in enumerate(range(0, quantidade, tamanho_bloco))
+    ]
+    if workers == 1:
+        for bloco, inicio_bloco, tamanho in blocos:
+            yield from _gerar_bloco(seed, bloco, inicio_bloco, tamanho)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pendentes = deque()
+        for bloco, inicio_bloco, tamanho in blocos:
+            pendentes.append(executor.submit(_gerar_bloco, seed, bloco, inicio_bloco, tamanho))
+            if len(pendentes) >= workers * 2:
+                yield from pendentes.popleft().result()
+        while pendentes:
+            yield from pendentes.popleft().result()
+
+def gravar_carros(carros: Iterable[carro], arquivo: str, total: int) -> Iterator[carro]:
+    """Grava cada carro em JSON Lines (.jsonl) ou no formato de salvar_carros_json, repassando-o adiante"""
+    with open(arquivo, 'w', encoding='utf-8') as f:
+        jsonl = arquivo.endswith(('.jsonl', '.ndjson'))
+        if not jsonl:
+            f.write(f'{{"total_carros": {total}, "data_geracao": "{datetime.now().isoformat()}", "carros": [\n')
+        
+        for i, carro_obj in enumerate(carros):
+            linha = json.dumps(carro_para_dict(carro_obj), ensure_ascii=False)
+            if jsonl:
+                f.write(linha + "\n")
+            else:
+                f.write(("  " if i == 0 else ",\n  ") + linha)
+            yield carro_obj
+        
+        if not jsonl:
+            f.write("\n]}\n")
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Gera um catálogo fictício de carros")
+    parser.add_argument("--quantidade", type=int, default=150)
+    parser.add_argument("--workers", type=int, default=None, help="processos geradores (padrão: número de CPUs)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--inicio", type=int, default=None,
+                        help="primeiro índice de placa/chassi (padrão: quantidade de carros já no banco)")
+    parser.add_argument("--bloco", type=int, default=TAMANHO_BLOCO, help="carros por tarefa do pool")
+    parser.add_argument("--saida", default="carros_gerados.json", help="arquivo .json ou .jsonl")
+    parser.add_argument("--sem-saida", action="store_true", help="não grava arquivo")
+    parser.add_argument("--database", default=settings.DATABASE_PATH, help="caminho do banco SQLite")
+    parser.add_argument("--sem-banco", action="store_true", help="não insere no banco")
+    parser.add_argument("--upsert", action="store_true", help="atualiza carros com placa/chassi já cadastrados")
+    parser.add_argument("--defer-indexes", action="store_true", help="recria os índices só no final da carga")
+    args = parser.parse_args(argv)
+    
+    db = None
+    if not args.sem_banco:
+        db = DatabaseManager(args.database)
+        db.create_tables()
+    
+    # Continua depois dos carros já cadastrados para uma nova execução não repetir placas/chassis
+    indice_inicial = args.inicio
+    if indice_inicial is None:
+        indice_inicial = db.count_carros() if db is not None else 0
+    
+    inicio = time.perf_counter()
+    carros = gerar_carros_paralelo(args.quantidade, args.workers, args.seed, indice_inicial, args.bloco)
+    if not args.sem_saida:
+        carros = gravar_carros(carros, args.saida, args.quantidade)
+    
+    if db is None:
+        total = sum(1 for _ in carros)
+    else:
+        try:
+            relatorio = db.bulk_insert_carros(carros, upsert=args.upsert, defer_indexes=args.defer_indexes)
+        except IntegrityError as e:
+            print(f"Erro ao inserir no banco: {e.orig}")
+            print("Use --upsert para atualizar os carros existentes ou --inicio para outra faixa de placas")
+            return
+        total = relatorio['total']
+        print(f"Inseridos {total} carros no banco SQLite ({relatorio['linhas_por_segundo']} linhas/s)")
+    
+    elapsed = time.perf_counter() - inicio
+    print(f"Gerados {total} carros em {elapsed:.1f}s")
+    if not args.sem_saida:
+        print(f"Carros salvos em '{args.saida}'")
+
+
 if __name__ == "__main__":
-    quantidade = 150
-    carros = gerar_multiplos_carros(quantidade)
-    print(f"Gerados {len(carros)} carros com sucesso!")
-    
-    # Salvar em JSON
-    salvar_carros_json(carros)
-    print(f"Carros salvos em 'carros_gerados.json'")
-    
-    # Salvar no banco de dados
-    print("Inserindo no banco de dados...")
-    db = DatabaseManager(settings.DATABASE_PATH)
-    db.create_tables()
-    
-    try:
-        inseridos = db.insert_carros(carros)
-        print(f"Inseridos {inseridos} carros no banco SQLite")
-    except Exception as e:
-        print(f"Erro ao inserir no banco: {e}")
\ No newline at end of file
+    main()
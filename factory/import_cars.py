@@ -0,0 +1,198 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+from datetime import datetime
+from typing import Iterator, Iterable, List, Optional, Dict, Any
+from pydantic import BaseModel, ValidationError
+from model.enums import TipoCombustivel, TipoTransmissao, TipoVeiculo
+from infra.database import DatabaseManager
+from infra.config.settings import settings
+
+# Tamanho de cada leitura do arquivo; o buffer guarda no máximo um registro incompleto além disso
+READ_SIZE = 64 * 1024
+MAX_ERROS_REPORTADOS = 10
+
+
+#mesmo formato de carro_para_dict em generate_cars.py
+class CarroRegistro(BaseModel):
+    marca: str
+    modelo: str
+    ano_fabricacao: int
+    ano_modelo: int
+    motorizacao: str
+    tipo_combustivel: TipoCombustivel
+    transmissao: TipoTransmissao
+    numero_portas: int
+    tipo_veiculo: TipoVeiculo
+    quilometragem: int
+    cor: str
+    preco: float
+    placa: str
+    chassi: str
+    data_cadastro: Optional[datetime] = None
+    data_ultima_revisao: Optional[datetime] = None
+
+
+class RegistroInvalido:
+    """Linha que não é JSON válido; validar_registros conta como registro inválido"""
+
+    def __init__(self, erro: str):
+        self.erro = erro
+
+
+def iter_registros_jsonl(arquivo) -> Iterator[Any]:
+    """Um registro por linha (JSON Lines)"""
+    for numero_linha, linha in enumerate(arquivo, 1):
+        if not linha.strip():
+            continue
+        try:
+            yield json.loads(linha)
+        except json.JSONDecodeError as e:
+            yield RegistroInvalido(f"JSON inválido na linha {numero_linha}: {e}")
+
+
+def iter_registros_json(arquivo, chave: str = "carros", read_size: int = READ_SIZE) -> Iterator[Dict[str, Any]]:
+    """Percorre o array de carros de um JSON grande sem carregar o documento inteiro
+
+    Aceita o formato de salvar_carros_json ({"carros": [...]}) ou um array na raiz.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def ler() -> bool:
+        nonlocal buffer, pos, eof
+        dados = arquivo.read(read_size)
+        if not dados:
+            eof = True
+            return False
+        buffer = buffer[pos:] + dados
+        pos = 0
+        return True
+
+    def pular_espacos():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buffer) or not ler():
+                return
+
+    def decodificar():
+        nonlocal pos
+        while True:
+            try:
+                valor, fim = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Valor cortado no fim do buffer: lê mais e tenta de novo
+                if eof or not ler():
+                    raise
+                continue
+            # Número no fim do buffer pode continuar na próxima leitura
+            if fim >= len(buffer) and not eof and ler():
+                continue
+            pos = fim
+            return valor
+
+    def esperar(caractere: str, erro: str):
+        nonlocal pos
+        pular_espacos()
+        if pos >= len(buffer) or buffer[pos] != caractere:
+            raise ValueError(erro)
+        pos += 1
+
+    # Localiza o início do array: na raiz ou no valor da chave do objeto raiz
+    pular_espacos()
+    if pos < len(buffer) and buffer[pos] == "[":
+        pos += 1
+    else:
+        esperar("{", "O arquivo deve conter um objeto ou um array JSON")
+        while True:
+            pular_espacos()
+            if pos >= len(buffer) or buffer[pos] == "}":
+                raise ValueError(f"Chave '{chave}' não encontrada no arquivo")
+            if buffer[pos] == ",":
+                pos += 1
+                continue
+            nome = decodificar()
+            esperar(":", "JSON inválido: esperado ':' depois da chave")
+            if nome == chave:
+                esperar("[", f"Chave '{chave}' não contém um array")
+                break
+            # Valor de outra chave (ex.: total_carros): só é pulado
+            pular_espacos()
+            decodificar()
+
+    while True:
+        pular_espacos()
+        if pos >= len(buffer):
+            raise ValueError("Array de carros não foi fechado")
+        if buffer[pos] == "]":
+            return
+        if buffer[pos] == ",":
+            pos += 1
+            continue
+        yield decodificar()
+
+
+def iter_registros(caminho: str, read_size: int = READ_SIZE) -> Iterator[Any]:
+    with open(caminho, "r", encoding="utf-8") as arquivo:
+        if caminho.endswith((".jsonl", ".ndjson")):
+            yield from iter_registros_jsonl(arquivo)
+        else:
+            yield from iter_registros_json(arquivo, read_size=read_size)
+
+
+def validar_registros(registros: Iterable[Any], relatorio: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Converte cada registro para as colunas do banco, contando e descartando os inválidos"""
+    for numero, registro in enumerate(registros, 1):
+        try:
+            if isinstance(registro, RegistroInvalido):
+                raise ValueError(registro.erro)
+            yield CarroRegistro(**registro).dict()
+        except (ValidationError, TypeError, ValueError) as e:
+            relatorio["invalidos"] += 1
+            if len(relatorio["erros"]) < MAX_ERROS_REPORTADOS:
+                relatorio["erros"].append(f"Registro {numero}: {e}")
+
+
+def importar_catalogo(caminho: str, db: DatabaseManager, chunk_size: Optional[int] = None,
+                      upsert: bool = False, defer_indexes: bool = False) -> Dict[str, Any]:
+    relatorio: Dict[str, Any] = {"invalidos": 0, "erros": []}
+    registros = validar_registros(iter_registros(caminho), relatorio)
+    relatorio.update(db.bulk_insert_carros(
+        registros, chunk_size=chunk_size, upsert=upsert, defer_indexes=defer_indexes
+    ))
+    return relatorio
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Importa um catálogo JSON/JSONL de carros para o banco")
+    parser.add_argument("arquivo", help="arquivo .json (formato carros_gerados.json) ou .jsonl")
+    parser.add_argument("--database", default=settings.DATABASE_PATH, help="caminho do banco SQLite")
+    parser.add_argument("--chunk-size", type=int, default=None, help="linhas por transação")
+    parser.add_argument("--upsert", action="store_true", help="atualiza carros com placa/chassi já cadastrados")
+    parser.add_argument("--defer-indexes", action="store_true", help="recria os índices só no final da carga")
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.database)
+    db.create_tables()
+    relatorio = importar_catalogo(
+        args.arquivo, db, chunk_size=args.chunk_size, upsert=args.upsert, defer_indexes=args.defer_indexes
+    )
+
+    print(f"Importados {relatorio['total']} carros em {relatorio['segundos']}s "
+          f"({relatorio['linhas_por_segundo']} linhas/s)")
+    if relatorio["invalidos"]:
+        print(f"{relatorio['invalidos']} registros inválidos ignorados:")
+        for erro in relatorio["erros"]:
+            print(f"  {erro}")
+    return relatorio
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from model.enums import TipoCombustivel, TipoTransmissao, TipoVeiculo
+
 #aqui foi testes atras de testes para ir aprimorando as intençoes
 class IntentKeywords:
 
@@ -31,6 +33,46 @@ class IntentKeywords:
         'especificações', 'características'
     ]
     
+    # Ordinais para "o segundo", "do terceiro"... (texto normalizado); -1 é o último
+    ORDINAL_MAPPING = {
+        'primeiro': 1, 'primeira': 1, 'segundo': 2, 'segunda': 2, 'terceiro': 3, 'terceira': 3,
+        'quarto': 4, 'quarta': 4, 'quinto': 5, 'quinta': 5, 'sexto': 6, 'sexta': 6,
+        'setimo': 7, 'setima': 7, 'oitavo': 8, 'oitava': 8, 'nono': 9, 'nona': 9,
+        'decimo': 10, 'decima': 10, 'ultimo': -1, 'ultima': -1
+    }
+    
+    # Únicas palavras aceitas junto de "carro 3" / "o segundo" para ser uma referência à lista;
+    # qualquer outra (marca, modelo, preço, "barato", "geração"...) indica uma busca nova
+    REFERENCE_WORDS = {
+        'o', 'a', 'os', 'as', 'do', 'da', 'dos', 'das', 'no', 'na', 'pelo', 'pela', 'de', 'e',
+        'um', 'uma', 'sobre', 'com', 'esse', 'essa', 'este', 'esta', 'ele', 'ela', 'dele', 'dela',
+        'desse', 'dessa', 'deste', 'desta', 'me', 'fala', 'fale', 'falar', 'diga', 'conta', 'conte',
+        'quero', 'queria', 'gostaria', 'ver', 'mostre', 'mostra', 'mostrar', 'saber', 'pode',
+        'poderia', 'qual', 'quais', 'como', 'mais', 'tudo', 'detalhe', 'detalhes', 'informacao',
+        'informacoes', 'ficha', 'completa', 'completo', 'dados', 'lista', 'listado', 'mostrado',
+        'favor', 'por', 'carro', 'veiculo', 'opcao', 'numero', 'item',
+        'placa', 'chassi', 'motor', 'motorizacao', 'cambio', 'transmissao', 'portas', 'km',
+        'quilometragem', 'revisao', 'cor', 'preco', 'valor', 'ano', 'combustivel', 'tipo'
+    }
+    
+    # Campos do carro pedidos explicitamente na pergunta (texto normalizado)
+    RESULT_FIELD_KEYWORDS = {
+        'cor': ['cor', 'cores'],
+        'quilometragem': ['km', 'quilometragem', 'rodado', 'rodagem'],
+        'combustivel': ['combustivel', 'flex', 'gasolina', 'diesel', 'alcool', 'eletrico', 'hibrido'],
+        'transmissao': ['cambio', 'transmissao', 'automatico', 'manual'],
+        'numero_portas': ['porta', 'portas'],
+        'motorizacao': ['motor', 'motorizacao', 'potencia'],
+        'tipo_veiculo': ['tipo', 'suv', 'sedan', 'hatch', 'pickup', 'picape', 'carroceria'],
+        'ano_modelo': ['ano modelo', 'ano do modelo'],
+        'placa': ['placa'],
+        'chassi': ['chassi'],
+        'data_ultima_revisao': ['revisao', 'revisado'],
+    }
+    
+    # Pedidos da ficha completa do carro (todos os campos)
+    FULL_DETAIL_KEYWORDS = ['detalhe', 'detalhes', 'informacao', 'informacoes', 'tudo', 'completo', 'completa', 'ficha']
+    
     # Mapeamento de cores
     COLOR_MAPPING = {
         'branco': 'Branco', 'branca': 'Branco', 'brancos': 'Branco',
@@ -41,6 +83,51 @@ class IntentKeywords:
         'marrom': 'Marrom', 'bege': 'Bege', 'roxo': 'Roxo', 'rosa': 'Rosa'
     }
     
+    # Mapeamentos usados pelo parser local (texto já normalizado, sem acentos)
+    FUEL_MAPPING = {
+        'flex': TipoCombustivel.FLEX.value,
+        'gasolina': TipoCombustivel.GASOLINA.value,
+        'etanol': TipoCombustivel.ETANOL.value, 'alcool': TipoCombustivel.ETANOL.value,
+        'diesel': TipoCombustivel.DIESEL.value,
+        'eletrico': TipoCombustivel.ELETRICO.value, 'eletricos': TipoCombustivel.ELETRICO.value,
+        'hibrido': TipoCombustivel.HIBRIDO.value, 'hibridos': TipoCombustivel.HIBRIDO.value,
+        'gnv': TipoCombustivel.GNV.value
+    }
+    
+    TRANSMISSION_MAPPING = {
+        'automatico': TipoTransmissao.AUTOMATICA.value, 'automatica': TipoTransmissao.AUTOMATICA.value,
+        'automaticos': TipoTransmissao.AUTOMATICA.value, 'automaticas': TipoTransmissao.AUTOMATICA.value,
+        'manual': TipoTransmissao.MANUAL.value, 'manuais': TipoTransmissao.MANUAL.value,
+        'cvt': TipoTransmissao.CVT.value
+    }
+    
+    VEHICLE_TYPE_MAPPING = {
+        'hatch': TipoVeiculo.HATCH.value, 'hatches': TipoVeiculo.HATCH.value,
+        'sedan': TipoVeiculo.SEDAN.value, 'seda': TipoVeiculo.SEDAN.value, 'sedans': TipoVeiculo.SEDAN.value,
+        'suv': TipoVeiculo.SUV.value, 'suvs': TipoVeiculo.SUV.value,
+        'pickup': TipoVeiculo.PICKUP.value, 'picape': TipoVeiculo.PICKUP.value, 'picapes': TipoVeiculo.PICKUP.value,
+        'caminhonete': TipoVeiculo.PICKUP.value,
+        'conversivel': TipoVeiculo.CONVERSIVEL.value, 'conversiveis': TipoVeiculo.CONVERSIVEL.value,
+        'coupe': TipoVeiculo.COUPE.value, 'cupe': TipoVeiculo.COUPE.value,
+        'wagon': TipoVeiculo.WAGON.value, 'perua': TipoVeiculo.WAGON.value,
+        'van': TipoVeiculo.VAN.value, 'vans': TipoVeiculo.VAN.value
+    }
+    
+    BRAND_ALIASES = {
+        'vw': 'Volkswagen', 'gm': 'Chevrolet', 'chevy': 'Chevrolet', 'mercedes-benz': 'Mercedes'
+    }
+    
+    # Palavras que não mudam a busca e não devem baixar a confiança do parser local
+    FILLER_WORDS = {
+        'quero', 'queria', 'gostaria', 'procuro', 'procurando', 'busco', 'buscar', 'procurar',
+        'preciso', 'encontrar', 'mostrar', 'mostre', 'mostra', 'me', 'ver', 'listar', 'lista',
+        'tem', 'tens', 'voces', 'um', 'uma', 'uns', 'umas', 'o', 'a', 'os', 'as', 'de', 'do',
+        'da', 'dos', 'das', 'e', 'com', 'em', 'no', 'na', 'para', 'pra', 'por', 'carro',
+        'carros', 'veiculo', 'veiculos', 'modelo', 'marca', 'cor', 'ano', 'reais', 'algum',
+        'alguma', 'algo', 'disponivel', 'disponiveis', 'todos', 'todas', 'cambio', 'portas',
+        'combustivel', 'detalhes', 'informacoes', 'favor', 'ai'
+    }
+    
     @classmethod
     def check_metrics_intent(cls, user_input):
         return any(keyword in user_input.lower() for keyword in cls.METRICS_KEYWORDS)
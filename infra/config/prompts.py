@@ -34,6 +34,7 @@ class Prompts:
         "preco_max": número ou null,
         "combustivel": "Gasolina"/"Álcool"/"Flex"/"Diesel"/"GNV"/"Híbrido"/"Elétrico" ou null,
         "transmissao": "Manual"/"Automático"/"CVT" ou null,
+        "tipo_veiculo": "Hatch"/"Sedan"/"SUV"/"Pickup"/"Conversível"/"Coupe"/"Wagon"/"Van" ou null,
         "cor": "nome_da_cor" ou null,
         "numero_portas": número ou null,
         "placa_inicia_com": "letra" ou null,
@@ -56,6 +57,53 @@ class Prompts:
     - Retorne apenas o JSON, sem explicações
     """
     
+    INTENT_AND_FILTER_EXTRACTION = """
+    Analise a seguinte mensagem do usuário sobre carros. Em uma única resposta:
+    1. Determine se ele está procurando/buscando carros, fazendo perguntas gerais ou apenas conversando
+    2. Se for uma busca, extraia os filtros de busca
+    
+    Mensagem: "{user_input}"
+    
+    Marcas disponíveis: {available_brands}
+    
+    Responda apenas com JSON:
+    {{
+        "needs_search": true/false,
+        "intent_type": "search"/"question"/"conversation",
+        "confidence": 0.0-1.0,
+        "filters": {{
+            "marca": "nome_da_marca" ou null,
+            "modelo": "nome_do_modelo" ou null,
+            "ano_min": número ou null,
+            "ano_max": número ou null,
+            "preco_min": número ou null,
+            "preco_max": número ou null,
+            "combustivel": "Gasolina"/"Álcool"/"Flex"/"Diesel"/"GNV"/"Híbrido"/"Elétrico" ou null,
+            "transmissao": "Manual"/"Automático"/"CVT" ou null,
+            "tipo_veiculo": "Hatch"/"Sedan"/"SUV"/"Pickup"/"Conversível"/"Coupe"/"Wagon"/"Van" ou null,
+            "cor": "nome_da_cor" ou null,
+            "numero_portas": número ou null,
+            "placa_inicia_com": "letra" ou null,
+            "limit": número ou null,
+            "detailed_info": true/false
+        }}
+    }}
+    
+    Regras:
+    - Se o usuário pedir para "listar", "mostrar todos", "ver todos os carros", "carros disponíveis", isso é uma BUSCA (needs_search: true)
+    - Se não for uma busca, retorne "filters": {{}}
+    - Se mencionar "até X reais", use preco_max
+    - Se mencionar "acima de X", use preco_min
+    - PRIORIDADE: Se mencionar um ano específico (ex: "2023", "de 2020"), use ano_min e ano_max com esse valor exato
+    - Se mencionar apenas "novo" sem ano específico, considere como últimos 3 anos (2022-2024)
+    - Para "automático", use "Automático"
+    - Se mencionar "placa começa com X" ou "placa inicia com X", use placa_inicia_com
+    - Se pedir "informações", "detalhes", "todas as informações", use detailed_info: true
+    - Se pedir "todos os carros" ou "listar todos", NÃO adicione filtros específicos e use limit: 50
+    - Se mencionar marca e modelo específicos, use ambos os filtros
+    - Retorne apenas o JSON, sem explicações
+    """
+    
     NO_RESULTS = """
     O usuário procurou por: "{user_input}"
     
@@ -88,6 +136,14 @@ class Prompts:
     Seja útil e organize bem a informação, mas SEMPRE mostre todos os carros fornecidos.
     """
     
+    # Versão compacta: carros em tabela (uma linha por carro, campos separados por ;)
+    RESULTS_RESPONSE_COMPACT = """
+    O usuário procurou por: "{user_input}"
+    Encontramos {total_found} carros. Os {total_cars} abaixo estão em tabela (a primeira linha tem as colunas; preço em reais, km em quilômetros):
+    {cars_table}{more_info}
+    Mostre todos os {total_cars} carros, um por linha e com a mesma numeração, usando só os campos da tabela (preço como R$). {display_rule}
+    """
+    
     SYSTEM_MESSAGE = """
     Você é um vendedor de carros experiente conversando com um cliente.
     
@@ -124,4 +180,5 @@ class Prompts:
     """
     
     GREETING = "Cumprimente o usuário e pergunte como pode ajudar na busca por carros. Seja amigável e profissional."
-    FAREWELL = "Despeça-se do usuário de forma amigável."
\ No newline at end of file
+    FAREWELL = "Despeça-se do usuário de forma amigável."
+    CONVERSATION_SUMMARY = "Resumo do início da conversa (mensagens mais antigas):\n{summary}"
\ No newline at end of file
@@ -7,6 +7,9 @@ class Settings:
     # OpenAI
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
     OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
+    OPENAI_TIMEOUT = float(os.getenv('OPENAI_TIMEOUT', '30'))
+    OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', '2'))
+    OPENAI_MAX_CONCURRENCY = int(os.getenv('OPENAI_MAX_CONCURRENCY', '10'))
     
     # App
     APP_NAME = os.getenv('APP_NAME', 'Assistente IA de Carros')
@@ -15,19 +18,73 @@ class Settings:
     
     # Database
     DATABASE_PATH = os.getenv('DATABASE_PATH', 'infra/data/database/carros.db')
+    # Threads que executam as consultas do servidor MCP fora do event loop
+    DB_MAX_WORKERS = int(os.getenv('DB_MAX_WORKERS', '4'))
+    # "concurrent": WAL e leitores separados do escritor; "default": engine único do SQLite
+    DB_ENGINE_PROFILE = os.getenv('DB_ENGINE_PROFILE', 'concurrent')
+    DB_READER_POOL_SIZE = int(os.getenv('DB_READER_POOL_SIZE', '4'))
+    DB_BUSY_TIMEOUT = float(os.getenv('DB_BUSY_TIMEOUT', '5'))
+    DB_SYNCHRONOUS = os.getenv('DB_SYNCHRONOUS', 'NORMAL')
+    DB_MMAP_SIZE = int(os.getenv('DB_MMAP_SIZE', str(256 * 1024 * 1024)))
+    DB_CACHE_SIZE_KB = int(os.getenv('DB_CACHE_SIZE_KB', '65536'))
+    # Linhas por transação em bulk_insert_carros
+    BULK_INSERT_CHUNK_SIZE = int(os.getenv('BULK_INSERT_CHUNK_SIZE', '5000'))
+    # "sql" ou "memory" (colunas NumPy em memória para as buscas; requer numpy)
+    CATALOG_ENGINE = os.getenv('CATALOG_ENGINE', 'sql')
+    
+    # MCP remoto: tcp://host:porta, unix:///caminho ou stdio (vazio = servidor no próprio processo)
+    MCP_SERVER_URL = os.getenv('MCP_SERVER_URL') or None
+    MCP_POOL_SIZE = int(os.getenv('MCP_POOL_SIZE', '4'))
+    MCP_MAX_IN_FLIGHT = int(os.getenv('MCP_MAX_IN_FLIGHT', '64'))
+    # Segundos esperando a resposta do servidor remoto antes de desistir da requisição
+    MCP_REQUEST_TIMEOUT = float(os.getenv('MCP_REQUEST_TIMEOUT', '30'))
     
     # AI Parameters
     TEMPERATURE = 0.7
     MAX_TOKENS = 500
     INTENT_TEMPERATURE = 0.1
+    # Intenção + filtros em uma única chamada (false = duas chamadas, para comparar latência)
+    COMBINED_INTENT_EXTRACTION = os.getenv('COMBINED_INTENT_EXTRACTION', 'True').lower() == 'true'
+    # Confiança mínima do parser local para dispensar o LLM (acima de 1.0 desativa)
+    LOCAL_PARSER_THRESHOLD = float(os.getenv('LOCAL_PARSER_THRESHOLD', '0.8'))
+    
+    # Cache de respostas do LLM (LLM_CACHE_PATH vazio = somente memória)
+    LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'True').lower() == 'true'
+    LLM_CACHE_MAX_SIZE = int(os.getenv('LLM_CACHE_MAX_SIZE', '512'))
+    LLM_CACHE_TTL = float(os.getenv('LLM_CACHE_TTL', '3600'))
+    LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH') or None
     
     # Search Limits
     DEFAULT_SEARCH_LIMIT = 50
     MAX_CARS_DISPLAY = 10
     MAX_CARS_DETAILED = 5
+    # Resultados no prompt em tabela compacta, com campos escolhidos pela pergunta
+    COMPACT_RESULTS_PROMPT = os.getenv('COMPACT_RESULTS_PROMPT', 'True').lower() == 'true'
+    # Acima deste tamanho (em tokens) o prompt de resultados perde os últimos carros
+    RESULTS_PROMPT_TOKEN_BUDGET = int(os.getenv('RESULTS_PROMPT_TOKEN_BUDGET', '800'))
+    SEARCH_COUNT_CACHE_SIZE = 256
+    # Com exact_total=False a contagem para neste limite ("pelo menos N")
+    SEARCH_COUNT_CAP = 1000
     
     # Conversation
     MAX_HISTORY_MESSAGES = 6
+    # Orçamento de tokens do histórico enviado ao modelo; o que sai vira um resumo curto
+    HISTORY_TOKEN_BUDGET = int(os.getenv('HISTORY_TOKEN_BUDGET', '1500'))
+    HISTORY_SUMMARY_TOKENS = int(os.getenv('HISTORY_SUMMARY_TOKENS', '300'))
+    STREAM_RESPONSES = os.getenv('STREAM_RESPONSES', 'True').lower() == 'true'
+    # Sessões de conversa por processo (AgentHost) e tempo ocioso até expirar, em segundos
+    AGENT_MAX_SESSIONS = int(os.getenv('AGENT_MAX_SESSIONS', '1000'))
+    AGENT_SESSION_TTL = float(os.getenv('AGENT_SESSION_TTL', '1800'))
+    
+    # Front-end HTTP/WebSocket (presentation/web)
+    WEB_HOST = os.getenv('WEB_HOST', '127.0.0.1')
+    WEB_PORT = int(os.getenv('WEB_PORT', '8080'))
+    # Conexão HTTP ociosa (keep-alive) é fechada depois deste tempo, em segundos
+    WEB_KEEPALIVE_TIMEOUT = float(os.getenv('WEB_KEEPALIVE_TIMEOUT', '15'))
+    WEB_MAX_BODY = int(os.getenv('WEB_MAX_BODY', '65536'))
+    # Mensagens sendo processadas ao mesmo tempo; acima disso as conexões esperam
+    WEB_MAX_IN_FLIGHT = int(os.getenv('WEB_MAX_IN_FLIGHT', '256'))
+    WEB_WS_PING_INTERVAL = float(os.getenv('WEB_WS_PING_INTERVAL', '20'))
     
     @classmethod
     def validate(cls):
@@ -1,22 +1,110 @@
+import base64
+import json
 from pydantic import BaseModel, Field, validator
 from typing import Optional, Dict, Any
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, or_, text
 from .models import CarroDB
+from infra.shared.text_utils import normalize_text
+from infra.config.keywords import IntentKeywords
+from model.enums import TipoCombustivel, TipoTransmissao, TipoVeiculo
+
+# Campos de paginação/contagem, que não filtram linhas
+PAGINATION_FIELDS = {'limit', 'offset', 'order_by', 'exact_total', 'cursor'}
+
+# Chaves de ordenação suportadas: coluna e direção (o id desempata)
+ORDER_MAPPING = {
+    'preco_asc': (CarroDB.preco, 'asc'),
+    'preco_desc': (CarroDB.preco, 'desc'),
+    'quilometragem_asc': (CarroDB.quilometragem, 'asc'),
+    'ano_desc': (CarroDB.ano_fabricacao, 'desc')
+}
+
+# Apelidos aceitos para cada campo enum (texto normalizado -> valor do enum)
+ENUM_FIELDS = {
+    'combustivel': (TipoCombustivel, IntentKeywords.FUEL_MAPPING),
+    'transmissao': (TipoTransmissao, IntentKeywords.TRANSMISSION_MAPPING),
+    'tipo_veiculo': (TipoVeiculo, IntentKeywords.VEHICLE_TYPE_MAPPING),
+}
+
+def parse_enum_value(field: str, value):
+    """Converte "Automático", "Álcool", "flex"... no valor do enum; None se desconhecido"""
+    enum_cls, aliases = ENUM_FIELDS[field]
+    if isinstance(value, enum_cls):
+        return value.value
+    normalized = normalize_text(str(value))
+    valid_values = {member.value for member in enum_cls}
+    if normalized in valid_values:
+        return normalized
+    return aliases.get(normalized)
+
+def prefix_match(column, value: str):
+    """Prefixo como faixa (col >= v AND col < v + U+FFFF), que usa o índice da coluna"""
+    value = normalize_text(value)
+    return and_(column >= value, column < value + '\uffff')
+
+def fts_match(value: str):
+    """Busca textual aproximada na tabela FTS5 (prefixo de cada palavra)"""
+    terms = ' '.join(f'"{term}"*' for term in normalize_text(value).replace('"', ' ').split())
+    return CarroDB.id.in_(
+        text("SELECT rowid FROM carros_fts WHERE carros_fts MATCH :terms").bindparams(terms=terms)
+    )
+
+def text_match(value: str):
+    """Alternativa sem FTS5: prefixo em marca, modelo ou cor"""
+    return or_(*[
+        prefix_match(column, term)
+        for term in normalize_text(value).split()
+        for column in (CarroDB.marca_norm, CarroDB.modelo_norm, CarroDB.cor_norm)
+    ])
+
+def encode_cursor(order_key: Optional[str], value, last_id: int) -> str:
+    """Cursor opaco com a chave de ordenação e a última linha vista"""
+    payload = json.dumps({"o": order_key, "v": value, "id": last_id})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor: str, order_by: Optional[str]):
+    """Retorna (chave de ordenação, valor, último id) validando a ordenação pedida"""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        order_key, value, last_id = data["o"], data["v"], int(data["id"])
+    except Exception:
+        raise ValueError("Cursor de paginação inválido")
+    
+    if order_key != (order_by if order_by in ORDER_MAPPING else None):
+        raise ValueError("Cursor gerado para outra ordenação")
+    return order_key, value, last_id
 
 class CarFilters(BaseModel):
     marca: Optional[str] = None
     modelo: Optional[str] = None
     cor: Optional[str] = None
+    texto: Optional[str] = None
     ano_min: Optional[int] = Field(None, ge=1900, le=2030)
     ano_max: Optional[int] = Field(None, ge=1900, le=2030)
     preco_min: Optional[float] = Field(None, ge=0)
     preco_max: Optional[float] = Field(None, ge=0)
     combustivel: Optional[str] = None
     transmissao: Optional[str] = None
+    tipo_veiculo: Optional[str] = None
     numero_portas: Optional[int] = Field(None, ge=2, le=5)
     limit: int = Field(default=20, ge=1, le=100)
     offset: int = Field(default=0, ge=0)
     order_by: Optional[str] = None
+    exact_total: bool = True
+    cursor: Optional[str] = None
+    
+    # Valores que não correspondem a nenhum enum não filtram nada
+    @validator('combustivel', pre=True)
+    def validate_combustivel(cls, v):
+        return parse_enum_value('combustivel', v) if v is not None else v
+    
+    @validator('transmissao', pre=True)
+    def validate_transmissao(cls, v):
+        return parse_enum_value('transmissao', v) if v is not None else v
+    
+    @validator('tipo_veiculo', pre=True)
+    def validate_tipo_veiculo(cls, v):
+        return parse_enum_value('tipo_veiculo', v) if v is not None else v
     
     @validator('ano_max')
     def validate_year_range(cls, v, values):
@@ -30,28 +118,37 @@ class CarFilters(BaseModel):
             raise ValueError('preco_max deve ser maior que preco_min')
         return v
     
-    def apply_to_statement(self, stmt):
+    def apply_to_statement(self, stmt, fts_enabled: bool = False):
         """Aplica filtros a um statement SQLAlchemy"""
         conditions = []
         
         # Mapeamento dinâmico de filtros
         filter_map = {
-            'marca': lambda v: CarroDB.marca.ilike(f"%{v}%"),
-            'modelo': lambda v: CarroDB.modelo.ilike(f"%{v}%"),
-            'cor': lambda v: CarroDB.cor.ilike(f"%{v}%"),
+            'marca': lambda v: prefix_match(CarroDB.marca_norm, v),
+            'modelo': lambda v: prefix_match(CarroDB.modelo_norm, v),
+            'cor': lambda v: prefix_match(CarroDB.cor_norm, v),
+            'texto': fts_match if fts_enabled else text_match,
             'ano_min': lambda v: CarroDB.ano_fabricacao >= v,
             'ano_max': lambda v: CarroDB.ano_fabricacao <= v,
             'preco_min': lambda v: CarroDB.preco >= v,
             'preco_max': lambda v: CarroDB.preco <= v,
             'numero_portas': lambda v: CarroDB.numero_portas == v,
+            'combustivel': lambda v: CarroDB.tipo_combustivel == TipoCombustivel(v),
+            'transmissao': lambda v: CarroDB.transmissao == TipoTransmissao(v),
+            'tipo_veiculo': lambda v: CarroDB.tipo_veiculo == TipoVeiculo(v),
         }
         
         # Aplicar filtros dinamicamente
-        for field, value in self.dict(exclude_none=True, exclude={'limit', 'offset', 'order_by'}).items():
+        for field, value in self.dict(exclude_none=True, exclude=PAGINATION_FIELDS).items():
             if field in filter_map:
                 conditions.append(filter_map[field](value))
         
         if conditions:
             stmt = stmt.where(and_(*conditions))
         
-        return stmt
\ No newline at end of file
+        return stmt
+    
+    def cache_key(self) -> str:
+        """Chave do conjunto de filtros normalizado, ignorando paginação"""
+        filters = self.dict(exclude_none=True, exclude=PAGINATION_FIELDS)
+        return json.dumps(filters, sort_keys=True, default=str)
\ No newline at end of file
@@ -1,39 +1,105 @@
-from sqlalchemy import select, func, distinct
+import threading
+from contextlib import contextmanager
+from sqlalchemy import select, func, and_, or_
 from sqlalchemy.orm import Session
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from .models import CarroDB
 from .database import DatabaseManager
-from .car_filters import CarFilters
-from .response_models import CarResponse, SearchResponse
+from .car_filters import CarFilters, ORDER_MAPPING, encode_cursor, decode_cursor
+from .response_models import CarResponse, SearchResponse, CarsByIdsResponse
+from .memory_catalog import numpy_available
+from infra.config.settings import settings
+
+# Limite de ids por IN (...), abaixo do máximo de parâmetros do SQLite
+IDS_CHUNK_SIZE = 500
 
 class CarRepository:
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(self, db_manager: DatabaseManager, engine: Optional[str] = None):
         self.db_manager = db_manager
+        # "memory": filtros avaliados em colunas NumPy; sem NumPy, segue pelo SQL
+        self._memory = None
+        if (engine or settings.CATALOG_ENGINE) == 'memory' and numpy_available():
+            self._memory = db_manager.enable_memory_catalog()
+        # Totais por conjunto de filtros, válidos enquanto a base não mudar
+        self._count_cache: Dict[str, int] = {}
+        self._count_cache_version = db_manager.data_version
+        # Sessão compartilhada por thread durante um lote de requisições
+        self._local = threading.local()
+    
+    @contextmanager
+    def shared_session(self):
+        """Faz as chamadas do repositório nesta thread usarem uma única sessão"""
+        if getattr(self._local, 'session', None) is not None:
+            yield self._local.session
+            return
+        
+        session = self.db_manager.get_read_session()
+        self._local.session = session
+        try:
+            yield session
+        finally:
+            self._local.session = None
+            session.close()
+    
+    @contextmanager
+    def _session(self):
+        shared = getattr(self._local, 'session', None)
+        if shared is not None:
+            yield shared
+            return
+        
+        session = self.db_manager.get_read_session()
+        try:
+            yield session
+        finally:
+            session.close()
     
     def search_cars_optimized(self, filters: Dict[str, Any]) -> SearchResponse:
         """Busca otimizada usando Pydantic filters e response models"""
-        session = self.db_manager.get_session()
-        try:
+        if self._memory is not None:
+            return self._memory.search(CarFilters(**filters))
+        
+        with self._session() as session:
             # Validar e criar filtros
             car_filters = CarFilters(**filters)
-            
-            # Query base usando select
-            stmt = select(CarroDB)
-            
-            # Aplicar filtros automaticamente
-            stmt = car_filters.apply_to_statement(stmt)
-            
-            # Contar total
-            count_stmt = select(func.count()).select_from(stmt.subquery())
-            total_count = session.execute(count_stmt).scalar()
-            
-            # Aplicar ordenação e paginação
-            stmt = self._apply_ordering(stmt, car_filters.order_by)
-            stmt = stmt.offset(car_filters.offset).limit(car_filters.limit)
-            
-            # Executar query
-            result = session.execute(stmt)
-            carros = result.scalars().all()
+            total_exato = True
+            
+            cached_total = self._get_cached_count(car_filters)
+            # Com cursor a janela contaria só o restante, então o total vem do cache ou de um COUNT
+            use_window = cached_total is None and car_filters.exact_total and not car_filters.cursor
+            
+            if use_window:
+                # Página e total em uma única passada com COUNT(*) OVER ()
+                stmt = select(CarroDB, func.count().over().label('total_count'))
+                rows = session.execute(self._build_page_statement(stmt, car_filters)).all()
+                carros = [row[0] for row in rows]
+                if rows:
+                    total_count = rows[0].total_count
+                elif car_filters.offset == 0:
+                    total_count = 0
+                else:
+                    # Página além do fim: a janela não devolve linhas, então conta à parte
+                    total_count = self._count(session, car_filters)
+                self._set_cached_count(car_filters, total_count)
+            else:
+                carros = session.execute(self._build_page_statement(select(CarroDB), car_filters)).scalars().all()
+                if cached_total is not None:
+                    total_count = cached_total
+                elif car_filters.exact_total:
+                    total_count = self._count(session, car_filters)
+                    self._set_cached_count(car_filters, total_count)
+                else:
+                    # Contagem limitada: "pelo menos N" para conjuntos grandes
+                    total_count = self._count(session, car_filters, cap=settings.SEARCH_COUNT_CAP)
+                    total_exato = total_count < settings.SEARCH_COUNT_CAP
+                    if total_exato:
+                        self._set_cached_count(car_filters, total_count)
+            
+            # A página é buscada com uma linha extra para saber se há próxima
+            next_cursor = None
+            if len(carros) > car_filters.limit:
+                carros = carros[:car_filters.limit]
+                next_cursor = self._encode_cursor(carros[-1], car_filters.order_by)
             
             # Converter para CarResponse usando Pydantic
             car_responses = [CarResponse.from_orm(car) for car in carros]
@@ -43,152 +109,116 @@ class CarRepository:
                 total_exibidos=len(car_responses),
                 offset=car_filters.offset,
                 limit=car_filters.limit,
-                carros=car_responses
+                carros=car_responses,
+                total_exato=total_exato,
+                next_cursor=next_cursor
             )
-        finally:
-            session.close()
+    
+    def _build_page_statement(self, stmt, car_filters: CarFilters):
+        stmt = car_filters.apply_to_statement(stmt, self.db_manager.fts_enabled)
+        stmt = self._apply_ordering(stmt, car_filters.order_by)
+        if car_filters.cursor:
+            # Keyset: continua depois da última linha vista, sem OFFSET
+            stmt = stmt.where(self._cursor_condition(car_filters.cursor, car_filters.order_by))
+        else:
+            stmt = stmt.offset(car_filters.offset)
+        return stmt.limit(car_filters.limit + 1)
+    
+    def _count(self, session: Session, car_filters: CarFilters, cap: Optional[int] = None) -> int:
+        stmt = car_filters.apply_to_statement(select(CarroDB.id), self.db_manager.fts_enabled)
+        if cap is not None:
+            stmt = stmt.limit(cap)
+        return session.execute(select(func.count()).select_from(stmt.subquery())).scalar()
+    
+    def _get_cached_count(self, car_filters: CarFilters) -> Optional[int]:
+        if self._count_cache_version != self.db_manager.data_version:
+            self._count_cache.clear()
+            self._count_cache_version = self.db_manager.data_version
+        return self._count_cache.get(car_filters.cache_key())
+    
+    def _set_cached_count(self, car_filters: CarFilters, total: int):
+        if len(self._count_cache) >= settings.SEARCH_COUNT_CACHE_SIZE:
+            self._count_cache.clear()
+        self._count_cache[car_filters.cache_key()] = total
     
     def get_car_by_id(self, car_id: int) -> CarResponse:
         """Obtém um carro específico por ID usando CarResponse"""
-        session = self.db_manager.get_session()
-        try:
+        with self._session() as session:
             car = session.query(CarroDB).filter(CarroDB.id == car_id).first()
             
             if not car:
                 raise ValueError(f"Carro com ID {car_id} não encontrado")
             
             return CarResponse.from_orm(car)
-        finally:
-            session.close()
+    
+    def get_cars_by_ids(self, car_ids: List[int]) -> CarsByIdsResponse:
+        """Obtém vários carros com uma consulta IN, na ordem pedida, listando os ids ausentes"""
+        ids = list(dict.fromkeys(int(car_id) for car_id in car_ids))
+        
+        found = {}
+        with self._session() as session:
+            for start in range(0, len(ids), IDS_CHUNK_SIZE):
+                chunk = ids[start:start + IDS_CHUNK_SIZE]
+                stmt = select(CarroDB).where(CarroDB.id.in_(chunk))
+                for car in session.execute(stmt).scalars():
+                    found[car.id] = CarResponse.from_orm(car)
+        
+        return CarsByIdsResponse(
+            carros=[found[car_id] for car_id in ids if car_id in found],
+            nao_encontrados=[car_id for car_id in ids if car_id not in found]
+        )
     
     def get_available_brands(self) -> Dict[str, Any]:
-        """Retorna marcas disponíveis usando agregação SQL otimizada"""
-        session = self.db_manager.get_session()
-        try:
-            stmt = select(distinct(CarroDB.marca)).order_by(CarroDB.marca)
-            result = session.execute(stmt)
-            marcas = [row[0] for row in result]
-            
-            return {"marcas": marcas, "total": len(marcas)}
-        finally:
-            session.close()
+        """Retorna marcas disponíveis a partir do snapshot de estatísticas"""
+        marcas = self.db_manager.stats.snapshot()["marcas"]
+        return {"marcas": marcas, "total": len(marcas)}
     
     def get_car_statistics(self) -> Dict[str, Any]:
-        session = self.db_manager.get_session()
-        try:
-            from sqlalchemy import func
-            from .models import CarroDB
-            
-            # Total de carros
-            total_carros = session.query(CarroDB).count()
-            
-            if total_carros == 0:
-                return {
-                    "total_carros": 0,
-                    "por_marca": {},
-                    "por_combustivel": {},
-                    "por_transmissao": {},
-                    "faixa_preco": {"min": 0, "max": 0, "media": 0}
-                }
-            
-            # Estatísticas por marca
-            por_marca = {}
-            marca_stats = session.query(
-                CarroDB.marca, 
-                func.count(CarroDB.id)
-            ).group_by(CarroDB.marca).all()
-            
-            for marca, count in marca_stats:
-                por_marca[marca] = count
-            
-            # Estatísticas por combustível
-            por_combustivel = {}
-            combustivel_stats = session.query(
-                CarroDB.tipo_combustivel,
-                func.count(CarroDB.id)
-            ).group_by(CarroDB.tipo_combustivel).all()
-            
-            for combustivel, count in combustivel_stats:
-                por_combustivel[combustivel.value] = count
-            
-            # Estatísticas por transmissão
-            por_transmissao = {}
-            transmissao_stats = session.query(
-                CarroDB.transmissao,
-                func.count(CarroDB.id)
-            ).group_by(CarroDB.transmissao).all()
-            
-            for transmissao, count in transmissao_stats:
-                por_transmissao[transmissao.value] = count
-            
-            # Faixa de preços
-            preco_stats = session.query(
-                func.min(CarroDB.preco),
-                func.max(CarroDB.preco),
-                func.avg(CarroDB.preco)
-            ).first()
-            
-            min_preco, max_preco, avg_preco = preco_stats
-            
+        snapshot = self.db_manager.stats.snapshot()
+        
+        if snapshot["total_carros"] == 0:
             return {
-                "total_carros": total_carros,
-                "por_marca": por_marca,
-                "por_combustivel": por_combustivel,
-                "por_transmissao": por_transmissao,
-                "faixa_preco": {
-                    "min": float(min_preco) if min_preco else 0,
-                    "max": float(max_preco) if max_preco else 0,
-                    "media": float(avg_preco) if avg_preco else 0
-                }
+                "total_carros": 0,
+                "por_marca": {},
+                "por_combustivel": {},
+                "por_transmissao": {},
+                "faixa_preco": {"min": 0, "max": 0, "media": 0}
             }
-            
-        finally:
-            session.close()
+        
+        return {
+            "total_carros": snapshot["total_carros"],
+            "por_marca": snapshot["por_marca"],
+            "por_combustivel": snapshot["por_combustivel"],
+            "por_transmissao": snapshot["por_transmissao"],
+            "faixa_preco": snapshot["faixa_preco"]
+        }
     
     def get_price_range(self) -> Dict[str, Any]:
-        """Retorna faixa de preços usando agregação SQL"""
-        session = self.db_manager.get_session()
-        try:
-            price_stats = session.query(
-                func.min(CarroDB.preco).label('min_preco'),
-                func.max(CarroDB.preco).label('max_preco'),
-                func.avg(CarroDB.preco).label('avg_preco')
-            ).first()
-            
-            return {
-                "min": float(price_stats.min_preco) if price_stats.min_preco else 0,
-                "max": float(price_stats.max_preco) if price_stats.max_preco else 0,
-                "media": float(price_stats.avg_preco) if price_stats.avg_preco else 0
-            }
-        finally:
-            session.close()
+        """Retorna faixa de preços a partir do snapshot de estatísticas"""
+        return self.db_manager.stats.snapshot()["faixa_preco"]
     
     def get_year_range(self) -> Dict[str, Any]:
-        """Retorna faixa de anos usando agregação SQL"""
-        session = self.db_manager.get_session()
-        try:
-            year_stats = session.query(
-                func.min(CarroDB.ano_fabricacao).label('min_ano'),
-                func.max(CarroDB.ano_fabricacao).label('max_ano')
-            ).first()
-            
-            return {
-                "min": year_stats.min_ano if year_stats.min_ano else 0,
-                "max": year_stats.max_ano if year_stats.max_ano else 0
-            }
-        finally:
-            session.close()
+        """Retorna faixa de anos a partir do snapshot de estatísticas"""
+        return self.db_manager.stats.snapshot()["faixa_ano"]
     
     def _apply_ordering(self, stmt, order_by: str):
-        """Aplica ordenação de forma dinâmica"""
-        order_mapping = {
-            'preco_asc': CarroDB.preco.asc(),
-            'preco_desc': CarroDB.preco.desc(),
-            'quilometragem_asc': CarroDB.quilometragem.asc(),
-            'ano_desc': CarroDB.ano_fabricacao.desc()
-        }
+        """Aplica ordenação de forma dinâmica, sempre desempatando por id"""
+        if order_by and order_by in ORDER_MAPPING:
+            column, direction = ORDER_MAPPING[order_by]
+            stmt = stmt.order_by(column.asc() if direction == 'asc' else column.desc())
         
-        if order_by and order_by in order_mapping:
-            stmt = stmt.order_by(order_mapping[order_by])
+        return stmt.order_by(CarroDB.id.asc())
+    
+    def _encode_cursor(self, car: CarroDB, order_by: Optional[str]) -> str:
+        order_key = order_by if order_by in ORDER_MAPPING else None
+        value = getattr(car, ORDER_MAPPING[order_key][0].key) if order_key else None
+        return encode_cursor(order_key, value, car.id)
+    
+    def _cursor_condition(self, cursor: str, order_by: Optional[str]):
+        order_key, value, last_id = decode_cursor(cursor, order_by)
+        if not order_key:
+            return CarroDB.id > last_id
         
-        return stmt
\ No newline at end of file
+        column, direction = ORDER_MAPPING[order_key]
+        after_value = column > value if direction == 'asc' else column < value
+        return or_(after_value, and_(column == value, CarroDB.id > last_id))
@@ -0,0 +1,143 @@
+import threading
+from collections import Counter
+from typing import Dict, Any, Callable, Iterable, Optional, Tuple
+from sqlalchemy import func
+from .models import CarroDB
+
+# Tentativas de agregar sem uma escrita no meio antes de desistir do snapshot consistente
+LOAD_ATTEMPTS = 3
+
+#snapshot das estatisticas do catalogo, mantido em memoria e atualizado a cada escrita
+#a versao persistida no banco denuncia escritas de outros processos
+class CatalogStats:
+    def __init__(self, session_factory: Callable, version_reader: Callable[[], int]):
+        self._session_factory = session_factory
+        self._version_reader = version_reader
+        self._lock = threading.Lock()
+        self._loaded = False
+        # Versão do catálogo que o snapshot reflete (None = desconhecida)
+        self._version: Optional[int] = None
+        self._reset()
+    
+    def _reset(self):
+        self.total = 0
+        self.por_marca = Counter()
+        self.por_combustivel = Counter()
+        self.por_transmissao = Counter()
+        self.soma_precos = 0.0
+        self.preco_min: Optional[float] = None
+        self.preco_max: Optional[float] = None
+        self.ano_min: Optional[int] = None
+        self.ano_max: Optional[int] = None
+    
+    def load(self):
+        """Reconstrói o snapshot com uma única agregação agrupada"""
+        # Mesma versão antes e depois: nenhuma escrita entrou no meio da agregação
+        for _ in range(LOAD_ATTEMPTS):
+            version = self._version_reader()
+            rows = self._aggregate()
+            if self._version_reader() == version:
+                break
+        else:
+            version = None
+        
+        with self._lock:
+            self._reset()
+            for marca, combustivel, transmissao, count, soma, p_min, p_max, a_min, a_max in rows:
+                self.total += count
+                self.por_marca[marca] += count
+                self.por_combustivel[combustivel.value] += count
+                self.por_transmissao[transmissao.value] += count
+                self.soma_precos += float(soma or 0)
+                self.preco_min = p_min if self.preco_min is None else min(self.preco_min, p_min)
+                self.preco_max = p_max if self.preco_max is None else max(self.preco_max, p_max)
+                self.ano_min = a_min if self.ano_min is None else min(self.ano_min, a_min)
+                self.ano_max = a_max if self.ano_max is None else max(self.ano_max, a_max)
+            self._version = version
+            self._loaded = True
+    
+    def _aggregate(self):
+        session = self._session_factory()
+        try:
+            rows = session.query(
+                CarroDB.marca,
+                CarroDB.tipo_combustivel,
+                CarroDB.transmissao,
+                func.count(CarroDB.id),
+                func.sum(CarroDB.preco),
+                func.min(CarroDB.preco),
+                func.max(CarroDB.preco),
+                func.min(CarroDB.ano_fabricacao),
+                func.max(CarroDB.ano_fabricacao)
+            ).group_by(CarroDB.marca, CarroDB.tipo_combustivel, CarroDB.transmissao).all()
+        finally:
+            session.close()
+        return rows
+    
+    def invalidate(self):
+        with self._lock:
+            self._loaded = False
+    
+    def apply(self, version: int, added: Iterable[Tuple] = (), removed: Iterable[Tuple] = ()):
+        """Aplica uma escrita deste processo, que levou o catálogo para `version`"""
+        with self._lock:
+            if not self._loaded or self._version is None or version <= self._version:
+                # Sem snapshot, ou a última recarga já incluiu esta escrita
+                return
+            if version != self._version + 1:
+                # Outro processo escreveu no meio: recarrega na próxima leitura
+                self._loaded = False
+                return
+            for row in removed:
+                if not self._remove(*row):
+                    self._loaded = False
+                    return
+            for row in added:
+                self._add(*row)
+            self._version = version
+    
+    def _add(self, marca: str, combustivel: str, transmissao: str, preco: float, ano: int):
+        self.total += 1
+        self.por_marca[marca] += 1
+        self.por_combustivel[combustivel] += 1
+        self.por_transmissao[transmissao] += 1
+        self.soma_precos += float(preco)
+        self.preco_min = preco if self.preco_min is None else min(self.preco_min, preco)
+        self.preco_max = preco if self.preco_max is None else max(self.preco_max, preco)
+        self.ano_min = ano if self.ano_min is None else min(self.ano_min, ano)
+        self.ano_max = ano if self.ano_max is None else max(self.ano_max, ano)
+    
+    def _remove(self, marca: str, combustivel: str, transmissao: str, preco: float, ano: int) -> bool:
+        # Remover um extremo exige reagregar
+        if preco in (self.preco_min, self.preco_max) or ano in (self.ano_min, self.ano_max):
+            return False
+        self.total -= 1
+        self.soma_precos -= float(preco)
+        for counter, key in ((self.por_marca, marca), (self.por_combustivel, combustivel),
+                             (self.por_transmissao, transmissao)):
+            counter[key] -= 1
+            if counter[key] <= 0:
+                del counter[key]
+        return True
+    
+    def snapshot(self) -> Dict[str, Any]:
+        if not self._loaded or self._version_reader() != self._version:
+            self.load()
+        with self._lock:
+            media = self.soma_precos / self.total if self.total else 0
+            return {
+                "total_carros": self.total,
+                "por_marca": dict(self.por_marca),
+                "por_combustivel": dict(self.por_combustivel),
+                "por_transmissao": dict(self.por_transmissao),
+                "faixa_preco": {
+                    "min": float(self.preco_min) if self.preco_min else 0,
+                    "max": float(self.preco_max) if self.preco_max else 0,
+                    "media": float(media) if media else 0
+                },
+                "faixa_ano": {
+                    "min": self.ano_min if self.ano_min else 0,
+                    "max": self.ano_max if self.ano_max else 0
+                },
+                "marcas": sorted(self.por_marca)
+            }
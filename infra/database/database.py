@@ -1,25 +1,165 @@
 import sys
 import os
+import time
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from sqlalchemy import create_engine
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker
-from .models import Base, CarroDB
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from .models import Base, CarroDB, CatalogVersionDB, NORMALIZED_COLUMNS
+from .catalog_stats import CatalogStats
+from .engine import create_engines
+from .memory_catalog import MemoryCatalog
+from infra.shared.text_utils import normalize_text
 from model.carros import carro
+from model.enums import TipoCombustivel, TipoTransmissao, TipoVeiculo
 from infra.config.settings import settings
 
+# Colunas de enum e o tipo esperado pelo SQLEnum no insert via Core
+ENUM_COLUMNS = {
+    'tipo_combustivel': TipoCombustivel,
+    'transmissao': TipoTransmissao,
+    'tipo_veiculo': TipoVeiculo,
+}
+
+# Marca, modelo e cor se repetem muito: normaliza cada valor uma vez só
+_normalize_cached = lru_cache(maxsize=4096)(normalize_text)
+
+# Em conflito de placa/chassi o upsert preserva o id e a data de cadastro originais
+UPSERT_PRESERVED_COLUMNS = {'id', 'data_cadastro'}
+
 class DatabaseManager:
-    def __init__(self, db_path=None):
+    def __init__(self, db_path=None, profile=None):
         if db_path is None:
             db_path = settings.DATABASE_PATH
-        self.engine = create_engine(f'sqlite:///{db_path}', echo=False)
+        # engine: conexão de escrita; read_engine: pool de leitores (o mesmo no perfil default)
+        self.engine, self.read_engine = create_engines(db_path, profile)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.read_engine)
+        self._fts_enabled = None
+        # Estatísticas do catálogo mantidas a cada escrita
+        self.stats = CatalogStats(self.get_read_session, lambda: self.data_version)
+        # Catálogo colunar opcional (NumPy), criado sob demanda pelo CarRepository
+        self.memory_catalog = None
         
     def create_tables(self):
         Base.metadata.create_all(bind=self.engine)
+        with self.engine.begin() as conn:
+            conn.execute(text("INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 0)"))
+        self._migrate_normalized_columns()
+        self._create_fts_index()
+    
+    @property
+    def data_version(self) -> int:
+        """Versão persistida do catálogo: muda também com escritas de outros processos"""
+        try:
+            with self.read_engine.connect() as conn:
+                return conn.execute(
+                    text("SELECT version FROM catalog_version WHERE id = 1")
+                ).scalar() or 0
+        except OperationalError:
+            # Banco ainda sem create_tables
+            return 0
+    
+    @staticmethod
+    def _bump_version(conn) -> int:
+        """Incrementa a versão dentro da transação de escrita e devolve o novo valor"""
+        conn.execute(text("UPDATE catalog_version SET version = version + 1 WHERE id = 1"))
+        return conn.execute(text("SELECT version FROM catalog_version WHERE id = 1")).scalar() or 0
+    
+    def _migrate_normalized_columns(self):
+        """Adiciona e preenche as colunas normalizadas em bancos criados antes delas"""
+        existing = {column['name'] for column in inspect(self.engine).get_columns(CarroDB.__tablename__)}
+        missing = [column for column in NORMALIZED_COLUMNS if column not in existing]
+        
+        with self.engine.begin() as conn:
+            for column in missing:
+                length = CarroDB.__table__.c[column].type.length
+                conn.execute(text(f"ALTER TABLE carros ADD COLUMN {column} VARCHAR({length})"))
+            
+            rows = conn.execute(text("SELECT id, marca, modelo, cor FROM carros")).all() if missing else []
+            if rows:
+                conn.execute(
+                    text("UPDATE carros SET marca_norm = :marca, modelo_norm = :modelo, cor_norm = :cor WHERE id = :id"),
+                    [
+                        {"id": row.id, "marca": normalize_text(row.marca),
+                         "modelo": normalize_text(row.modelo), "cor": normalize_text(row.cor)}
+                        for row in rows
+                    ]
+                )
+        
+        # create_all não cria índices novos em tabelas que já existem
+        for index in CarroDB.__table__.indexes:
+            index.create(bind=self.engine, checkfirst=True)
+    
+    def _create_fts_index(self):
+        """Tabela FTS5 para buscas textuais aproximadas, mantida por triggers"""
+        try:
+            with self.engine.begin() as conn:
+                exists = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE name = 'carros_fts'")
+                ).first()
+                conn.execute(text(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS carros_fts USING fts5("
+                    "marca, modelo, cor, content='carros', content_rowid='id', "
+                    "tokenize='unicode61 remove_diacritics 2')"
+                ))
+                conn.execute(text(
+                    "CREATE TRIGGER IF NOT EXISTS carros_fts_ai AFTER INSERT ON carros BEGIN "
+                    "INSERT INTO carros_fts(rowid, marca, modelo, cor) VALUES (new.id, new.marca, new.modelo, new.cor); END"
+                ))
+                conn.execute(text(
+                    "CREATE TRIGGER IF NOT EXISTS carros_fts_ad AFTER DELETE ON carros BEGIN "
+                    "INSERT INTO carros_fts(carros_fts, rowid, marca, modelo, cor) "
+                    "VALUES ('delete', old.id, old.marca, old.modelo, old.cor); END"
+                ))
+                conn.execute(text(
+                    "CREATE TRIGGER IF NOT EXISTS carros_fts_au AFTER UPDATE ON carros BEGIN "
+                    "INSERT INTO carros_fts(carros_fts, rowid, marca, modelo, cor) "
+                    "VALUES ('delete', old.id, old.marca, old.modelo, old.cor); "
+                    "INSERT INTO carros_fts(rowid, marca, modelo, cor) VALUES (new.id, new.marca, new.modelo, new.cor); END"
+                ))
+                if not exists:
+                    conn.execute(text("INSERT INTO carros_fts(carros_fts) VALUES ('rebuild')"))
+            self._fts_enabled = True
+        except OperationalError:
+            # SQLite compilado sem FTS5: buscas textuais usam prefixo nas colunas normalizadas
+            self._fts_enabled = False
+        
+    @property
+    def fts_enabled(self) -> bool:
+        if self._fts_enabled is None:
+            try:
+                with self.engine.connect() as conn:
+                    self._fts_enabled = conn.execute(
+                        text("SELECT 1 FROM sqlite_master WHERE name = 'carros_fts'")
+                    ).first() is not None
+            except OperationalError:
+                self._fts_enabled = False
+        return self._fts_enabled
         
     def get_session(self):
         return self.SessionLocal()
+    
+    def enable_memory_catalog(self):
+        if self.memory_catalog is None:
+            self.memory_catalog = MemoryCatalog(self.get_read_session, lambda: self.data_version)
+        return self.memory_catalog
+    
+    def _notify_memory_catalog(self, version, appended):
+        if self.memory_catalog is not None:
+            if appended:
+                self.memory_catalog.mark_appended(version)
+            else:
+                self.memory_catalog.invalidate()
+    
+    def get_read_session(self):
+        """Sessão somente leitura, que não disputa a conexão de escrita"""
+        return self.ReadSessionLocal()
         
     def insert_carros(self, carros_list):
         session = self.get_session()
@@ -46,8 +186,13 @@ class DatabaseManager:
                 )
                 carros_db.append(carro_db)
             
+            # Valores lidos antes do commit, que expira os objetos
+            stats_rows = [self._stats_values(carro_db) for carro_db in carros_db]
             session.add_all(carros_db)
+            version = self._bump_version(session)
             session.commit()
+            self._notify_memory_catalog(version, appended=True)
+            self.stats.apply(version, added=stats_rows)
             return len(carros_db)
             
         except Exception as e:
@@ -55,23 +200,172 @@ class DatabaseManager:
             raise e
         finally:
             session.close()
+    
+    def bulk_insert_carros(self, carros, chunk_size=None, upsert=False, defer_indexes=False):
+        """Insere em lotes com insert() executemany, consumindo iteradores sem materializá-los
+        
+        Aceita objetos carro ou dicts já no formato das colunas. upsert=True atualiza o
+        carro existente quando placa ou chassi já estão cadastrados; defer_indexes=True
+        remove os índices secundários durante a carga e os recria no final.
+        """
+        chunk_size = chunk_size or settings.BULK_INSERT_CHUNK_SIZE
+        stmt = self._bulk_insert_statement(upsert)
+        iterator = iter(carros)
+        total = 0
+        start = time.perf_counter()
+        
+        if defer_indexes:
+            for index in CarroDB.__table__.indexes:
+                index.drop(bind=self.engine, checkfirst=True)
+        try:
+            while True:
+                rows = [self._carro_row(item) for item in islice(iterator, chunk_size)]
+                if not rows:
+                    break
+                
+                with self.engine.begin() as conn:
+                    conn.execute(stmt, rows)
+                    version = self._bump_version(conn)
+                total += len(rows)
+                self._notify_memory_catalog(version, appended=not upsert)
+                if not upsert:
+                    self.stats.apply(version, added=[
+                        (row['marca'], row['tipo_combustivel'].value, row['transmissao'].value,
+                         row['preco'], row['ano_fabricacao'])
+                        for row in rows
+                    ])
+        finally:
+            if defer_indexes:
+                for index in CarroDB.__table__.indexes:
+                    index.create(bind=self.engine, checkfirst=True)
+            if upsert:
+                # Não dá para separar inserções de atualizações: reagrega na próxima leitura
+                self.stats.invalidate()
+        
+        elapsed = time.perf_counter() - start
+        return {
+            "total": total,
+            "segundos": round(elapsed, 3),
+            "linhas_por_segundo": round(total / elapsed) if elapsed > 0 else total
+        }
+    
+    @staticmethod
+    def _bulk_insert_statement(upsert):
+        table = CarroDB.__table__
+        if not upsert:
+            return table.insert()
+        
+        stmt = sqlite_insert(table)
+        # Várias cláusulas ON CONFLICT exigem SQLite 3.35+
+        for key in ('placa', 'chassi'):
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[key],
+                set_={
+                    column.name: stmt.excluded[column.name]
+                    for column in table.columns
+                    if column.name not in UPSERT_PRESERVED_COLUMNS | {key}
+                }
+            )
+        return stmt
+    
+    @staticmethod
+    def _carro_row(item):
+        if isinstance(item, dict):
+            row = dict(item)
+        else:
+            row = {
+                'marca': item.marca,
+                'modelo': item.modelo,
+                'ano_fabricacao': item.ano,
+                'ano_modelo': item.ano_modelo,
+                'motorizacao': item.motorizacao,
+                'tipo_combustivel': item.tipo_combustivel,
+                'transmissao': item.transmissao,
+                'numero_portas': item.numero_portas,
+                'tipo_veiculo': item.tipo_veiculo,
+                'quilometragem': item.quilometragem,
+                'cor': item.cor,
+                'preco': item.preco,
+                'placa': item.placa,
+                'chassi': item.chassi,
+                'data_cadastro': item.data_cadastro,
+                'data_ultima_revisao': item.data_ultima_revisao
+            }
+        
+        for column, enum_type in ENUM_COLUMNS.items():
+            if not isinstance(row[column], enum_type):
+                row[column] = enum_type(row[column])
+        for norm_column, source in NORMALIZED_COLUMNS.items():
+            row[norm_column] = _normalize_cached(row[source])
+        # executemany compila a partir das chaves da primeira linha: todas precisam das mesmas
+        row['data_cadastro'] = row.get('data_cadastro') or datetime.now()
+        row.setdefault('data_ultima_revisao', None)
+        return row
+    
+    def delete_carros(self, car_ids):
+        session = self.get_session()
+        try:
+            carros_db = session.query(CarroDB).filter(CarroDB.id.in_(car_ids)).all()
+            stats_rows = [self._stats_values(carro_db) for carro_db in carros_db]
+            for carro_db in carros_db:
+                session.delete(carro_db)
+            version = self._bump_version(session)
+            session.commit()
+            self._notify_memory_catalog(version, appended=False)
+            self.stats.apply(version, removed=stats_rows)
+            return len(carros_db)
             
-    def get_all_carros(self):
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def update_carro(self, car_id, **changes):
         session = self.get_session()
+        try:
+            carro_db = session.query(CarroDB).filter(CarroDB.id == car_id).first()
+            if not carro_db:
+                raise ValueError(f"Carro com ID {car_id} não encontrado")
+            
+            old_row = self._stats_values(carro_db)
+            for field, value in changes.items():
+                setattr(carro_db, field, value)
+            new_row = self._stats_values(carro_db)
+            version = self._bump_version(session)
+            session.commit()
+            self._notify_memory_catalog(version, appended=False)
+            self.stats.apply(version, added=[new_row], removed=[old_row])
+            return car_id
+            
+        except Exception as e:
+            session.rollback()
+            self.stats.invalidate()
+            raise e
+        finally:
+            session.close()
+    
+    @staticmethod
+    def _stats_values(carro_db):
+        return (carro_db.marca, carro_db.tipo_combustivel.value, carro_db.transmissao.value,
+                carro_db.preco, carro_db.ano_fabricacao)
+            
+    def get_all_carros(self):
+        session = self.get_read_session()
         try:
             return session.query(CarroDB).all()
         finally:
             session.close()
             
     def get_carros_by_marca(self, marca):
-        session = self.get_session()
+        session = self.get_read_session()
         try:
             return session.query(CarroDB).filter(CarroDB.marca == marca).all()
         finally:
             session.close()
             
     def get_carros_by_preco_range(self, preco_min, preco_max):
-        session = self.get_session()
+        session = self.get_read_session()
         try:
             return session.query(CarroDB).filter(
                 CarroDB.preco >= preco_min,
@@ -81,28 +375,28 @@ class DatabaseManager:
             session.close()
             
     def get_carros_by_ano(self, ano):
-        session = self.get_session()
+        session = self.get_read_session()
         try:
             return session.query(CarroDB).filter(CarroDB.ano_fabricacao == ano).all()
         finally:
             session.close()
             
     def count_carros(self):
-        session = self.get_session()
+        session = self.get_read_session()
         try:
             return session.query(CarroDB).count()
         finally:
             session.close()
             
     def search_by_placa(self, placa):
-        session = self.get_session()
+        session = self.get_read_session()
         try:
             return session.query(CarroDB).filter(CarroDB.placa == placa).first()
         finally:
             session.close()
             
     def search_by_chassi(self, chassi):
-        session = self.get_session()
+        session = self.get_read_session()
         try:
             return session.query(CarroDB).filter(CarroDB.chassi == chassi).first()
         finally:
@@ -139,6 +433,9 @@ class DatabaseManager:
         
         for column in columns:
             column_name = column.name
+            # Colunas normalizadas são internas da busca
+            if column_name in NORMALIZED_COLUMNS:
+                continue
             friendly_name = friendly_names.get(column_name, column_name)
             
             # tipo da coluna de forma simples
@@ -0,0 +1,69 @@
+from typing import Dict, Any, Tuple
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import StaticPool
+from infra.config.settings import settings
+
+# Perfis de engine selecionados por settings.DB_ENGINE_PROFILE
+ENGINE_PROFILES = {
+    # Comportamento original: um único engine, journal em rollback
+    "default": {"tuned": False},
+    # WAL com pool de leitores separado de uma única conexão de escrita:
+    # buscas não esperam a ingestão e as escritas se serializam no processo
+    "concurrent": {"tuned": True},
+}
+
+
+def sqlite_pragmas() -> Dict[str, Any]:
+    return {
+        "synchronous": settings.DB_SYNCHRONOUS,
+        "mmap_size": settings.DB_MMAP_SIZE,
+        # Negativo = tamanho em KiB em vez de páginas
+        "cache_size": -settings.DB_CACHE_SIZE_KB,
+        "temp_store": "MEMORY",
+    }
+
+
+def _on_connect(engine: Engine, pragmas: Dict[str, Any]):
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def create_engines(db_path: str, profile: str = None) -> Tuple[Engine, Engine]:
+    """Retorna (engine de escrita, engine de leitura); no perfil default são o mesmo"""
+    profile = profile or settings.DB_ENGINE_PROFILE
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Perfil de engine desconhecido: {profile}")
+
+    url = f'sqlite:///{db_path}'
+    connect_args = {"timeout": settings.DB_BUSY_TIMEOUT, "check_same_thread": False}
+
+    # Banco em memória só existe dentro da própria conexão: uma única, compartilhada entre
+    # as threads do pool de execução, sem separar leitores
+    if db_path == ":memory:":
+        engine = create_engine(url, echo=False, connect_args=connect_args, poolclass=StaticPool)
+        return engine, engine
+
+    if not ENGINE_PROFILES[profile]["tuned"]:
+        engine = create_engine(url, echo=False, connect_args={"timeout": settings.DB_BUSY_TIMEOUT})
+        return engine, engine
+
+    writer = create_engine(
+        url, echo=False, connect_args=connect_args,
+        pool_size=1, max_overflow=0, pool_timeout=settings.DB_BUSY_TIMEOUT
+    )
+    _on_connect(writer, {"journal_mode": "WAL", **sqlite_pragmas()})
+    # O modo WAL fica gravado no arquivo: ativa antes de abrir os leitores
+    with writer.connect():
+        pass
+
+    reader = create_engine(
+        url, echo=False, connect_args=connect_args,
+        pool_size=settings.DB_READER_POOL_SIZE, max_overflow=0
+    )
+    _on_connect(reader, {**sqlite_pragmas(), "query_only": "ON"})
+    return writer, reader
@@ -0,0 +1,304 @@
+import re
+import threading
+from typing import Dict, Any, Callable, List, Optional
+from sqlalchemy import select
+from .models import CarroDB
+from .catalog_stats import LOAD_ATTEMPTS
+from .car_filters import CarFilters, PAGINATION_FIELDS, ORDER_MAPPING, encode_cursor, decode_cursor
+from .response_models import CarResponse, SearchResponse
+from infra.shared.text_utils import normalize_text
+from model.enums import TipoCombustivel, TipoTransmissao, TipoVeiculo
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: sem ele o repositório busca só via SQL
+    np = None
+
+# Colunas com dicionário de valores: cada linha guarda só o código
+TEXT_COLUMNS = ('marca', 'modelo', 'cor')
+ENUM_TYPES = {
+    'tipo_combustivel': TipoCombustivel,
+    'transmissao': TipoTransmissao,
+    'tipo_veiculo': TipoVeiculo,
+}
+NUMERIC_COLUMNS = {
+    'id': 'int64',
+    'ano_fabricacao': 'int32',
+    'ano_modelo': 'int32',
+    'quilometragem': 'int64',
+    'preco': 'float64',
+    'numero_portas': 'int16',
+}
+# Usadas só para montar a resposta, guardadas como listas
+ROW_COLUMNS = ('placa', 'chassi', 'motorizacao', 'data_cadastro', 'data_ultima_revisao')
+
+# Campo do filtro -> coluna enum
+ENUM_FILTERS = {'combustivel': 'tipo_combustivel', 'transmissao': 'transmissao', 'tipo_veiculo': 'tipo_veiculo'}
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+class _Dictionary:
+    """Valores distintos de uma coluna de texto, com forma normalizada e palavras"""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.norms: List[str] = []
+        self.tokens: List[List[str]] = []
+        self._codes: Dict[str, int] = {}
+
+    def encode(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            norm = normalize_text(value)
+            self.values.append(value)
+            self.norms.append(norm)
+            self.tokens.append(TOKEN_PATTERN.findall(norm))
+        return code
+
+    def lookup(self, predicate: Callable[[int], bool]):
+        """Tabela código -> bool para indexar o array de códigos"""
+        # Um tamanho só: _build pode acrescentar valores em outra thread durante o laço
+        size = len(self.values)
+        table = np.zeros(max(size, 1), dtype=bool)
+        for code in range(size):
+            table[code] = predicate(code)
+        return table
+
+
+class _Columns:
+    """Snapshot imutável das colunas; trocado por inteiro a cada sincronização"""
+
+    def __init__(self, numeric, codes, rows, dictionaries, size):
+        self.numeric = numeric
+        self.codes = codes
+        self.rows = rows
+        # Dicionários só crescem; um recarregamento completo cria novos
+        self.dictionaries = dictionaries
+        self.size = size
+
+
+#catalogo em memoria, em colunas numpy, para buscas por filtro sem passar pelo ORM
+class MemoryCatalog:
+    def __init__(self, session_factory: Callable, version_reader: Callable[[], int]):
+        if np is None:
+            raise ImportError("NumPy não está instalado: o catálogo em memória não está disponível")
+        self._session_factory = session_factory
+        self._version_reader = version_reader
+        self._lock = threading.Lock()
+        self._columns: Optional[_Columns] = None
+        # Versão persistida que as colunas refletem e a que se chega só com inserções deste processo
+        self._version: Optional[int] = None
+        self._appended_version: Optional[int] = None
+        self._enum_members = {column: list(enum_cls) for column, enum_cls in ENUM_TYPES.items()}
+
+    def invalidate(self):
+        """Atualizações e remoções: recarrega tudo na próxima busca"""
+        with self._lock:
+            self._columns = None
+
+    def mark_appended(self, version: int):
+        """Inserções deste processo: na próxima busca só as linhas novas (id maior) são lidas"""
+        with self._lock:
+            if self._columns is None or self._appended_version is None or version <= self._appended_version:
+                # Sem colunas, ou a última recarga já incluiu esta escrita
+                return
+            if version == self._appended_version + 1:
+                self._appended_version = version
+            else:
+                # Outro processo escreveu no meio: não dá para saber o que mudou
+                self._columns = None
+
+    def _sync(self) -> _Columns:
+        with self._lock:
+            current = self._version_reader()
+            if self._columns is None or current != self._appended_version:
+                self._reload()
+            elif self._appended_version != self._version:
+                last_id = int(self._columns.numeric['id'][-1]) if self._columns.size else 0
+                rows = self._fetch(after_id=last_id)
+                if rows:
+                    self._columns = self._build(rows, previous=self._columns)
+                self._version = self._appended_version
+            return self._columns
+
+    def _reload(self):
+        # Mesma versão antes e depois da leitura: nenhuma escrita entrou no meio
+        for _ in range(LOAD_ATTEMPTS):
+            version = self._version_reader()
+            rows = self._fetch()
+            if self._version_reader() == version:
+                break
+        else:
+            version = None
+        self._columns = self._build(rows, previous=None)
+        self._version = self._appended_version = version
+
+    def _fetch(self, after_id: Optional[int] = None):
+        table = CarroDB.__table__
+        stmt = select(table).order_by(table.c.id)
+        if after_id is not None:
+            stmt = stmt.where(table.c.id > after_id)
+        session = self._session_factory()
+        try:
+            return session.execute(stmt).all()
+        finally:
+            session.close()
+
+    def _build(self, rows, previous: Optional[_Columns]) -> _Columns:
+        if previous is not None:
+            dictionaries = previous.dictionaries
+        else:
+            dictionaries = {column: _Dictionary() for column in TEXT_COLUMNS}
+        numeric = {
+            column: np.fromiter((getattr(row, column) for row in rows), dtype=dtype, count=len(rows))
+            for column, dtype in NUMERIC_COLUMNS.items()
+        }
+        codes = {
+            column: np.fromiter((dictionaries[column].encode(getattr(row, column)) for row in rows),
+                                dtype='int32', count=len(rows))
+            for column in TEXT_COLUMNS
+        }
+        for column in ENUM_TYPES:
+            index = {member: code for code, member in enumerate(self._enum_members[column])}
+            codes[column] = np.fromiter((index[getattr(row, column)] for row in rows), dtype='int8', count=len(rows))
+        row_values = {column: [getattr(row, column) for row in rows] for column in ROW_COLUMNS}
+
+        if previous is not None:
+            # Ids só crescem: acrescentar no fim mantém a ordem por id
+            numeric = {column: np.concatenate((previous.numeric[column], values)) for column, values in numeric.items()}
+            codes = {column: np.concatenate((previous.codes[column], values)) for column, values in codes.items()}
+            row_values = {column: previous.rows[column] + values for column, values in row_values.items()}
+            return _Columns(numeric, codes, row_values, dictionaries, previous.size + len(rows))
+        return _Columns(numeric, codes, row_values, dictionaries, len(rows))
+
+    def search(self, car_filters: CarFilters) -> SearchResponse:
+        columns = self._sync()
+        mask = np.ones(columns.size, dtype=bool)
+        for field, value in car_filters.dict(exclude_none=True, exclude=PAGINATION_FIELDS).items():
+            mask &= self._field_mask(columns, field, value)
+        total_count = int(np.count_nonzero(mask))
+
+        order_key = car_filters.order_by if car_filters.order_by in ORDER_MAPPING else None
+        if car_filters.cursor:
+            mask &= self._cursor_mask(columns, car_filters.cursor, car_filters.order_by)
+            start = 0
+        else:
+            start = car_filters.offset
+
+        # Uma linha a mais para saber se há próxima página
+        page = self._page(columns, np.flatnonzero(mask), order_key, start, start + car_filters.limit + 1)
+        next_cursor = None
+        if len(page) > car_filters.limit:
+            page = page[:car_filters.limit]
+            last = page[-1]
+            value = columns.numeric[ORDER_MAPPING[order_key][0].key][last].item() if order_key else None
+            next_cursor = encode_cursor(order_key, value, int(columns.numeric['id'][last]))
+
+        carros = [self._car_response(columns, index) for index in page]
+        return SearchResponse(
+            total_encontrados=total_count,
+            total_exibidos=len(carros),
+            offset=car_filters.offset,
+            limit=car_filters.limit,
+            carros=carros,
+            total_exato=True,
+            next_cursor=next_cursor
+        )
+
+    def _field_mask(self, columns: _Columns, field: str, value):
+        if field in TEXT_COLUMNS:
+            # Mesmo critério de prefix_match nas colunas normalizadas
+            prefix = normalize_text(value)
+            dictionary = columns.dictionaries[field]
+            return dictionary.lookup(lambda code: dictionary.norms[code].startswith(prefix))[columns.codes[field]]
+        if field == 'texto':
+            return self._text_mask(columns, value)
+        if field in ENUM_FILTERS:
+            column = ENUM_FILTERS[field]
+            member = ENUM_TYPES[column](value)
+            return columns.codes[column] == self._enum_members[column].index(member)
+
+        comparisons = {
+            'ano_min': lambda: columns.numeric['ano_fabricacao'] >= value,
+            'ano_max': lambda: columns.numeric['ano_fabricacao'] <= value,
+            'preco_min': lambda: columns.numeric['preco'] >= value,
+            'preco_max': lambda: columns.numeric['preco'] <= value,
+            'numero_portas': lambda: columns.numeric['numero_portas'] == value,
+        }
+        if field in comparisons:
+            return comparisons[field]()
+        return np.ones(columns.size, dtype=bool)
+
+    def _text_mask(self, columns: _Columns, value: str):
+        """Como o FTS5: cada termo deve ser prefixo de alguma palavra de marca, modelo ou cor"""
+        mask = np.ones(columns.size, dtype=bool)
+        for term in TOKEN_PATTERN.findall(normalize_text(value)):
+            term_mask = np.zeros(columns.size, dtype=bool)
+            for column in TEXT_COLUMNS:
+                dictionary = columns.dictionaries[column]
+                table = dictionary.lookup(lambda code: any(token.startswith(term) for token in dictionary.tokens[code]))
+                term_mask |= table[columns.codes[column]]
+            mask &= term_mask
+        return mask
+
+    def _cursor_mask(self, columns: _Columns, cursor: str, order_by: Optional[str]):
+        order_key, value, last_id = decode_cursor(cursor, order_by)
+        ids = columns.numeric['id']
+        if not order_key:
+            return ids > last_id
+
+        column, direction = ORDER_MAPPING[order_key]
+        values = columns.numeric[column.key]
+        after_value = values > value if direction == 'asc' else values < value
+        return after_value | ((values == value) & (ids > last_id))
+
+    def _page(self, columns: _Columns, selected, order_key: Optional[str], start: int, stop: int):
+        # Índices de flatnonzero já estão em ordem de id
+        if not order_key or len(selected) == 0:
+            return selected[start:stop]
+
+        column, direction = ORDER_MAPPING[order_key]
+        keys = columns.numeric[column.key][selected]
+        if direction == 'desc':
+            keys = -keys
+
+        if stop < len(selected):
+            # argpartition: só os candidatos até a última posição da página são ordenados,
+            # incluindo os empates no limite para o desempate por id continuar correto
+            threshold = np.partition(keys, stop - 1)[stop - 1]
+            candidates = np.flatnonzero(keys <= threshold)
+        else:
+            candidates = np.arange(len(selected))
+
+        order = candidates[np.lexsort((columns.numeric['id'][selected][candidates], keys[candidates]))]
+        return selected[order[start:stop]]
+
+    def _car_response(self, columns: _Columns, index: int) -> CarResponse:
+        numeric = columns.numeric
+        text = {column: columns.dictionaries[column].values[columns.codes[column][index]] for column in TEXT_COLUMNS}
+        enums = {column: self._enum_members[column][columns.codes[column][index]].value for column in ENUM_TYPES}
+        return CarResponse(
+            id=int(numeric['id'][index]),
+            marca=text['marca'],
+            modelo=text['modelo'],
+            ano=int(numeric['ano_fabricacao'][index]),
+            ano_modelo=int(numeric['ano_modelo'][index]),
+            cor=text['cor'],
+            quilometragem=int(numeric['quilometragem'][index]),
+            preco=float(numeric['preco'][index]),
+            combustivel=enums['tipo_combustivel'],
+            transmissao=enums['transmissao'],
+            placa=columns.rows['placa'][index],
+            numero_portas=int(numeric['numero_portas'][index]),
+            motorizacao=columns.rows['motorizacao'][index],
+            tipo_veiculo=enums['tipo_veiculo'],
+            chassi=columns.rows['chassi'][index],
+            data_cadastro=columns.rows['data_cadastro'][index],
+            data_ultima_revisao=columns.rows['data_ultima_revisao'][index]
+        )
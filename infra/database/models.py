@@ -1,13 +1,27 @@
 from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Enum as SQLEnum, Index
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, validates
 from datetime import datetime
+from infra.shared.text_utils import normalize_text
 
 # Importar os Enums do modelo existente
 from model.enums import TipoCombustivel, TipoTransmissao, TipoVeiculo
 
 Base = declarative_base()
 
+# Colunas canônicas (minúsculas, sem acento) usadas nas buscas por índice
+NORMALIZED_COLUMNS = {
+    'marca_norm': 'marca',
+    'modelo_norm': 'modelo',
+    'cor_norm': 'cor',
+}
+
+def _normalized_default(source: str):
+    # Também vale para inserts em lote via Core, que não passam pelo ORM
+    def default(context):
+        return normalize_text(context.get_current_parameters()[source])
+    return default
+
 class CarroDB(Base):
     __tablename__ = 'carros'
     
@@ -28,6 +42,14 @@ class CarroDB(Base):
     chassi = Column(String(20), unique=True, nullable=False)
     data_cadastro = Column(DateTime, default=datetime.now)
     data_ultima_revisao = Column(DateTime, nullable=True)
+    marca_norm = Column(String(50), nullable=True, default=_normalized_default('marca'))
+    modelo_norm = Column(String(100), nullable=True, default=_normalized_default('modelo'))
+    cor_norm = Column(String(30), nullable=True, default=_normalized_default('cor'))
+    
+    @validates('marca', 'modelo', 'cor')
+    def _sync_normalized(self, key, value):
+        setattr(self, f"{key}_norm", normalize_text(value) if value is not None else None)
+        return value
     
     def __repr__(self):
         return f"<Carro(marca='{self.marca}', modelo='{self.modelo}', ano={self.ano_fabricacao})>"
@@ -36,4 +58,15 @@ class CarroDB(Base):
     __table_args__ = (
         Index('idx_marca_modelo', 'marca', 'modelo'),
         Index('idx_preco_ano', 'preco', 'ano_fabricacao'),
-    )
\ No newline at end of file
+        Index('idx_marca_modelo_norm', 'marca_norm', 'modelo_norm'),
+        Index('idx_cor_norm', 'cor_norm'),
+        Index('idx_combustivel_transmissao_preco', 'tipo_combustivel', 'transmissao', 'preco'),
+    )
+
+class CatalogVersionDB(Base):
+    """Linha única com a versão do catálogo, visível para todos os processos que usam o arquivo"""
+    __tablename__ = 'catalog_version'
+    
+    id = Column(Integer, primary_key=True)
+    # Incrementada na mesma transação de cada escrita em carros
+    version = Column(Integer, nullable=False, default=0)
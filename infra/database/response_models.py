@@ -58,6 +58,12 @@ class SearchResponse(BaseModel):
     offset: int
     limit: int
     carros: List[CarResponse]
+    total_exato: bool = True
+    next_cursor: Optional[str] = None
+
+class CarsByIdsResponse(BaseModel):
+    carros: List[CarResponse]
+    nao_encontrados: List[int] = []
 
 class StatsResponse(BaseModel):
     total_carros: int
@@ -1,13 +1,23 @@
-from .text_utils import sanitize_text
+from .text_utils import sanitize_text, normalize_text
 from .formatters import (
     format_price_range,
     format_car_summary,
-    format_car_detailed
+    format_car_detailed,
+    format_cars_table
 )
+from .response_cache import ResponseCache
+from .conversation_memory import ConversationMemory
+from .tokens import count_tokens, count_message_tokens
 
 __all__ = [
     'sanitize_text',
+    'normalize_text',
     'format_price_range',
     'format_car_summary',
-    'format_car_detailed'
+    'format_car_detailed',
+    'format_cars_table',
+    'ResponseCache',
+    'ConversationMemory',
+    'count_tokens',
+    'count_message_tokens'
 ]
\ No newline at end of file
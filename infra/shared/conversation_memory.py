@@ -0,0 +1,99 @@
+import re
+from collections import deque
+from typing import Dict, Iterator, List, Optional
+from infra.config.settings import settings
+from infra.config.prompts import Prompts
+from .text_utils import sanitize_text
+from .tokens import count_tokens, truncate_to_tokens, MESSAGE_OVERHEAD
+
+ROLE_LABELS = {"user": "Usuário", "assistant": "Assistente"}
+
+# Primeira frase (ou linha) de uma mensagem, usada no resumo
+FIRST_SENTENCE = re.compile(r'^(.+?[.!?:])(?:\s|$)', re.S)
+
+
+class ConversationMemory:
+    """Histórico da conversa com orçamento de tokens
+
+    As mensagens recentes ficam em um buffer circular, já sanitizadas e com
+    a contagem de tokens calculada uma única vez. As que saem do buffer viram
+    uma linha no resumo da conversa, que também tem tamanho limitado.
+    Se comporta como a lista de mensagens para quem só faz append/iteração.
+    """
+
+    def __init__(self, max_messages: Optional[int] = None, max_tokens: Optional[int] = None,
+                 summary_tokens: Optional[int] = None):
+        self.max_messages = max_messages or settings.MAX_HISTORY_MESSAGES
+        self.max_tokens = max_tokens or settings.HISTORY_TOKEN_BUDGET
+        self.summary_tokens = summary_tokens if summary_tokens is not None else settings.HISTORY_SUMMARY_TOKENS
+        self._messages: deque = deque()
+        self._tokens = 0
+        self._summary: deque = deque()
+        self._summary_tokens = 0
+
+    def append(self, message: Dict[str, str]):
+        # Uma mensagem sozinha nunca passa do orçamento inteiro
+        content = truncate_to_tokens(sanitize_text(message["content"]), self.max_tokens)
+        tokens = count_tokens(content) + MESSAGE_OVERHEAD
+        self._messages.append({"role": message["role"], "content": content, "tokens": tokens})
+        self._tokens += tokens
+        self._compact()
+
+    def add(self, role: str, content: str):
+        self.append({"role": role, "content": content})
+
+    def clear(self):
+        self._messages.clear()
+        self._summary.clear()
+        self._tokens = self._summary_tokens = 0
+
+    def _compact(self):
+        while len(self._messages) > 1 and (
+            len(self._messages) > self.max_messages or self._tokens > self.max_tokens
+        ):
+            oldest = self._messages.popleft()
+            self._tokens -= oldest["tokens"]
+            self._summarize(oldest)
+
+    def _summarize(self, message: Dict[str, str]):
+        """Resumo extrativo: a primeira frase de cada mensagem, sem chamar o modelo"""
+        if self.summary_tokens <= 0:
+            return
+        first_line = message["content"].strip().split("\n", 1)[0]
+        match = FIRST_SENTENCE.match(first_line)
+        text = truncate_to_tokens(match.group(1) if match else first_line, 40)
+        line = f"- {ROLE_LABELS.get(message['role'], message['role'])}: {text}"
+        tokens = count_tokens(line) + 1
+
+        self._summary.append((line, tokens))
+        self._summary_tokens += tokens
+        # Resumo rolante: as linhas mais antigas saem primeiro
+        while self._summary and self._summary_tokens > self.summary_tokens:
+            _, dropped = self._summary.popleft()
+            self._summary_tokens -= dropped
+
+    @property
+    def summary(self) -> str:
+        return "\n".join(line for line, _ in self._summary)
+
+    @property
+    def token_count(self) -> int:
+        return self._tokens + self._summary_tokens
+
+    def prompt_messages(self) -> List[Dict[str, str]]:
+        """Mensagens prontas para o prompt: resumo (se houver) e as recentes"""
+        messages = []
+        if self._summary:
+            messages.append({"role": "system", "content": Prompts.CONVERSATION_SUMMARY.format(summary=self.summary)})
+        messages.extend({"role": msg["role"], "content": msg["content"]} for msg in self._messages)
+        return messages
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        return ({"role": msg["role"], "content": msg["content"]} for msg in self._messages)
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __getitem__(self, index):
+        messages = list(self)
+        return messages[index]
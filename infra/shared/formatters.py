@@ -56,4 +56,29 @@ def format_car_detailed(car: Dict[str, Any], index: int) -> str:
    • Placa: {car['placa']}
    • Chassi: {car.get('chassi', 'N/A')}
    • Data de cadastro: {data_cadastro_formatada}
-   • Última revisão: {ultima_revisao_formatada}"""
\ No newline at end of file
+   • Última revisão: {ultima_revisao_formatada}"""
+
+# Cabeçalhos curtos da tabela compacta (campo do CarResponse -> coluna)
+TABLE_COLUMNS = {
+    'marca': 'marca', 'modelo': 'modelo', 'ano': 'ano', 'preco': 'preco',
+    'cor': 'cor', 'quilometragem': 'km', 'combustivel': 'combustivel',
+    'transmissao': 'cambio', 'numero_portas': 'portas', 'motorizacao': 'motor',
+    'tipo_veiculo': 'tipo', 'ano_modelo': 'ano_modelo', 'placa': 'placa',
+    'chassi': 'chassi', 'data_ultima_revisao': 'revisao',
+}
+
+def _table_value(field: str, value: Any) -> str:
+    if value is None or value == '':
+        return '-'
+    if field == 'preco':
+        return f"{value:.0f}" if float(value).is_integer() else f"{value:.2f}"
+    if field == 'data_ultima_revisao':
+        return str(value)[:10]
+    return str(value).replace(';', ',').replace('\n', ' ')
+
+#tabela compacta para o prompt: cabeçalho + uma linha por carro, campos separados por ;
+def format_cars_table(cars: List[Dict[str, Any]], fields: List[str], positions: List[int]) -> str:
+    lines = [';'.join(['n'] + [TABLE_COLUMNS[field] for field in fields])]
+    for position, car in zip(positions, cars):
+        lines.append(';'.join([str(position)] + [_table_value(field, car.get(field)) for field in fields]))
+    return '\n'.join(lines)
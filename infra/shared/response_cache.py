@@ -0,0 +1,145 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+from .text_utils import normalize_text
+
+# A cada quantas escritas as linhas vencidas são apagadas do disco
+PRUNE_EVERY_WRITES = 256
+
+#cache de respostas do LLM com LRU + TTL em memoria e, opcionalmente, SQLite em disco
+class ResponseCache:
+    def __init__(self, max_size: int = 512, ttl_seconds: float = 3600, db_path: Optional[str] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        
+        self._db = None
+        self._writes_since_prune = 0
+        # A conexão SQLite é usada a partir de threads (aget/aset): uma operação por vez
+        self._db_lock = threading.Lock()
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
+            self.prune_expired()
+    
+    @staticmethod
+    def make_key(model: str, temperature: float, messages: List[Dict[str, str]]) -> str:
+        """Chave estável a partir do modelo, temperatura e mensagens normalizadas"""
+        normalized = [[msg["role"], normalize_text(msg["content"])] for msg in messages]
+        payload = json.dumps([model, temperature, normalized], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        value = self._get_from_memory(key, now)
+        if value is None and self._db is not None:
+            value = self._promote(key, self._read_from_db(key), now)
+        return self._count(value)
+    
+    def set(self, key: str, value: str):
+        expires_at = time.time() + self.ttl_seconds
+        self._store_in_memory(key, value, expires_at)
+        if self._db is not None:
+            self._write_to_db(key, value, expires_at)
+    
+    # Versões para o event loop: a memória é consultada direto e o SQLite roda em uma thread,
+    # para uma escrita em disco não travar as outras sessões
+    async def aget(self, key: str) -> Optional[str]:
+        now = time.time()
+        value = self._get_from_memory(key, now)
+        if value is None and self._db is not None:
+            # Só a leitura vai para a thread; o dicionário em memória fica no event loop
+            value = self._promote(key, await asyncio.to_thread(self._read_from_db, key), now)
+        return self._count(value)
+    
+    async def aset(self, key: str, value: str):
+        expires_at = time.time() + self.ttl_seconds
+        self._store_in_memory(key, value, expires_at)
+        if self._db is not None:
+            await asyncio.to_thread(self._write_to_db, key, value, expires_at)
+    
+    def _count(self, value: Optional[str]) -> Optional[str]:
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+    
+    def _get_from_memory(self, key: str, now: float) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry and entry[0] > now:
+            self._entries.move_to_end(key)
+            return entry[1]
+        if entry:
+            del self._entries[key]
+        return None
+    
+    def _read_from_db(self, key: str) -> Optional[tuple]:
+        with self._db_lock:
+            return self._db.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+    
+    def _promote(self, key: str, row: Optional[tuple], now: float) -> Optional[str]:
+        """Linha válida do disco volta para a memória"""
+        if row and row[1] > now:
+            self._store_in_memory(key, row[0], row[1])
+            return row[0]
+        return None
+    
+    def _write_to_db(self, key: str, value: str, expires_at: float):
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+            self._db.commit()
+            self._writes_since_prune += 1
+            if self._writes_since_prune < PRUNE_EVERY_WRITES:
+                return
+        self.prune_expired()
+    
+    def prune_expired(self) -> int:
+        """Apaga do disco as entradas vencidas; o TTL em memória não alcança o SQLite"""
+        if self._db is None:
+            return 0
+        with self._db_lock:
+            deleted = self._db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+            self._db.commit()
+            self._writes_since_prune = 0
+        return deleted
+    
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+    
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "hit_rate": self.hits / total if total else 0.0
+        }
+    
+    def _store_in_memory(self, key: str, value: str, expires_at: float):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
@@ -1,3 +1,5 @@
+import unicodedata
+
 def sanitize_text(text: str) -> str:
     if not isinstance(text, str):
         return str(text)
@@ -10,4 +12,10 @@ def sanitize_text(text: str) -> str:
         return text.strip()
     except Exception:
         # Fallback: manter apenas caracteres ASCII seguros
-        return ''.join(char for char in text if ord(char) < 128 and (ord(char) >= 32 or char in '\n\r\t'))
\ No newline at end of file
+        return ''.join(char for char in text if ord(char) < 128 and (ord(char) >= 32 or char in '\n\r\t'))
+
+#normaliza texto para comparaçoes: minusculas, sem acentos e espaços simples
+def normalize_text(text: str) -> str:
+    text = unicodedata.normalize('NFKD', sanitize_text(text).lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(text.split())
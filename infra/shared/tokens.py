@@ -0,0 +1,54 @@
+from functools import lru_cache
+from typing import Dict, List, Optional
+from infra.config.settings import settings
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken é opcional: sem ele a contagem é estimada
+    tiktoken = None
+
+# Custo fixo de cada mensagem no formato de chat (papel e separadores)
+MESSAGE_OVERHEAD = 4
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # Sem o arquivo do vocabulário (ex.: sem rede) cai na estimativa
+        return None
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    if not text:
+        return 0
+    encoding = _encoding(model or settings.OPENAI_MODEL)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    # Estimativa: ~4 caracteres por token
+    return (len(text) + 3) // 4
+
+
+def count_message_tokens(messages: List[Dict[str, str]], model: Optional[str] = None) -> int:
+    return sum(count_tokens(msg["content"], model) + MESSAGE_OVERHEAD for msg in messages) + 2
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """Corta o texto para caber em max_tokens, preferindo terminar em um espaço"""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    encoding = _encoding(model or settings.OPENAI_MODEL)
+    if encoding is not None:
+        clipped = encoding.decode(encoding.encode(text)[:max_tokens])
+    else:
+        clipped = text[:max_tokens * 4]
+    cut = clipped.rfind(" ")
+    if cut > len(clipped) // 2:
+        clipped = clipped[:cut]
+    return clipped.rstrip() + "…"
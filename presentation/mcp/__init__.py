@@ -4,9 +4,10 @@ Este módulo implementa um cliente e servidor MCP para operações
 com carros, incluindo busca, detalhes e estatísticas.
 """
 
-from .protocols import MCPRequest, MCPResponse
+from .protocols import MCPRequest, MCPResponse, MCPBatchRequest
 from .server import CarMCPServer
 from .client import CarMCPClient
+from .transport import MCPConnection, MCPConnectionPool, connect, serve_tcp, serve_unix, serve_stdio
 
 # Versão do protocolo
 __version__ = "1.0.0"
@@ -14,7 +15,14 @@ __version__ = "1.0.0"
 __all__ = [
     'MCPRequest',
     'MCPResponse', 
+    'MCPBatchRequest',
     'CarMCPServer',
     'CarMCPClient',
+    'MCPConnection',
+    'MCPConnectionPool',
+    'connect',
+    'serve_tcp',
+    'serve_unix',
+    'serve_stdio',
     '__version__'
 ]
\ No newline at end of file
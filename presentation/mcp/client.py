@@ -1,12 +1,15 @@
-from typing import Dict, Any
-from .protocols import MCPRequest
+from typing import Dict, Any, Optional, List
+from .protocols import MCPRequest, MCPResponse, MCPBatchRequest
 from .server import CarMCPServer
 
 class CarMCPClient:    
     def __init__(self, server: CarMCPServer):
         self.server = server
         
-    async def search_cars(self, filters: Dict[str, Any]) -> Dict[str, Any]:
+    async def search_cars(self, filters: Dict[str, Any], cursor: Optional[str] = None) -> Dict[str, Any]:
+        # cursor vem de next_cursor da página anterior
+        if cursor:
+            filters = {**filters, "cursor": cursor}
         request = MCPRequest(method="search_cars", params=filters)
         response = await self.server.handle_request(request)
         
@@ -14,6 +17,20 @@ class CarMCPClient:
             raise Exception(f"Erro no servidor: {response.error}")
             
         return response.result
+    
+    async def batch(self, requests: List[MCPRequest]) -> List[MCPResponse]:
+        """Envia várias requisições em uma ida ao servidor; erros vêm por resposta
+        
+        handle_batch devolve as respostas na ordem das requisições, então a
+        associação é por posição: ids ausentes ou repetidos não atrapalham.
+        """
+        responses = list(await self.server.handle_batch(MCPBatchRequest(requests=list(requests))))
+        if len(responses) != len(requests):
+            raise Exception(f"Erro no servidor: lote com {len(requests)} requisições teve {len(responses)} respostas")
+        
+        for request, response in zip(requests, responses):
+            response.id = request.id
+        return responses
         
     async def get_car_details(self, car_id: int) -> Dict[str, Any]:
         request = MCPRequest(method="get_car_details", params={"car_id": car_id})
@@ -24,6 +41,15 @@ class CarMCPClient:
             
         return response.result
         
+    async def get_cars_by_ids(self, car_ids: List[int]) -> Dict[str, Any]:
+        request = MCPRequest(method="get_cars_by_ids", params={"car_ids": list(car_ids)})
+        response = await self.server.handle_request(request)
+        
+        if response.error:
+            raise Exception(f"Erro no servidor: {response.error}")
+            
+        return response.result
+        
     async def get_available_brands(self) -> Dict[str, Any]:
         request = MCPRequest(method="get_available_brands", params={})
         response = await self.server.handle_request(request)
@@ -64,6 +90,15 @@ class CarMCPClient:
         request = MCPRequest(method="get_car_statistics", params={})
         response = await self.server.handle_request(request)
         
+        if response.error:
+            raise Exception(f"Erro no servidor: {response.error}")
+            
+        return response.result
+        
+    async def get_catalog_context(self) -> Dict[str, Any]:
+        request = MCPRequest(method="get_catalog_context", params={})
+        response = await self.server.handle_request(request)
+        
         if response.error:
             raise Exception(f"Erro no servidor: {response.error}")
             
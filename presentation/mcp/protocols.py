@@ -1,14 +1,57 @@
 from dataclasses import dataclass
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
+
+JSONRPC_VERSION = "2.0"
+
+# Códigos de erro do JSON-RPC 2.0
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+SERVER_ERROR = -32000
 
 @dataclass
 class MCPRequest:
     method: str
     params: Dict[str, Any]
     id: Optional[str] = None
+    
+    def to_jsonrpc(self) -> Dict[str, Any]:
+        return {"jsonrpc": JSONRPC_VERSION, "method": self.method, "params": self.params or {}, "id": self.id}
+    
+    @classmethod
+    def from_jsonrpc(cls, data: Dict[str, Any]) -> "MCPRequest":
+        if not isinstance(data, dict) or not isinstance(data.get("method"), str):
+            raise ValueError("Requisição JSON-RPC inválida")
+        return cls(method=data["method"], params=data.get("params") or {}, id=data.get("id"))
 
 @dataclass
 class MCPResponse:
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
     id: Optional[str] = None
+    # Código JSON-RPC do erro; sem ele vale o código passado para to_jsonrpc
+    code: Optional[int] = None
+    
+    def to_jsonrpc(self, code: int = SERVER_ERROR) -> Dict[str, Any]:
+        if self.error is not None:
+            code = self.code if self.code is not None else code
+            return {"jsonrpc": JSONRPC_VERSION, "error": {"code": code, "message": self.error}, "id": self.id}
+        return {"jsonrpc": JSONRPC_VERSION, "result": self.result, "id": self.id}
+    
+    @classmethod
+    def from_jsonrpc(cls, data: Dict[str, Any]) -> "MCPResponse":
+        error = data.get("error")
+        if isinstance(error, dict):
+            return cls(error=error.get("message", str(error)), id=data.get("id"), code=error.get("code"))
+        if error is not None:
+            return cls(error=str(error), id=data.get("id"))
+        return cls(result=data.get("result"), id=data.get("id"))
+
+
+@dataclass
+class MCPBatchRequest:
+    """Lote de requisições; as respostas voltam na mesma ordem, com os mesmos ids"""
+    requests: List[MCPRequest]
+    
+    def to_jsonrpc(self) -> List[Dict[str, Any]]:
+        return [request.to_jsonrpc() for request in self.requests]
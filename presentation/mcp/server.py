@@ -1,76 +1,105 @@
 import asyncio
-from typing import Dict, Any, Callable
-from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, List
+from functools import wraps, partial
+from infra.config.settings import settings
 from infra.database.database import DatabaseManager
 from infra.database.car_repository import CarRepository
 from infra.database.response_models import SearchResponse, CarResponse
 from infra.database.car_filters import CarFilters
-from .protocols import MCPRequest, MCPResponse
+from .protocols import MCPRequest, MCPResponse, MCPBatchRequest, METHOD_NOT_FOUND
 
 # Decorador para métodos para tratamento de erro
 def mcp_method(func: Callable) -> Callable:
     @wraps(func)
-    async def wrapper(self, *args, **kwargs):
+    def wrapper(self, *args, **kwargs):
         try:
-            return await func(self, *args, **kwargs)
+            return func(self, *args, **kwargs)
         except Exception as e:
             raise Exception(f"Erro em {func.__name__}: {str(e)}")
     return wrapper
 
 class CarMCPServer:
     
-    def __init__(self):
-        self.db = DatabaseManager()
+    def __init__(self, db_manager: DatabaseManager = None):
+        self.db = db_manager or DatabaseManager()
         self.car_repo = CarRepository(self.db)
         self.running = False
+        # Pool limitado para as chamadas bloqueantes do SQLAlchemy
+        self._executor = None
         
         # Mapeamento de métodos
         self._method_handlers = {
             "search_cars": self._search_cars,
             "get_car_details": self._get_car_details,
+            "get_cars_by_ids": self._get_cars_by_ids,
             "get_available_brands": self._get_available_brands,
             "get_price_range": self._get_price_range,
             "get_year_range": self._get_year_range,
             "get_car_statistics": self._get_car_statistics,
+            "get_catalog_context": self._get_catalog_context,
             "get_car_metrics": self._get_car_metrics
         }
     
     async def start(self):
+        # Garante tabelas, colunas normalizadas e índice FTS em bancos antigos
+        await self._run_blocking(self.db.create_tables)
         self.running = True
         print("Servidor iniciado...")
         
     async def stop(self):
         self.running = False
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
         print("Servidor parado.")
+    
+    async def _run_blocking(self, func: Callable, *args):
+        """Executa trabalho de banco fora do event loop"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.DB_MAX_WORKERS,
+                thread_name_prefix="car-mcp-db"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args))
         
     async def handle_request(self, request: MCPRequest) -> MCPResponse:
+        return await self._run_blocking(self._dispatch, request)
+    
+    async def handle_batch(self, batch: MCPBatchRequest) -> List[MCPResponse]:
+        """Executa o lote inteiro em uma tarefa do pool, com uma única sessão de banco"""
+        return await self._run_blocking(self._execute_batch, batch.requests)
+    
+    def _execute_batch(self, requests: List[MCPRequest]) -> List[MCPResponse]:
+        with self.car_repo.shared_session():
+            return [self._dispatch(request) for request in requests]
+    
+    def _dispatch(self, request: MCPRequest) -> MCPResponse:
         try:
             handler = self._method_handlers.get(request.method)
             if not handler:
                 return MCPResponse(
                     error=f"Método não suportado: {request.method}", 
-                    id=request.id
+                    id=request.id,
+                    code=METHOD_NOT_FOUND
                 )
             
-            # Chama o handler apropriado
-            if request.method in ["search_cars", "get_car_details", "get_car_metrics"]:
-                result = await handler(request.params)
-            else:
-                result = await handler()
-                
+            result = handler(request.params or {})
             return MCPResponse(result=result, id=request.id)
             
         except Exception as e:
             return MCPResponse(error=str(e), id=request.id)
     
+    # Os handlers são síncronos e rodam no pool de threads
     @mcp_method
-    async def _search_cars(self, params: Dict[str, Any]) -> Dict[str, Any]:
+    def _search_cars(self, params: Dict[str, Any]) -> Dict[str, Any]:
         validated_params = self._validate_search_params(params)
         search_response = self.car_repo.search_cars_optimized(validated_params)
         return search_response.dict()
     
     @mcp_method
-    async def _get_car_details(self, params: Dict[str, Any]) -> Dict[str, Any]:
+    def _get_car_details(self, params: Dict[str, Any]) -> Dict[str, Any]:
         car_id = params.get("car_id")
         if not car_id:
             raise ValueError("ID do carro é obrigatório")
@@ -78,29 +107,50 @@ class CarMCPServer:
         car_response = self.car_repo.get_car_by_id(car_id)
         return car_response.dict()
     
+    @mcp_method
+    def _get_cars_by_ids(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        car_ids = params.get("car_ids")
+        if not isinstance(car_ids, list) or not car_ids:
+            raise ValueError("Lista de IDs (car_ids) é obrigatória")
+            
+        return self.car_repo.get_cars_by_ids(car_ids).dict()
+    
     #apartir daqui vamos retornar dados especificos
     #marcas
     @mcp_method
-    async def _get_available_brands(self) -> Dict[str, Any]:
+    def _get_available_brands(self, params: Dict[str, Any]) -> Dict[str, Any]:
         return self.car_repo.get_available_brands()
     
     #faixa de preços
     @mcp_method
-    async def _get_price_range(self) -> Dict[str, Any]:
+    def _get_price_range(self, params: Dict[str, Any]) -> Dict[str, Any]:
         return self.car_repo.get_price_range()
 
     #anos 
     @mcp_method
-    async def _get_year_range(self) -> Dict[str, Any]:
+    def _get_year_range(self, params: Dict[str, Any]) -> Dict[str, Any]:
         return self.car_repo.get_year_range()
     
     #estatisticas gerais de um carro
     @mcp_method
-    async def _get_car_statistics(self) -> Dict[str, Any]:
+    def _get_car_statistics(self, params: Dict[str, Any]) -> Dict[str, Any]:
         return self.car_repo.get_car_statistics()
     
+    #tudo que o agente precisa no inicio, em uma unica chamada
+    @mcp_method
+    def _get_catalog_context(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return self._catalog_context()
+    
+    def _catalog_context(self) -> Dict[str, Any]:
+        return {
+            "statistics": self.car_repo.get_car_statistics(),
+            "brands": self.car_repo.get_available_brands(),
+            "price_range": self.car_repo.get_price_range(),
+            "year_range": self.car_repo.get_year_range()
+        }
+    
     @mcp_method
-    async def _get_car_metrics(self, params: Dict[str, Any]) -> Dict[str, Any]:
+    def _get_car_metrics(self, params: Dict[str, Any]) -> Dict[str, Any]:
         try:
             return self.db.get_car_metrics()
         except Exception as e:
@@ -0,0 +1,380 @@
+"""Transporte JSON-RPC 2.0 (uma mensagem JSON por linha) para o servidor MCP
+
+Permite rodar o CarMCPServer em outro processo e atendê-lo via stdio,
+TCP ou socket Unix. Do lado do agente, MCPConnection e MCPConnectionPool
+têm o mesmo handle_request do CarMCPServer, então o CarMCPClient funciona
+igual com o servidor local ou remoto.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import sys
+from datetime import date, datetime
+from typing import Dict, Any, Optional, Callable, Awaitable, List
+from infra.config.settings import settings
+from .protocols import MCPRequest, MCPResponse, MCPBatchRequest, PARSE_ERROR, INVALID_REQUEST
+
+# Linhas grandes: uma página de busca com 100 carros passa do limite padrão de 64 KiB
+STREAM_LIMIT = 16 * 1024 * 1024
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_message(message: Any) -> bytes:
+    return (json.dumps(message, ensure_ascii=False, default=_json_default) + "\n").encode("utf-8")
+
+
+async def handle_jsonrpc_message(server, message: Any) -> Optional[Any]:
+    """Executa uma mensagem JSON-RPC já decodificada; None para notificações"""
+    if isinstance(message, list):
+        return await handle_jsonrpc_batch(server, message)
+    
+    try:
+        request = MCPRequest.from_jsonrpc(message)
+    except ValueError as e:
+        request_id = message.get("id") if isinstance(message, dict) else None
+        return MCPResponse(error=str(e), id=request_id).to_jsonrpc(INVALID_REQUEST)
+
+    response = await server.handle_request(request)
+    if "id" not in message:
+        return None
+    return response.to_jsonrpc()
+
+
+async def handle_jsonrpc_batch(server, messages: List[Any]) -> Optional[Any]:
+    """Lote JSON-RPC: as requisições válidas vão juntas para server.handle_batch"""
+    if not messages:
+        return MCPResponse(error="Lote vazio", id=None).to_jsonrpc(INVALID_REQUEST)
+
+    replies: List[Optional[Dict[str, Any]]] = [None] * len(messages)
+    requests, positions = [], []
+    for position, message in enumerate(messages):
+        try:
+            requests.append(MCPRequest.from_jsonrpc(message))
+            positions.append(position)
+        except ValueError as e:
+            request_id = message.get("id") if isinstance(message, dict) else None
+            replies[position] = MCPResponse(error=str(e), id=request_id).to_jsonrpc(INVALID_REQUEST)
+
+    if requests:
+        responses = await server.handle_batch(MCPBatchRequest(requests=requests))
+        for position, response in zip(positions, responses):
+            if "id" in messages[position]:
+                replies[position] = response.to_jsonrpc()
+
+    # Lote só de notificações não tem resposta
+    replies = [reply for reply in replies if reply is not None]
+    return replies or None
+
+
+async def serve_connection(server, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Atende uma conexão: cada linha vira uma tarefa, então requisições são pipelined"""
+    write_lock = asyncio.Lock()
+    in_flight = asyncio.Semaphore(settings.MCP_MAX_IN_FLIGHT)
+    tasks = set()
+
+    async def respond(line: bytes):
+        try:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                reply = MCPResponse(error="JSON inválido", id=None).to_jsonrpc(PARSE_ERROR)
+            else:
+                reply = await handle_jsonrpc_message(server, message)
+
+            if reply is not None:
+                async with write_lock:
+                    writer.write(encode_message(reply))
+                    await writer.drain()
+        finally:
+            in_flight.release()
+
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            # Back-pressure: para de ler enquanto houver requisições demais em andamento
+            await in_flight.acquire()
+            task = asyncio.create_task(respond(line))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+        with contextlib.suppress(Exception):
+            await writer.wait_closed()
+
+
+async def serve_tcp(server, host: str, port: int) -> asyncio.AbstractServer:
+    return await asyncio.start_server(
+        lambda r, w: serve_connection(server, r, w), host, port, limit=STREAM_LIMIT
+    )
+
+
+async def serve_unix(server, path: str) -> asyncio.AbstractServer:
+    return await asyncio.start_unix_server(
+        lambda r, w: serve_connection(server, r, w), path, limit=STREAM_LIMIT
+    )
+
+
+async def serve_stdio(server):
+    """Atende um único cliente pelo stdin/stdout do processo"""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=STREAM_LIMIT)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    transport, protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin, sys.stdout)
+    writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+
+    # O stdout é do protocolo: prints do servidor vão para o stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        await serve_connection(server, reader, writer)
+
+
+class MCPConnection:
+    """Conexão cliente com o servidor remoto, com várias requisições em voo"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, process=None,
+                 request_timeout: Optional[float] = None):
+        self._reader = reader
+        self._writer = writer
+        self._process = process
+        self._request_timeout = request_timeout or settings.MCP_REQUEST_TIMEOUT
+        self._ids = itertools.count(1)
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._write_lock = asyncio.Lock()
+        self._reader_task = asyncio.create_task(self._read_loop())
+
+    @property
+    def closed(self) -> bool:
+        return self._reader_task.done()
+
+    async def handle_request(self, request: MCPRequest) -> MCPResponse:
+        if self.closed:
+            raise ConnectionError("Conexão com o servidor MCP encerrada")
+
+        # Id interno garante unicidade na conexão; o id do chamador volta na resposta
+        wire_id = str(next(self._ids))
+        future = asyncio.get_running_loop().create_future()
+        self._pending[wire_id] = future
+
+        message = MCPRequest(method=request.method, params=request.params, id=wire_id).to_jsonrpc()
+        try:
+            async with self._write_lock:
+                self._writer.write(encode_message(message))
+                await self._writer.drain()
+            response = await self._wait(future)
+        finally:
+            self._pending.pop(wire_id, None)
+
+        response.id = request.id
+        return response
+
+    async def handle_batch(self, batch: MCPBatchRequest) -> List[MCPResponse]:
+        if self.closed:
+            raise ConnectionError("Conexão com o servidor MCP encerrada")
+
+        loop = asyncio.get_running_loop()
+        wire_ids = [str(next(self._ids)) for _ in batch.requests]
+        futures = [loop.create_future() for _ in batch.requests]
+        self._pending.update(zip(wire_ids, futures))
+
+        message = [
+            MCPRequest(method=request.method, params=request.params, id=wire_id).to_jsonrpc()
+            for request, wire_id in zip(batch.requests, wire_ids)
+        ]
+        try:
+            async with self._write_lock:
+                self._writer.write(encode_message(message))
+                await self._writer.drain()
+            responses = await self._wait(asyncio.gather(*futures))
+        finally:
+            for wire_id in wire_ids:
+                self._pending.pop(wire_id, None)
+
+        for request, response in zip(batch.requests, responses):
+            response.id = request.id
+        return list(responses)
+
+    async def _wait(self, awaitable):
+        # Resposta que nunca chega não pode prender o chamador (e o lock da sessão dele)
+        try:
+            return await asyncio.wait_for(awaitable, self._request_timeout)
+        except asyncio.TimeoutError:
+            raise asyncio.TimeoutError(
+                f"Servidor MCP não respondeu em {self._request_timeout:g}s"
+            ) from None
+
+    def _resolve(self, message: Any):
+        if not isinstance(message, dict):
+            return
+        future = self._pending.get(str(message.get("id")))
+        if future is not None and not future.done():
+            future.set_result(MCPResponse.from_jsonrpc(message))
+
+    async def _read_loop(self):
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                # Resposta de lote chega como lista, cada item com o seu id
+                for item in message if isinstance(message, list) else [message]:
+                    self._resolve(item)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Conexão com o servidor MCP encerrada"))
+
+    async def close(self):
+        self._writer.close()
+        with contextlib.suppress(Exception):
+            await self._writer.wait_closed()
+        self._reader_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._reader_task
+        if self._process is not None and self._process.returncode is None:
+            self._process.terminate()
+            await self._process.wait()
+
+
+async def connect(url: str) -> MCPConnection:
+    """Abre uma conexão: tcp://host:porta, unix:///caminho ou stdio (sobe um processo servidor)"""
+    if url.startswith("tcp://"):
+        host, _, port = url[len("tcp://"):].rpartition(":")
+        reader, writer = await asyncio.open_connection(host, int(port), limit=STREAM_LIMIT)
+        return MCPConnection(reader, writer)
+
+    if url.startswith("unix://"):
+        reader, writer = await asyncio.open_unix_connection(url[len("unix://"):], limit=STREAM_LIMIT)
+        return MCPConnection(reader, writer)
+
+    if url == "stdio":
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "presentation.mcp.transport", "--stdio",
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+            cwd=PROJECT_ROOT, limit=STREAM_LIMIT
+        )
+        return MCPConnection(process.stdout, process.stdin, process=process)
+
+    raise ValueError(f"URL de servidor MCP não suportada: {url}")
+
+
+class MCPConnectionPool:
+    """Pool de conexões do lado do agente; expõe a mesma interface do CarMCPServer"""
+
+    def __init__(self, url: str, size: int = 4,
+                 connector: Optional[Callable[[str], Awaitable[MCPConnection]]] = None):
+        self.url = url
+        self.size = size
+        self._connector = connector or connect
+        self._connections: List[Optional[MCPConnection]] = [None] * size
+        self._next = itertools.count()
+        self._lock = asyncio.Lock()
+        self.running = False
+
+    async def start(self):
+        for slot in range(self.size):
+            await self._get_connection(slot)
+        self.running = True
+
+    async def stop(self):
+        self.running = False
+        for slot, connection in enumerate(self._connections):
+            if connection is not None:
+                await connection.close()
+                self._connections[slot] = None
+
+    async def handle_request(self, request: MCPRequest) -> MCPResponse:
+        connection = await self._get_connection(next(self._next) % self.size)
+        return await connection.handle_request(request)
+
+    async def handle_batch(self, batch: MCPBatchRequest) -> List[MCPResponse]:
+        connection = await self._get_connection(next(self._next) % self.size)
+        return await connection.handle_batch(batch)
+
+    async def _get_connection(self, slot: int) -> MCPConnection:
+        connection = self._connections[slot]
+        if connection is None or connection.closed:
+            async with self._lock:
+                connection = self._connections[slot]
+                if connection is None or connection.closed:
+                    connection = await self._connector(self.url)
+                    self._connections[slot] = connection
+        return connection
+
+
+async def serve(url: str):
+    from .server import CarMCPServer
+
+    server = CarMCPServer()
+    if url == "stdio":
+        with contextlib.redirect_stdout(sys.stderr):
+            await server.start()
+        try:
+            await serve_stdio(server)
+        finally:
+            with contextlib.redirect_stdout(sys.stderr):
+                await server.stop()
+        return
+
+    await server.start()
+    if url.startswith("tcp://"):
+        host, _, port = url[len("tcp://"):].rpartition(":")
+        listener = await serve_tcp(server, host, int(port))
+    elif url.startswith("unix://"):
+        listener = await serve_unix(server, url[len("unix://"):])
+    else:
+        raise ValueError(f"URL de servidor MCP não suportada: {url}")
+
+    print(f"Servidor MCP ouvindo em {url}")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor MCP de carros via JSON-RPC")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--tcp", metavar="HOST:PORTA", help="ouvir em TCP, ex: 127.0.0.1:8765")
+    group.add_argument("--unix", metavar="CAMINHO", help="ouvir em um socket Unix")
+    group.add_argument("--stdio", action="store_true", help="atender pelo stdin/stdout")
+    args = parser.parse_args()
+
+    if args.stdio:
+        url = "stdio"
+    elif args.tcp:
+        url = f"tcp://{args.tcp}"
+    else:
+        url = f"unix://{args.unix}"
+
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(serve(url))
+
+
+if __name__ == "__main__":
+    main()
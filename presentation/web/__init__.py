@@ -0,0 +1,12 @@
+"""Front-end HTTP/WebSocket do agente
+
+Expõe as sessões do AgentHost por HTTP (com respostas em streaming via
+SSE) e por WebSocket, usando apenas asyncio.
+"""
+
+from .server import AgentWebServer, serve
+
+__all__ = [
+    'AgentWebServer',
+    'serve',
+]
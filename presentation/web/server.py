@@ -0,0 +1,458 @@
+"""Front-end HTTP e WebSocket do agente, sobre asyncio puro
+
+Cada conversa é uma sessão do AgentHost. Rotas:
+
+    GET    /health                    estado do servidor
+    POST   /sessions                  abre uma sessão ({"greet": true} gera a saudação)
+    DELETE /sessions/{id}             encerra a sessão
+    POST   /sessions/{id}/messages    {"message": "..."}; com Accept: text/event-stream
+                                      a resposta vem token a token (SSE em chunked)
+    GET    /ws[?session_id=...]       WebSocket: cada mensagem de texto é uma pergunta
+
+Conexões HTTP/1.1 são persistentes (keep-alive). Os tokens são escritos
+com drain(): um cliente lento segura o stream do modelo em vez de acumular
+a resposta em memória.
+"""
+
+import argparse
+import asyncio
+import base64
+import contextlib
+import hashlib
+import json
+import os
+import struct
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit, parse_qs
+from infra.config.settings import settings
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC11B65"
+
+# Opcodes WebSocket (RFC 6455)
+WS_CONTINUATION, WS_TEXT, WS_BINARY = 0x0, 0x1, 0x2
+WS_CLOSE, WS_PING, WS_PONG = 0x8, 0x9, 0xA
+
+# Mensagens WebSocket recebidas e ainda não processadas, por conexão
+WS_QUEUE_SIZE = 8
+
+STATUS_TEXT = {
+    101: "Switching Protocols", 200: "OK", 201: "Created", 204: "No Content",
+    400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    409: "Conflict", 411: "Length Required", 413: "Payload Too Large", 503: "Service Unavailable",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class HTTPRequest:
+    def __init__(self, method: str, target: str, version: str, headers: Dict[str, str], body: bytes = b""):
+        self.method = method
+        self.version = version
+        self.headers = headers
+        self.body = body
+        url = urlsplit(target)
+        self.path = url.path.rstrip("/") or "/"
+        self.query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return "keep-alive" in connection
+        return "close" not in connection
+
+    def json(self) -> Dict[str, Any]:
+        if not self.body:
+            return {}
+        try:
+            payload = json.loads(self.body)
+        except ValueError:
+            raise HTTPError(400, "JSON inválido")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "O corpo deve ser um objeto JSON")
+        return payload
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[HTTPRequest]:
+    """Lê uma requisição; None quando o cliente fecha a conexão ociosa"""
+    line = await asyncio.wait_for(reader.readline(), settings.WEB_KEEPALIVE_TIMEOUT)
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(400, "Linha de requisição inválida")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    request = HTTPRequest(method.upper(), target, version, headers)
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise HTTPError(411, "Envie o corpo com Content-Length")
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPError(400, "Content-Length inválido")
+    if length > settings.WEB_MAX_BODY:
+        raise HTTPError(413, "Corpo da requisição muito grande")
+    if length:
+        request.body = await reader.readexactly(length)
+    return request
+
+
+def _head(status: int, headers: Dict[str, str]) -> bytes:
+    lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+def _connection_headers(keep_alive: bool) -> Dict[str, str]:
+    if keep_alive:
+        return {"Connection": "keep-alive", "Keep-Alive": f"timeout={int(settings.WEB_KEEPALIVE_TIMEOUT)}"}
+    return {"Connection": "close"}
+
+
+async def send_json(writer: asyncio.StreamWriter, status: int, payload: Optional[Dict[str, Any]],
+                    keep_alive: bool = True):
+    body = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    headers = {"Content-Length": str(len(body)), **_connection_headers(keep_alive)}
+    if payload is not None:
+        headers["Content-Type"] = "application/json; charset=utf-8"
+    writer.write(_head(status, headers) + body)
+    await writer.drain()
+
+
+def _sse_event(data: Dict[str, Any], event: Optional[str] = None) -> bytes:
+    text = f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+    if event:
+        text = f"event: {event}\n{text}"
+    return text.encode("utf-8")
+
+
+async def _write_chunk(writer: asyncio.StreamWriter, data: bytes):
+    writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+    # Back-pressure: o próximo token só é pedido depois que este saiu do buffer
+    await writer.drain()
+
+
+# --- WebSocket --------------------------------------------------------------
+
+def websocket_accept_key(key: str) -> str:
+    digest = hashlib.sha1((key + WS_GUID).encode("ascii")).digest()
+    return base64.b64encode(digest).decode("ascii")
+
+
+def encode_frame(opcode: int, payload: bytes = b"", mask: bool = False) -> bytes:
+    """Monta um frame final; o servidor envia sem máscara, o cliente com"""
+    length = len(payload)
+    mask_bit = 0x80 if mask else 0
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, mask_bit | length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, mask_bit | 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, mask_bit | 127, length)
+    if not mask:
+        return header + payload
+    key = os.urandom(4)
+    return header + key + _apply_mask(payload, key)
+
+
+def _apply_mask(payload: bytes, key: bytes) -> bytes:
+    # XOR em um inteiro só, bem mais rápido que byte a byte
+    repeated = (key * (len(payload) // 4 + 1))[:len(payload)]
+    return (int.from_bytes(payload, "big") ^ int.from_bytes(repeated, "big")).to_bytes(len(payload), "big")
+
+
+async def read_frame(reader: asyncio.StreamReader, max_size: int):
+    """Lê um frame: (fin, opcode, payload já sem máscara)"""
+    first, second = await reader.readexactly(2)
+    fin, opcode = bool(first & 0x80), first & 0x0F
+    masked, length = bool(second & 0x80), second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        (length,) = struct.unpack("!Q", await reader.readexactly(8))
+    if length > max_size:
+        raise HTTPError(413, "Mensagem WebSocket muito grande")
+    key = await reader.readexactly(4) if masked else None
+    payload = await reader.readexactly(length)
+    if key:
+        payload = _apply_mask(payload, key)
+    return fin, opcode, payload
+
+
+class WebSocketConnection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self._write_lock = asyncio.Lock()
+        self.closed = False
+
+    async def send(self, opcode: int, payload: bytes = b""):
+        if self.closed:
+            raise ConnectionError("WebSocket encerrado")
+        async with self._write_lock:
+            self.writer.write(encode_frame(opcode, payload))
+            await self.writer.drain()
+
+    async def send_json(self, message: Dict[str, Any]):
+        await self.send(WS_TEXT, json.dumps(message, ensure_ascii=False).encode("utf-8"))
+
+    async def close(self, code: int = 1000):
+        if not self.closed:
+            with contextlib.suppress(ConnectionError):
+                await self.send(WS_CLOSE, struct.pack("!H", code))
+            self.closed = True
+
+    async def receive(self) -> Optional[str]:
+        """Próxima mensagem de texto; responde ping e devolve None no close"""
+        fragments, message_opcode = [], None
+        while True:
+            fin, opcode, payload = await read_frame(self.reader, settings.WEB_MAX_BODY)
+            if opcode == WS_PING:
+                await self.send(WS_PONG, payload)
+                continue
+            if opcode == WS_PONG:
+                continue
+            if opcode == WS_CLOSE:
+                await self.close()
+                return None
+            if opcode != WS_CONTINUATION:
+                message_opcode = opcode
+            fragments.append(payload)
+            if fin:
+                if message_opcode != WS_TEXT:
+                    await self.close(1003)
+                    return None
+                return b"".join(fragments).decode("utf-8")
+
+
+# --- Servidor ---------------------------------------------------------------
+
+class AgentWebServer:
+    """Atende HTTP e WebSocket repassando as mensagens para o AgentHost"""
+
+    def __init__(self, host):
+        self.host = host
+        # Limite global de mensagens em processamento: acima dele as conexões esperam
+        self._in_flight = asyncio.Semaphore(settings.WEB_MAX_IN_FLIGHT)
+
+    async def serve(self, host: str, port: int) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HTTPError as e:
+                    await send_json(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+
+                upgrade = request.headers.get("upgrade", "").lower() == "websocket"
+                try:
+                    if upgrade:
+                        await self._websocket(request, reader, writer)
+                    else:
+                        await self._route(request, writer)
+                except HTTPError as e:
+                    await send_json(writer, e.status, {"error": str(e)}, request.keep_alive and not upgrade)
+                if upgrade or not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(Exception):
+                await writer.wait_closed()
+
+    async def _route(self, request: HTTPRequest, writer: asyncio.StreamWriter):
+        parts = request.path.strip("/").split("/")
+
+        if parts == ["health"]:
+            self._allow(request, "GET")
+            await send_json(writer, 200, {"status": "ok", "sessions": len(self.host.sessions)},
+                            request.keep_alive)
+        elif parts == ["sessions"]:
+            self._allow(request, "POST")
+            body = request.json()
+            session = self._open_session(body.get("session_id"))
+            payload = {"session_id": session.session_id}
+            if body.get("greet"):
+                async with self._in_flight:
+                    payload["greeting"] = await self.host.greet(session)
+            await send_json(writer, 201, payload, request.keep_alive)
+        elif len(parts) == 2 and parts[0] == "sessions":
+            self._allow(request, "DELETE")
+            self.host.close_session(parts[1])
+            await send_json(writer, 204, None, request.keep_alive)
+        elif len(parts) == 3 and parts[0] == "sessions" and parts[2] == "messages":
+            self._allow(request, "POST")
+            await self._message(request, parts[1], writer)
+        else:
+            raise HTTPError(404, "Rota não encontrada")
+
+    def _allow(self, request: HTTPRequest, method: str):
+        if request.method != method:
+            raise HTTPError(405, f"Use {method}")
+
+    def _open_session(self, session_id: Optional[str] = None):
+        try:
+            return self.host.open_session(session_id)
+        except ValueError as e:
+            # Id de outra conversa: nunca substitui a sessão existente
+            raise HTTPError(409, str(e))
+        except RuntimeError as e:
+            raise HTTPError(503, str(e))
+
+    async def _message(self, request: HTTPRequest, session_id: str, writer: asyncio.StreamWriter):
+        message = request.json().get("message")
+        if not isinstance(message, str) or not message.strip():
+            raise HTTPError(400, "Campo 'message' obrigatório")
+        if session_id not in self.host.sessions:
+            raise HTTPError(404, f"Sessão não encontrada: {session_id}")
+
+        streaming = "text/event-stream" in request.headers.get("accept", "") or request.query.get("stream") == "1"
+        if not streaming:
+            async with self._in_flight:
+                response = await self.host.handle_message(session_id, message)
+            await send_json(writer, 200, {"session_id": session_id, "response": response}, request.keep_alive)
+            return
+
+        writer.write(_head(200, {
+            "Content-Type": "text/event-stream; charset=utf-8",
+            "Cache-Control": "no-cache",
+            "Transfer-Encoding": "chunked",
+            **_connection_headers(request.keep_alive),
+        }))
+
+        async def on_token(token: str):
+            await _write_chunk(writer, _sse_event({"token": token}))
+
+        async with self._in_flight:
+            response = await self.host.handle_message(session_id, message, on_token=on_token)
+        await _write_chunk(writer, _sse_event({"session_id": session_id, "response": response}, event="done"))
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def _websocket(self, request: HTTPRequest, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        key = request.headers.get("sec-websocket-key")
+        if request.method != "GET" or request.path != "/ws" or not key:
+            raise HTTPError(400, "Handshake WebSocket inválido")
+
+        session_id = request.query.get("session_id")
+        # A sessão pertence à conexão, a não ser que o cliente tenha vindo com uma já aberta
+        owned = session_id not in self.host.sessions
+        if owned:
+            session_id = self._open_session(session_id).session_id
+
+        writer.write(_head(101, {
+            "Upgrade": "websocket",
+            "Connection": "Upgrade",
+            "Sec-WebSocket-Accept": websocket_accept_key(key),
+        }))
+        await writer.drain()
+
+        ws = WebSocketConnection(reader, writer)
+        await ws.send_json({"type": "session", "session_id": session_id})
+
+        # Fila limitada: com ela cheia o loop de leitura para e o TCP segura o cliente
+        queue: asyncio.Queue = asyncio.Queue(WS_QUEUE_SIZE)
+        worker = asyncio.create_task(self._websocket_worker(ws, session_id, queue))
+        pinger = asyncio.create_task(self._websocket_pinger(ws))
+        try:
+            while not worker.done():
+                text = await ws.receive()
+                if text is None:
+                    break
+                await queue.put(text)
+        except HTTPError:
+            await ws.close(1009)
+        except UnicodeDecodeError:
+            # Frame de texto que não é UTF-8 válido
+            await ws.close(1007)
+        finally:
+            for task in (worker, pinger):
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError, ConnectionError):
+                    await task
+            if owned:
+                self.host.close_session(session_id)
+
+    async def _websocket_worker(self, ws: WebSocketConnection, session_id: str, queue: asyncio.Queue):
+        async def on_token(token: str):
+            await ws.send_json({"type": "token", "data": token})
+
+        while True:
+            text = await queue.get()
+            try:
+                payload = json.loads(text)
+                message = payload.get("message") if isinstance(payload, dict) else text
+            except ValueError:
+                message = text
+            if not isinstance(message, str) or not message.strip():
+                await ws.send_json({"type": "error", "error": "Mensagem vazia"})
+                continue
+
+            try:
+                if session_id not in self.host.sessions:
+                    # Sessão expirou com o socket ocioso: recomeça com o mesmo id
+                    self._open_session(session_id)
+                async with self._in_flight:
+                    response = await self.host.handle_message(session_id, message, on_token=on_token)
+                await ws.send_json({"type": "done", "response": response})
+            except ConnectionError:
+                # Cliente foi embora: não há para quem responder
+                return
+            except Exception as e:
+                # Ex.: sessão encerrada enquanto a mensagem esperava vaga; a conexão continua
+                with contextlib.suppress(ConnectionError):
+                    await ws.send_json({"type": "error", "error": str(e)})
+
+    async def _websocket_pinger(self, ws: WebSocketConnection):
+        # Mantém proxies e NATs sem derrubar a conexão ociosa
+        while not ws.closed:
+            await asyncio.sleep(settings.WEB_WS_PING_INTERVAL)
+            await ws.send(WS_PING)
+
+
+async def serve(host: str, port: int):
+    from agent_host import AgentHost
+
+    settings.validate()
+    agent_host = AgentHost()
+    await agent_host.start()
+    listener = await AgentWebServer(agent_host).serve(host, port)
+
+    print(f"Agente ouvindo em http://{host}:{port} (WebSocket em /ws)")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await agent_host.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Front-end HTTP/WebSocket do agente de carros")
+    parser.add_argument("--host", default=settings.WEB_HOST)
+    parser.add_argument("--port", type=int, default=settings.WEB_PORT)
+    args = parser.parse_args(argv)
+
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,54 +1,89 @@
+import asyncio
+import inspect
 import json
-from typing import Dict, Any, List
-from openai import OpenAI
+import re
+from typing import Dict, Any, List, Optional, Callable, AsyncIterator
+from openai import AsyncOpenAI
 from infra.config.settings import settings
 from infra.config.prompts import Prompts
 from infra.shared.text_utils import sanitize_text
+from infra.shared.response_cache import ResponseCache
 from infra.config.keywords import IntentKeywords
 
 class AIService:
-    def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    # Cliente compartilhado entre instâncias para reaproveitar o pool de conexões
+    _shared_client: Optional[AsyncOpenAI] = None
+    
+    def __init__(self, client: Optional[AsyncOpenAI] = None, max_concurrency: Optional[int] = None,
+                 cache: Optional[ResponseCache] = None):
+        self.client = client or self._get_shared_client()
+        self._semaphore = asyncio.Semaphore(max_concurrency or settings.OPENAI_MAX_CONCURRENCY)
+        
+        if cache is None and settings.LLM_CACHE_ENABLED:
+            cache = ResponseCache(
+                max_size=settings.LLM_CACHE_MAX_SIZE,
+                ttl_seconds=settings.LLM_CACHE_TTL,
+                db_path=settings.LLM_CACHE_PATH
+            )
+        self.cache = cache
+    
+    @classmethod
+    def _get_shared_client(cls) -> AsyncOpenAI:
+        if cls._shared_client is None:
+            cls._shared_client = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                timeout=settings.OPENAI_TIMEOUT,
+                max_retries=settings.OPENAI_MAX_RETRIES
+            )
+        return cls._shared_client
+    
+    async def _create_completion(self, **kwargs):
+        """Chamada assíncrona ao modelo limitada pelo semáforo de concorrência"""
+        kwargs.setdefault('timeout', settings.OPENAI_TIMEOUT)
+        async with self._semaphore:
+            return await self.client.chat.completions.create(**kwargs)
+    
+    async def _complete(self, **kwargs) -> str:
+        """Retorna o texto da resposta, usando o cache quando possível"""
+        cache_key = None
+        if self.cache is not None:
+            cache_key = ResponseCache.make_key(kwargs['model'], kwargs.get('temperature'), kwargs['messages'])
+            cached = await self.cache.aget(cache_key)
+            if cached is not None:
+                return cached
+        
+        response = await self._create_completion(**kwargs)
+        content = response.choices[0].message.content
+        
+        if cache_key is not None and content:
+            await self.cache.aset(cache_key, content)
+        return content
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        if self.cache is None:
+            return {"hits": 0, "misses": 0, "size": 0, "hit_rate": 0.0}
+        return self.cache.stats()
         
     async def analyze_intent(self, user_input: str) -> Dict[str, Any]:
         prompt = Prompts.INTENT_ANALYSIS.format(user_input=sanitize_text(user_input))
         
         try:
-            response = self.client.chat.completions.create(
+            content = await self._complete(
                 model=settings.OPENAI_MODEL,
                 messages=[{"role": "user", "content": sanitize_text(prompt)}],
                 temperature=settings.INTENT_TEMPERATURE
             )
             
-            content = sanitize_text(response.choices[0].message.content)
+            content = sanitize_text(content)
             return json.loads(content)
         except Exception as e:
-            # Fallback
-            search_keywords = [
-                'buscar', 'procurar', 'quero', 'preciso', 'encontrar', 'carro', 'placa',
-                'listar', 'mostrar', 'ver', 'todos', 'disponíveis', 'disponivel', 'lista'
-            ]
-            needs_search = any(keyword in user_input.lower() for keyword in search_keywords)
-            return {
-                "needs_search": needs_search, 
-                "intent_type": "search" if needs_search else "conversation", 
-                "confidence": 0.5
-            }
+            return self._fallback_intent(user_input)
     
     async def extract_filters(self, user_input: str, available_brands: List[str]) -> Dict[str, Any]:
-        import re
-        
         # Verificar se está pedindo informações de um carro específico por número
-        number_match = re.search(r'(?:numero|número|carro)\s*(\d+)', user_input.lower())
-        if number_match:
-            car_number = int(number_match.group(1))
-            return {'limit': 50, 'specific_request': True, 'car_number': car_number}
-        
-        # Usar configuração centralizada para detecção de cores
-        detected_color = IntentKeywords.detect_color(user_input)
-        
-        # Verificar se está pedindo detalhes específicos
-        wants_detailed_info = IntentKeywords.check_detail_intent(user_input)
+        car_number_filters = self._check_car_number(user_input)
+        if car_number_filters:
+            return car_number_filters
         
         prompt = Prompts.FILTER_EXTRACTION.format(
             user_input=sanitize_text(user_input),
@@ -56,83 +91,204 @@ class AIService:
         )
         
         try:
-            response = self.client.chat.completions.create(
+            content = await self._complete(
                 model=settings.OPENAI_MODEL,
                 messages=[{"role": "user", "content": sanitize_text(prompt)}],
                 temperature=settings.INTENT_TEMPERATURE
             )
             
-            content = sanitize_text(response.choices[0].message.content)
+            content = sanitize_text(content)
             filters = json.loads(content)
+            return self._finalize_filters(user_input, filters, available_brands)
             
-            # Se detectamos uma cor usando configuração
-            if detected_color:
-                filters['cor'] = detected_color
-            
-            # Se está pedindo detalhes específicos
-            if wants_detailed_info:
-                filters['detailed_info'] = True
-                filters['specific_request'] = True
-            
-            #verificar listagem geral
-            if IntentKeywords.check_list_all_intent(user_input, available_brands):
-                if detected_color:
-                    filters = {'cor': detected_color, 'limit': settings.DEFAULT_SEARCH_LIMIT}
-                else:
-                    filters = {k: v for k, v in filters.items() if k in ['limit', 'detailed_info'] and v is not None}
-                    if 'limit' not in filters:
-                        filters['limit'] = settings.DEFAULT_SEARCH_LIMIT
+        except Exception as e:
+            return self._fallback_filters(user_input, available_brands)
+    
+    async def analyze_intent_and_filters(self, user_input: str, available_brands: List[str]) -> Dict[str, Any]:
+        """Classifica a intenção e extrai os filtros em uma única chamada ao modelo"""
+        prompt = Prompts.INTENT_AND_FILTER_EXTRACTION.format(
+            user_input=sanitize_text(user_input),
+            available_brands=available_brands
+        )
+        
+        try:
+            content = await self._complete(
+                model=settings.OPENAI_MODEL,
+                messages=[{"role": "user", "content": sanitize_text(prompt)}],
+                temperature=settings.INTENT_TEMPERATURE
+            )
             
-            return {k: v for k, v in filters.items() if v is not None}
+            content = sanitize_text(content)
+            data = json.loads(content)
             
+            needs_search = bool(data.get("needs_search", False))
+            intent = {
+                "needs_search": needs_search,
+                "intent_type": data.get("intent_type", "search" if needs_search else "conversation"),
+                "confidence": data.get("confidence", 0.5)
+            }
+            filters = (
+                self._check_car_number(user_input)
+                or self._finalize_filters(user_input, data.get("filters") or {}, available_brands)
+            )
         except Exception as e:
-            fallback_filters = {}
+            intent = self._fallback_intent(user_input)
+            filters = self._check_car_number(user_input) or self._fallback_filters(user_input, available_brands)
+        
+        return {"intent": intent, "filters": filters}
+    
+    @staticmethod
+    def _check_car_number(user_input: str) -> Optional[Dict[str, Any]]:
+        number_match = re.search(r'(?:numero|número|carro)\s*(\d+)', user_input.lower())
+        if number_match:
+            car_number = int(number_match.group(1))
+            return {'limit': 50, 'specific_request': True, 'car_number': car_number}
+        return None
+    
+    @staticmethod
+    def _fallback_intent(user_input: str) -> Dict[str, Any]:
+        needs_search = any(keyword in user_input.lower() for keyword in IntentKeywords.SEARCH_KEYWORDS)
+        return {
+            "needs_search": needs_search, 
+            "intent_type": "search" if needs_search else "conversation", 
+            "confidence": 0.5
+        }
+    
+    @staticmethod
+    def _finalize_filters(user_input: str, filters: Dict[str, Any], available_brands: List[str]) -> Dict[str, Any]:
+        # Usar configuração centralizada para detecção de cores
+        detected_color = IntentKeywords.detect_color(user_input)
+        
+        # Se detectamos uma cor usando configuração
+        if detected_color:
+            filters['cor'] = detected_color
+        
+        # Se está pedindo detalhes específicos
+        if IntentKeywords.check_detail_intent(user_input):
+            filters['detailed_info'] = True
+            filters['specific_request'] = True
+        
+        #verificar listagem geral
+        if IntentKeywords.check_list_all_intent(user_input, available_brands):
             if detected_color:
-                fallback_filters['cor'] = detected_color
-            if wants_detailed_info:
-                fallback_filters['detailed_info'] = True
-                fallback_filters['specific_request'] = True
-            
-            if fallback_filters:
-                fallback_filters['limit'] = settings.DEFAULT_SEARCH_LIMIT
-                return fallback_filters
-            
-            if IntentKeywords.check_list_all_intent(user_input, available_brands):
-                return {'limit': settings.DEFAULT_SEARCH_LIMIT}
-            return {}
+                filters = {'cor': detected_color, 'limit': settings.DEFAULT_SEARCH_LIMIT}
+            else:
+                filters = {k: v for k, v in filters.items() if k in ['limit', 'detailed_info'] and v is not None}
+                if 'limit' not in filters:
+                    filters['limit'] = settings.DEFAULT_SEARCH_LIMIT
+        
+        return {k: v for k, v in filters.items() if v is not None}
+    
+    @staticmethod
+    def _fallback_filters(user_input: str, available_brands: List[str]) -> Dict[str, Any]:
+        detected_color = IntentKeywords.detect_color(user_input)
+        fallback_filters = {}
+        if detected_color:
+            fallback_filters['cor'] = detected_color
+        if IntentKeywords.check_detail_intent(user_input):
+            fallback_filters['detailed_info'] = True
+            fallback_filters['specific_request'] = True
+        
+        if fallback_filters:
+            fallback_filters['limit'] = settings.DEFAULT_SEARCH_LIMIT
+            return fallback_filters
+        
+        if IntentKeywords.check_list_all_intent(user_input, available_brands):
+            return {'limit': settings.DEFAULT_SEARCH_LIMIT}
+        return {}
     
     #resposta gerada
-    async def generate_response(self, prompt: str, conversation_history: List[Dict], database_context: Dict) -> str:
-        system_message = Prompts.SYSTEM_MESSAGE.format(
-            total_cars=database_context.get('total_cars', 0),
-            brands=', '.join(database_context.get('brands', [])),
-            price_range=database_context.get('formatted_price_range', 'Não disponível')
-        )
+    async def generate_response(self, prompt: str, conversation_history: List[Dict], database_context: Dict,
+                                on_token: Optional[Callable[[str], None]] = None) -> str:
+        if on_token is not None:
+            # Modo streaming: repassa cada pedaço assim que chega
+            chunks = []
+            async for token in self.generate_response_stream(prompt, conversation_history, database_context):
+                chunks.append(token)
+                result = on_token(token)
+                if inspect.isawaitable(result):
+                    # Callback assíncrono (ex.: escrita com drain): o stream espera o consumidor
+                    await result
+            return sanitize_text(''.join(chunks))
         
         try:
-            messages = [{"role": "system", "content": sanitize_text(system_message)}]
+            messages = self._build_messages(prompt, conversation_history, database_context)
             
-            # Adicionar histórico recente
-            recent_history = conversation_history[-settings.MAX_HISTORY_MESSAGES:] if len(conversation_history) > settings.MAX_HISTORY_MESSAGES else conversation_history
-            for msg in recent_history:
-                sanitized_msg = {
-                    "role": msg["role"],
-                    "content": sanitize_text(msg["content"])
-                }
-                messages.append(sanitized_msg)
-            
-            messages.append({"role": "user", "content": sanitize_text(prompt)})
-            
-            response = self.client.chat.completions.create(
+            content = await self._complete(
                 model=settings.OPENAI_MODEL,
                 messages=messages,
                 temperature=settings.TEMPERATURE,
                 max_tokens=settings.MAX_TOKENS
             )
             
-            content = response.choices[0].message.content.strip()
+            content = content.strip()
             return sanitize_text(content)
             
         except Exception as e:
             error_msg = sanitize_text(str(e))
-            return f"Desculpe, tive um problema técnico. Pode repetir sua pergunta? (Erro: {error_msg})"
\ No newline at end of file
+            return f"Desculpe, tive um problema técnico. Pode repetir sua pergunta? (Erro: {error_msg})"
+    
+    async def generate_response_stream(self, prompt: str, conversation_history: List[Dict], database_context: Dict) -> AsyncIterator[str]:
+        """Gera a resposta em pedaços, conforme os tokens chegam do modelo"""
+        try:
+            messages = self._build_messages(prompt, conversation_history, database_context)
+            kwargs = {
+                "model": settings.OPENAI_MODEL,
+                "messages": messages,
+                "temperature": settings.TEMPERATURE,
+                "max_tokens": settings.MAX_TOKENS
+            }
+            
+            cache_key = None
+            if self.cache is not None:
+                cache_key = ResponseCache.make_key(kwargs['model'], kwargs['temperature'], messages)
+                cached = await self.cache.aget(cache_key)
+                if cached is not None:
+                    yield cached
+                    return
+            
+            chunks = []
+            async with self._semaphore:
+                stream = await self.client.chat.completions.create(
+                    stream=True, timeout=settings.OPENAI_TIMEOUT, **kwargs
+                )
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    token = chunk.choices[0].delta.content
+                    if token:
+                        chunks.append(token)
+                        yield token
+            
+            if cache_key is not None and chunks:
+                await self.cache.aset(cache_key, ''.join(chunks))
+                
+        except Exception as e:
+            error_msg = sanitize_text(str(e))
+            yield f"Desculpe, tive um problema técnico. Pode repetir sua pergunta? (Erro: {error_msg})"
+    
+    def _build_messages(self, prompt: str, conversation_history: List[Dict], database_context: Dict) -> List[Dict[str, str]]:
+        system_message = Prompts.SYSTEM_MESSAGE.format(
+            total_cars=database_context.get('total_cars', 0),
+            brands=', '.join(database_context.get('brands', [])),
+            price_range=database_context.get('formatted_price_range', 'Não disponível')
+        )
+        messages = [{"role": "system", "content": sanitize_text(system_message)}]
+        
+        if hasattr(conversation_history, "prompt_messages"):
+            # ConversationMemory: já sanitizada e dentro do orçamento de tokens
+            messages.extend(conversation_history.prompt_messages())
+            messages.append({"role": "user", "content": sanitize_text(prompt)})
+            return messages
+        
+        # Adicionar histórico recente
+        recent_history = conversation_history[-settings.MAX_HISTORY_MESSAGES:] if len(conversation_history) > settings.MAX_HISTORY_MESSAGES else conversation_history
+        for msg in recent_history:
+            sanitized_msg = {
+                "role": msg["role"],
+                "content": sanitize_text(msg["content"])
+            }
+            messages.append(sanitized_msg)
+        
+        messages.append({"role": "user", "content": sanitize_text(prompt)})
+        return messages
@@ -1,6 +1,16 @@
 import re
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from infra.config.keywords import IntentKeywords
+from infra.config.settings import settings
+from infra.shared.text_utils import normalize_text
+from model.carros import MARCAS_MODELOS
+
+# Padrões do parser local (aplicados sobre texto normalizado)
+MAX_QUALIFIERS = r'ate|abaixo de|menos de|no maximo'
+MIN_QUALIFIERS = r'acima de|a partir de|mais de|depois de|apos|desde'
+# Quilometragem ("40 mil km") não é preço: o número fica no texto e derruba a confiança
+MILEAGE_UNITS = r'kms?|quilometros?|rodados?'
+NUMBER_PATTERN = rf'(r\$\s*)?(\d+(?:[.,]\d+)*)(?![.,]?\d)(?!\s*(?:mil|k)?\s*(?:{MILEAGE_UNITS})(?!\w))\s*(mil|k)?(\s*reais)?(?![\w])'
 
 #processar as intençoes do usuario
 #aqui vao varios casos para checar
@@ -18,6 +28,38 @@ class IntentService:
             }
         return None
     
+    @staticmethod
+    def resolve_car_reference(user_input: str, shown_ids: List[int]) -> Optional[Tuple[int, int]]:
+        """Resolve "carro 3" / "o segundo" para (posição, id) na última lista exibida
+        
+        Só quando a referência é o pedido inteiro: com marca, modelo, preço ou
+        qualquer outro termo de filtro a mensagem é uma busca nova.
+        """
+        if not shown_ids:
+            return None
+        
+        text = normalize_text(user_input)
+        number_match = re.search(r'\b(?:carro|numero|opcao)\s*(\d+)\b', text)
+        ordinal_match = re.search(
+            r'\b(?:o|a|do|da|no|na|pelo|pela)\s+(' + '|'.join(IntentKeywords.ORDINAL_MAPPING) + r')\b', text
+        )
+        if number_match:
+            position, match = int(number_match.group(1)), number_match
+        elif ordinal_match:
+            position, match = IntentKeywords.ORDINAL_MAPPING[ordinal_match.group(1)], ordinal_match
+        else:
+            return None
+        
+        rest = text[:match.start()] + ' ' + text[match.end():]
+        if any(word not in IntentKeywords.REFERENCE_WORDS for word in re.findall(r'[a-z]+|\d+', rest)):
+            return None
+        
+        if position == -1:
+            return len(shown_ids), shown_ids[-1]
+        if 1 <= position <= len(shown_ids):
+            return position, shown_ids[position - 1]
+        return None
+    
     @staticmethod
     def process_user_intent(user_input: str, available_brands: list = None) -> Dict[str, Any]:
         if available_brands is None:
@@ -34,6 +76,153 @@ class IntentService:
         
         return intent_info
     
+    @staticmethod
+    def parse_local_query(user_input: str, available_brands: list = None) -> Dict[str, Any]:
+        """Extrai intenção e filtros sem LLM, com uma confiança de 0 a 1"""
+        if available_brands is None:
+            available_brands = []
+        
+        specific_car_request = IntentService.check_specific_car_request(user_input)
+        if specific_car_request:
+            return {
+                "intent": {"needs_search": True, "intent_type": "search", "confidence": 1.0},
+                "filters": specific_car_request
+            }
+        
+        text = normalize_text(user_input)
+        total_tokens = len(re.findall(r'[\w$]+', text))
+        filters = {}
+        
+        text = IntentService._extract_brand_and_model(text, filters, available_brands)
+        text = IntentService._extract_numbers(text, filters)
+        
+        doors_match = re.search(r'(?<!\d)([2-5])\s*portas', text)
+        if doors_match:
+            filters['numero_portas'] = int(doors_match.group(1))
+            text = text.replace(doors_match.group(0), ' ')
+        
+        for field, mapping in (('combustivel', IntentKeywords.FUEL_MAPPING),
+                               ('transmissao', IntentKeywords.TRANSMISSION_MAPPING),
+                               ('tipo_veiculo', IntentKeywords.VEHICLE_TYPE_MAPPING),
+                               ('cor', IntentKeywords.COLOR_MAPPING)):
+            text = IntentService._extract_keyword(text, filters, field, mapping)
+        
+        wants_list_all = IntentKeywords.check_list_all_intent(user_input, available_brands)
+        if not filters and wants_list_all:
+            filters['limit'] = settings.DEFAULT_SEARCH_LIMIT
+        
+        # Confiança = fração das palavras que o parser entendeu
+        known_words = IntentKeywords.FILLER_WORDS | set(IntentKeywords.SEARCH_KEYWORDS) | set(IntentKeywords.LIST_ALL_KEYWORDS)
+        unknown_tokens = [token for token in re.findall(r'[\w$]+', text) if token not in known_words]
+        if filters and total_tokens:
+            confidence = round(1 - len(unknown_tokens) / total_tokens, 2)
+        else:
+            confidence = 0.0
+        if any(re.search(r'\d', token) for token in unknown_tokens):
+            # Número que nenhum filtro usou: o parser local não entendeu a busca, deixa para a IA
+            confidence = min(confidence, round(settings.LOCAL_PARSER_THRESHOLD - 0.01, 2))
+        
+        needs_search = bool(filters)
+        return {
+            "intent": {
+                "needs_search": needs_search,
+                "intent_type": "search" if needs_search else "conversation",
+                "confidence": confidence
+            },
+            "filters": filters
+        }
+    
+    @staticmethod
+    def _extract_brand_and_model(text: str, filters: Dict[str, Any], available_brands: list) -> str:
+        brands = {normalize_text(brand): brand for brand in list(MARCAS_MODELOS) + list(available_brands)}
+        brands.update(IntentKeywords.BRAND_ALIASES)
+        
+        for alias in sorted(brands, key=len, reverse=True):
+            pattern = rf'(?<![\w-]){re.escape(alias)}(?![\w-])'
+            if re.search(pattern, text):
+                filters['marca'] = brands[alias]
+                text = re.sub(pattern, ' ', text)
+                break
+        
+        models = []
+        for brand, brand_models in MARCAS_MODELOS.items():
+            if filters.get('marca') not in (None, brand):
+                continue
+            for model in brand_models:
+                # Modelos só numéricos (ex: Peugeot 2008) se confundem com anos e preços
+                if model.isdigit() and 'marca' not in filters:
+                    continue
+                models.append((normalize_text(model), brand, model))
+        
+        for alias, brand, model in sorted(models, key=lambda item: len(item[0]), reverse=True):
+            pattern = rf'(?<![\w-]){re.escape(alias)}(?![\w-])'
+            if re.search(pattern, text):
+                filters['marca'] = brand
+                filters['modelo'] = model
+                text = re.sub(pattern, ' ', text)
+                break
+        
+        return text
+    
+    @staticmethod
+    def _extract_numbers(text: str, filters: Dict[str, Any]) -> str:
+        def classify(groups: Tuple, fallback_suffix: Optional[str] = None) -> Optional[Tuple[str, float]]:
+            currency, raw, suffix, reais = groups
+            suffix = suffix or fallback_suffix
+            if re.fullmatch(r'\d+[.,]\d{1,2}', raw):
+                value = float(raw.replace(',', '.'))
+            else:
+                value = float(re.sub(r'[.,]', '', raw))
+            if suffix:
+                value *= 1000
+            
+            is_price = bool(currency or suffix or reais)
+            if not is_price and re.fullmatch(r'\d{4}', raw) and 1950 <= value <= 2035:
+                return 'ano', int(value)
+            if is_price or value >= 1000:
+                return 'preco', value
+            return None
+        
+        # "entre X e Y", "de X até Y", "de X a Y"
+        for opener, connector in (('entre', 'e'), ('de', 'ate|a')):
+            range_match = re.search(rf'(?<!\w){opener}\s+{NUMBER_PATTERN}\s+(?:{connector})\s+{NUMBER_PATTERN}', text)
+            if not range_match:
+                continue
+            low_groups, high_groups = range_match.groups()[:4], range_match.groups()[4:]
+            high = classify(high_groups)
+            low = classify(low_groups, fallback_suffix=high_groups[2])
+            if low and high and low[0] == high[0]:
+                filters[f'{low[0]}_min'] = min(low[1], high[1])
+                filters[f'{low[0]}_max'] = max(low[1], high[1])
+                text = text.replace(range_match.group(0), ' ')
+                break
+        
+        # "até X", "acima de X"
+        for qualifiers, bound in ((MAX_QUALIFIERS, 'max'), (MIN_QUALIFIERS, 'min')):
+            for match in re.finditer(rf'(?<!\w)(?:{qualifiers})\s+{NUMBER_PATTERN}', text):
+                number_match = re.search(NUMBER_PATTERN, match.group(0))
+                classified = classify(number_match.groups())
+                if classified:
+                    filters[f'{classified[0]}_{bound}'] = classified[1]
+                    text = text.replace(match.group(0), ' ')
+        
+        # Ano isolado ("de 2020") vale como ano exato
+        year_match = re.search(r'(?<![\d.,$])(19[5-9]\d|20[0-3]\d)(?![\d.,]|\s*(?:mil|k|reais))', text)
+        if year_match and 'ano_min' not in filters and 'ano_max' not in filters:
+            filters['ano_min'] = filters['ano_max'] = int(year_match.group(1))
+            text = text.replace(year_match.group(0), ' ', 1)
+        
+        return text
+    
+    @staticmethod
+    def _extract_keyword(text: str, filters: Dict[str, Any], field: str, mapping: Dict[str, str]) -> str:
+        for keyword, value in mapping.items():
+            pattern = rf'(?<!\w){re.escape(keyword)}(?!\w)'
+            if re.search(pattern, text):
+                filters[field] = value
+                return re.sub(pattern, ' ', text)
+        return text
+    
     @staticmethod
     def generate_metrics_response(metrics_data: Dict[str, Any]) -> str:
         response = "Aqui estão todas as métricas/informações disponíveis sobre os carros na base de dados:\n\n"
@@ -1,33 +1,76 @@
-from typing import Dict, Any, List
+import re
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from infra.config.settings import settings
 from infra.config.prompts import Prompts
-from infra.shared.formatters import format_car_summary, format_car_detailed
-from infra.shared.text_utils import sanitize_text
+from infra.config.keywords import IntentKeywords
+from infra.shared.formatters import format_car_summary, format_car_detailed, format_cars_table
+from infra.shared.text_utils import sanitize_text, normalize_text
+from infra.shared.tokens import count_tokens
+
+# Campos da tabela compacta: sempre, em listagens e na ficha completa
+BASE_FIELDS = ['marca', 'modelo', 'ano', 'preco']
+SUMMARY_FIELDS = BASE_FIELDS + ['cor', 'quilometragem']
+DETAILED_FIELDS = SUMMARY_FIELDS + [
+    'combustivel', 'transmissao', 'numero_portas', 'motorizacao', 'tipo_veiculo',
+    'ano_modelo', 'placa', 'chassi', 'data_ultima_revisao'
+]
 
 # Classe de serviço de resposta
 class ResponseService:
     def __init__(self, ai_service):
         self.ai_service = ai_service
     
-    async def generate_search_response(self, user_input: str, search_results: Dict[str, Any], conversation_history: list, database_context: Dict) -> str:
+    async def generate_search_response(self, user_input: str, search_results: Dict[str, Any], conversation_history: list, database_context: Dict,
+                                       on_token: Optional[Callable[[str], None]] = None) -> str:
+        prompt = self._build_search_prompt(user_input, search_results)
+        return await self.ai_service.generate_response(prompt, conversation_history, database_context, on_token=on_token)
+    
+    @staticmethod
+    def _is_specific_search(user_input: str, total_found: int) -> bool:
+        return total_found <= 5 or any(word in user_input.lower() for word in ['informações', 'detalhes', 'específico', 'numero', 'número'])
+    
+    @staticmethod
+    def select_fields(user_input: str, detailed: bool) -> List[str]:
+        """Campos da tabela conforme a pergunta: só o que foi pedido, além do básico"""
+        text = normalize_text(user_input)
+        
+        def mentions(keywords):
+            return re.search(r'\b(?:' + '|'.join(keywords) + r')\b', text) is not None
+        
+        requested = [field for field, keywords in IntentKeywords.RESULT_FIELD_KEYWORDS.items() if mentions(keywords)]
+        if detailed and mentions(IntentKeywords.FULL_DETAIL_KEYWORDS):
+            return DETAILED_FIELDS
+        if requested:
+            return BASE_FIELDS + requested
+        return SUMMARY_FIELDS
+    
+    def _build_search_prompt(self, user_input: str, search_results: Dict[str, Any]) -> str:
+        """Monta o prompt e registra em search_results["ids_exibidos"] os carros numerados nele"""
+        shown_cars = []
         if search_results["total_encontrados"] == 0:
             prompt = Prompts.NO_RESULTS.format(user_input=sanitize_text(user_input))
+        elif settings.COMPACT_RESULTS_PROMPT:
+            prompt, shown_cars = self._build_compact_prompt(user_input, search_results)
         else:
             cars_summary = []
             total_found = search_results["total_encontrados"]
             
             # Verificar se é uma busca específica ou listagem geral
-            is_specific_search = total_found <= 5 or any(word in user_input.lower() for word in ['informações', 'detalhes', 'específico', 'numero', 'número'])
+            is_specific_search = self._is_specific_search(user_input, total_found)
+            # Carro já exibido antes mantém o número que o usuário viu
+            positions = search_results.get("posicoes") or range(1, len(search_results["carros"]) + 1)
             
             if is_specific_search:
-                for i, car in enumerate(search_results["carros"][:settings.MAX_CARS_DETAILED], 1):
+                shown_cars = search_results["carros"][:settings.MAX_CARS_DETAILED]
+                for i, car in zip(positions, shown_cars):
                     car_info = format_car_detailed(car, i)
                     cars_summary.append(sanitize_text(car_info))
                 results_type = "Aqui estão os detalhes"
                 display_rule = "Para buscas especificas, de informaçoes mais detalhadas"
             else:
                 # Mostrar resumo
-                for i, car in enumerate(search_results["carros"][:settings.MAX_CARS_DISPLAY], 1):
+                shown_cars = search_results["carros"][:settings.MAX_CARS_DISPLAY]
+                for i, car in enumerate(shown_cars, 1):
                     car_info = format_car_summary(car, i)
                     cars_summary.append(sanitize_text(car_info))
                 results_type = f"Encontrei {len(cars_summary)} carros"
@@ -37,7 +80,10 @@ class ResponseService:
             more_info = ""
             if total_found > len(search_results["carros"]):
                 shown = len(search_results["carros"])
-                more_info = f"\n\nTenho mais {total_found - shown} carros similares se quiser ver."
+                if search_results.get("total_exato", True):
+                    more_info = f"\n\nTenho mais {total_found - shown} carros similares se quiser ver."
+                else:
+                    more_info = f"\n\nTenho pelo menos mais {total_found - shown} carros similares se quiser ver."
             
             prompt = Prompts.RESULTS_RESPONSE.format(
                 user_input=sanitize_text(user_input),
@@ -49,4 +95,40 @@ class ResponseService:
                 display_rule=display_rule
             )
         
-        return await self.ai_service.generate_response(prompt, conversation_history, database_context)
\ No newline at end of file
+        search_results["ids_exibidos"] = [car["id"] for car in shown_cars]
+        return prompt
+    
+    def _build_compact_prompt(self, user_input: str, search_results: Dict[str, Any]) -> Tuple[str, List[Dict[str, Any]]]:
+        total_found = search_results["total_encontrados"]
+        is_specific_search = self._is_specific_search(user_input, total_found)
+        max_cars = settings.MAX_CARS_DETAILED if is_specific_search else settings.MAX_CARS_DISPLAY
+        cars = search_results["carros"][:max_cars]
+        positions = list(search_results.get("posicoes") or range(1, len(cars) + 1))
+        fields = self.select_fields(user_input, is_specific_search)
+        if is_specific_search:
+            display_rule = "Apresente cada carro de forma clara, um campo por linha se forem poucos carros."
+        else:
+            display_rule = "Ao final, ofereça mais detalhes de qualquer carro pelo número."
+        
+        # Conta os tokens antes de enviar: acima do orçamento, os últimos carros saem do prompt
+        while True:
+            more_info = ""
+            if total_found > len(cars):
+                prefix = "" if search_results.get("total_exato", True) else "pelo menos "
+                more_info = f"\nHá {prefix}mais {total_found - len(cars)} carros similares, se o usuário quiser ver."
+            prompt = Prompts.RESULTS_RESPONSE_COMPACT.format(
+                user_input=sanitize_text(user_input),
+                total_found=total_found,
+                total_cars=len(cars),
+                cars_table=sanitize_text(format_cars_table(cars, fields, positions)),
+                more_info=more_info,
+                display_rule=display_rule
+            )
+            prompt_tokens = count_tokens(prompt)
+            if prompt_tokens <= settings.RESULTS_PROMPT_TOKEN_BUDGET or len(cars) <= 1:
+                break
+            cars = cars[:-1]
+        
+        if settings.DEBUG:
+            print(f"DEBUG - Prompt de resultados: {prompt_tokens} tokens, {len(cars)} carros, campos {fields}")
+        return prompt, cars
@@ -91,4 +91,44 @@ def mock_car_mcp_client(mock_search_results, mock_database_context):
     client.get_price_range = AsyncMock(return_value={"min": 20000, "max": 80000, "media": 45000})
     client.get_year_range = AsyncMock(return_value={"min": 2015, "max": 2024})
     client.get_car_metrics = AsyncMock(return_value={"metricas": [], "total_metricas": 0})
-    return client
\ No newline at end of file
+    return client
+
+
+@pytest.fixture
+def sample_carros():
+    """Lista determinística de carros para testes com banco real"""
+    from model.carros import Carro
+    from model.enums import TipoCombustivel, TipoTransmissao, TipoVeiculo
+    
+    specs = [
+        ('Toyota', 'Corolla', 2022, 'Preto', 95000, TipoCombustivel.FLEX, TipoTransmissao.AUTOMATICA),
+        ('Toyota', 'Etios', 2016, 'Branco', 42000, TipoCombustivel.FLEX, TipoTransmissao.MANUAL),
+        ('Honda', 'Civic', 2020, 'Prata', 88000, TipoCombustivel.GASOLINA, TipoTransmissao.CVT),
+        ('Honda', 'Fit', 2015, 'Preto', 45000, TipoCombustivel.FLEX, TipoTransmissao.MANUAL),
+        ('Ford', 'Ka', 2018, 'Vermelho', 38000, TipoCombustivel.FLEX, TipoTransmissao.MANUAL),
+        ('Ford', 'Ranger', 2021, 'Cinza', 150000, TipoCombustivel.DIESEL, TipoTransmissao.AUTOMATICA),
+        ('Fiat', 'Uno', 2012, 'Branco', 25000, TipoCombustivel.ETANOL, TipoTransmissao.MANUAL),
+        ('BYD', 'Dolphin', 2024, 'Azul', 150000, TipoCombustivel.ELETRICO, TipoTransmissao.AUTOMATICA),
+    ]
+    
+    carros = []
+    for i, (marca, modelo, ano, cor, preco, combustivel, transmissao) in enumerate(specs):
+        carros.append(Carro(
+            marca=marca, modelo=modelo, ano_fabricacao=ano, ano_modelo=ano,
+            motorizacao='1.6', tipo_combustivel=combustivel, transmissao=transmissao,
+            numero_portas=4, tipo_veiculo=TipoVeiculo.SEDAN if i % 2 else TipoVeiculo.HATCH,
+            quilometragem=(2025 - ano) * 10000, cor=cor, preco=preco,
+            placa=f"ABC{i}D{i:02d}", chassi=f"9BWZZZ377VT{i:06d}"
+        ))
+    return carros
+
+
+@pytest.fixture
+def db_manager(tmp_path, sample_carros):
+    """DatabaseManager com SQLite temporário já populado"""
+    from infra.database.database import DatabaseManager
+    
+    manager = DatabaseManager(str(tmp_path / "carros.db"))
+    manager.create_tables()
+    manager.insert_carros(sample_carros)
+    return manager
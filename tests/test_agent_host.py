@@ -0,0 +1,112 @@
+import asyncio
+import time
+import pytest
+import pytest_asyncio
+from agent_host import AgentHost
+from presentation.mcp import CarMCPServer
+from tests.test_ai_service import make_service
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest_asyncio.fixture
+async def host(db_manager):
+    ai_service, completions = make_service("Claro, posso ajudar!", delay=0.05, max_concurrency=200)
+    host = AgentHost(server=CarMCPServer(db_manager), ai_service=ai_service)
+    host.completions = completions
+    await host.start()
+    yield host
+    await host.stop()
+
+
+class TestAgentHost:
+    async def test_shared_catalog_context(self, host):
+        assert host.car_database_context["total_cars"] == 8
+        assert "BYD" in host.car_database_context["brands"]
+
+    async def test_sessions_run_concurrently_with_separate_histories(self, host):
+        sessions = [host.open_session() for _ in range(100)]
+
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[
+            host.handle_message(session.session_id, f"olá, sou o cliente {i}")
+            for i, session in enumerate(sessions)
+        ])
+        elapsed = time.perf_counter() - start
+
+        assert all(response == "Claro, posso ajudar!" for response in responses)
+        assert elapsed < 1.0
+        for i, session in enumerate(sessions):
+            assert [m["content"] for m in session.conversation_history] == [
+                f"olá, sou o cliente {i}", "Claro, posso ajudar!"
+            ]
+
+    async def test_messages_in_one_session_keep_order(self, host):
+        session = host.open_session()
+
+        await asyncio.gather(*[host.handle_message(session.session_id, f"mensagem {i}") for i in range(3)])
+
+        user_messages = [m["content"] for m in session.conversation_history if m["role"] == "user"]
+        assert user_messages == ["mensagem 0", "mensagem 1", "mensagem 2"]
+
+    async def test_session_limit_and_expiry(self, host, monkeypatch):
+        from infra.config.settings import settings
+        monkeypatch.setattr(settings, "AGENT_MAX_SESSIONS", 2)
+        monkeypatch.setattr(settings, "AGENT_SESSION_TTL", 60)
+        first = host.open_session()
+        host.open_session()
+
+        with pytest.raises(RuntimeError):
+            host.open_session()
+
+        first.last_active -= 120
+        host.open_session()
+        with pytest.raises(KeyError):
+            await host.handle_message(first.session_id, "oi")
+
+    async def test_ordinal_reference_uses_last_shown_ids(self, host):
+        session = host.open_session()
+
+        await host.handle_message(session.session_id, "toyota")
+        shown = list(session.last_shown_ids)
+        assert len(shown) == 2
+
+        requests = []
+        original = host.server.handle_request
+
+        async def spy(request):
+            requests.append(request.method)
+            return await original(request)
+
+        host.server.handle_request = spy
+        calls_before = len(host.completions.calls)
+        await host.handle_message(session.session_id, "detalhes do carro 2")
+
+        # Uma consulta por id e uma única chamada ao modelo, para a resposta
+        assert requests == ["get_cars_by_ids"]
+        assert len(host.completions.calls) == calls_before + 1
+        prompt = host.completions.calls[-1]["messages"][-1]["content"]
+        assert f"{host.server.car_repo.get_car_by_id(shown[1]).placa}" in prompt
+        assert session.last_shown_ids == shown
+
+    async def test_last_shown_ids_are_the_cars_in_the_prompt(self, host, monkeypatch):
+        from infra.config.settings import settings
+        monkeypatch.setattr(settings, "MAX_CARS_DETAILED", 1)
+        session = host.open_session()
+
+        # Dois Toyotas encontrados, mas a busca detalhada só mostra um
+        await host.handle_message(session.session_id, "toyota")
+
+        assert len(session.last_shown_ids) == 1
+        shown = host.server.car_repo.get_car_by_id(session.last_shown_ids[0]).modelo
+        hidden = ({"Corolla", "Etios"} - {shown}).pop()
+        prompt = host.completions.calls[-1]["messages"][-1]["content"]
+        assert shown in prompt and hidden not in prompt
+
+    async def test_open_session_rejects_existing_id(self, host):
+        session = host.open_session("cliente-1")
+        session.conversation_history.add("user", "oi")
+
+        with pytest.raises(ValueError):
+            host.open_session("cliente-1")
+        assert host.get_session("cliente-1") is session
@@ -0,0 +1,160 @@
+import asyncio
+import time
+import pytest
+from types import SimpleNamespace
+from services.ai_service import AIService
+from infra.shared.response_cache import ResponseCache
+
+pytestmark = pytest.mark.asyncio
+
+
+class FakeCompletions:
+    """Simula chat.completions do AsyncOpenAI com latência fixa"""
+    
+    def __init__(self, content: str, delay: float = 0.0):
+        self.content = content
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+    
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        if kwargs.get("stream"):
+            return self._stream()
+        message = SimpleNamespace(content=self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+    
+    async def _stream(self):
+        for word in self.content.split(" "):
+            delta = SimpleNamespace(content=word + " ")
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+def make_service(content: str, delay: float = 0.0, max_concurrency: int = None):
+    completions = FakeCompletions(content, delay)
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return AIService(client=client, max_concurrency=max_concurrency), completions
+
+
+class TestAsyncClient:
+    async def test_analyze_intent_uses_async_client(self):
+        service, completions = make_service('{"needs_search": true, "intent_type": "search", "confidence": 0.9}')
+        
+        intent = await service.analyze_intent("quero um carro")
+        
+        assert intent["needs_search"] is True
+        assert len(completions.calls) == 1
+        assert "timeout" in completions.calls[0]
+    
+    async def test_concurrent_calls_overlap(self):
+        service, completions = make_service("Olá!", delay=0.2, max_concurrency=10)
+        
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            service.generate_response(f"oi {i}", [], {}) for i in range(5)
+        ])
+        elapsed = time.perf_counter() - start
+        
+        assert completions.max_in_flight == 5
+        assert elapsed < 0.5
+    
+    async def test_concurrency_limit_is_respected(self):
+        service, completions = make_service("Olá!", delay=0.05, max_concurrency=2)
+        
+        await asyncio.gather(*[
+            service.generate_response(f"oi {i}", [], {}) for i in range(6)
+        ])
+        
+        assert completions.max_in_flight == 2
+
+
+class TestCombinedExtraction:
+    async def test_single_call_returns_intent_and_filters(self):
+        payload = ('{"needs_search": true, "intent_type": "search", "confidence": 0.9, '
+                   '"filters": {"marca": "Toyota", "preco_max": 80000, "modelo": null}}')
+        service, completions = make_service(payload)
+        
+        analysis = await service.analyze_intent_and_filters("Toyota até 80 mil", ["Toyota"])
+        
+        assert len(completions.calls) == 1
+        assert analysis["intent"]["needs_search"] is True
+        assert analysis["filters"] == {"marca": "Toyota", "preco_max": 80000}
+    
+    async def test_fallback_on_invalid_json(self):
+        service, _ = make_service("não é json")
+        
+        analysis = await service.analyze_intent_and_filters("quero um carro preto", [])
+        
+        assert analysis["intent"]["needs_search"] is True
+        assert analysis["filters"]["cor"] == "Preto"
+
+
+class TestResponseCache:
+    async def test_repeated_prompt_is_served_from_cache(self):
+        service, completions = make_service("Olá! Como posso ajudar?")
+        
+        first = await service.generate_response("Cumprimente o usuário", [], {})
+        second = await service.generate_response("  cumprimente o USUÁRIO ", [], {})
+        
+        assert first == second
+        assert len(completions.calls) == 1
+        assert service.cache_stats()["hits"] == 1
+        assert service.cache_stats()["misses"] == 1
+    
+    async def test_async_access_reads_and_writes_sqlite_off_the_loop(self, tmp_path, monkeypatch):
+        db_path = str(tmp_path / "cache.db")
+        cache = ResponseCache(db_path=db_path)
+        threads = []
+        original = asyncio.to_thread
+        
+        async def tracking_to_thread(func, *args):
+            threads.append(func.__name__)
+            return await original(func, *args)
+        
+        monkeypatch.setattr(asyncio, "to_thread", tracking_to_thread)
+        await cache.aset("chave", "valor")
+        
+        fresh = ResponseCache(db_path=db_path)
+        assert await fresh.aget("chave") == "valor"
+        assert await fresh.aget("chave") == "valor"
+        assert threads == ["_write_to_db", "_read_from_db"]
+        assert fresh.stats()["hits"] == 2
+
+
+class TestStreaming:
+    async def test_stream_yields_tokens_as_they_arrive(self):
+        service, completions = make_service("Temos três carros disponíveis")
+        
+        tokens = [token async for token in service.generate_response_stream("oi", [], {})]
+        
+        assert len(tokens) == 4
+        assert completions.calls[0]["stream"] is True
+    
+    async def test_on_token_callback_receives_full_text(self):
+        service, _ = make_service("Temos três carros disponíveis")
+        received = []
+        
+        response = await service.generate_response("oi", [], {}, on_token=received.append)
+        
+        assert "".join(received).strip() == response == "Temos três carros disponíveis"
+    
+    async def test_async_on_token_is_awaited_between_tokens(self):
+        service, _ = make_service("um dois três")
+        events = []
+        
+        async def on_token(token):
+            events.append(("start", token))
+            await asyncio.sleep(0.01)
+            events.append(("end", token))
+        
+        await service.generate_response("oi", [], {}, on_token=on_token)
+        
+        # Cada token só é entregue depois que o anterior terminou de ser escrito
+        assert [kind for kind, _ in events] == ["start", "end"] * 3
@@ -0,0 +1,248 @@
+import pytest
+from infra.database.car_repository import CarRepository
+
+
+class TestSearchCars:
+    def test_total_and_page_in_single_search(self, db_manager):
+        repo = CarRepository(db_manager)
+        
+        result = repo.search_cars_optimized({"marca": "Toyota", "limit": 1})
+        
+        assert result.total_encontrados == 2
+        assert result.total_exibidos == 1
+        assert result.total_exato is True
+    
+    def test_offset_past_end_keeps_total(self, db_manager):
+        repo = CarRepository(db_manager)
+        
+        result = repo.search_cars_optimized({"preco_max": 50000, "offset": 10})
+        
+        assert result.total_encontrados == 4
+        assert result.carros == []
+    
+    def test_count_cache_is_invalidated_on_insert(self, db_manager, sample_carros):
+        repo = CarRepository(db_manager)
+        assert repo.search_cars_optimized({"marca": "Toyota"}).total_encontrados == 2
+        
+        novo = sample_carros[0]
+        novo.placa, novo.chassi = "XYZ9Z99", "9BWZZZ377VT999999"
+        db_manager.insert_carros([novo])
+        
+        assert repo.search_cars_optimized({"marca": "Toyota"}).total_encontrados == 3
+    
+    def test_count_cache_sees_writes_from_another_manager(self, db_manager, sample_carros):
+        from infra.database.database import DatabaseManager
+        repo = CarRepository(db_manager)
+        assert repo.search_cars_optimized({"marca": "Toyota"}).total_encontrados == 2
+        
+        # Outro processo escrevendo no mesmo arquivo
+        other = DatabaseManager(db_manager.engine.url.database)
+        novo = sample_carros[0]
+        novo.placa, novo.chassi = "XYZ9Z99", "9BWZZZ377VT999999"
+        other.insert_carros([novo])
+        
+        assert repo.search_cars_optimized({"marca": "Toyota"}).total_encontrados == 3
+    
+    def test_capped_total_reports_at_least(self, db_manager, monkeypatch):
+        from infra.config.settings import settings
+        monkeypatch.setattr(settings, "SEARCH_COUNT_CAP", 3)
+        repo = CarRepository(db_manager)
+        
+        result = repo.search_cars_optimized({"exact_total": False, "limit": 2})
+        
+        assert result.total_encontrados == 3
+        assert result.total_exato is False
+
+
+class TestIndexedMatching:
+    def test_brand_model_and_color_match_case_and_accent_insensitive(self, db_manager):
+        repo = CarRepository(db_manager)
+        
+        assert repo.search_cars_optimized({"marca": "TOYOTA", "modelo": "coro"}).total_encontrados == 1
+        assert repo.search_cars_optimized({"cor": "prêto"}).total_encontrados == 2
+    
+    def test_brand_filter_uses_index(self, db_manager):
+        from sqlalchemy import select, text
+        from infra.database.car_filters import CarFilters
+        from infra.database.models import CarroDB
+        
+        stmt = CarFilters(marca="Honda").apply_to_statement(select(CarroDB.id))
+        compiled = stmt.compile(db_manager.engine, compile_kwargs={"literal_binds": True})
+        with db_manager.engine.connect() as conn:
+            plan = " ".join(str(row[-1]) for row in conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+        
+        assert "idx_marca_modelo_norm" in plan
+    
+    def test_fuzzy_text_search(self, db_manager):
+        repo = CarRepository(db_manager)
+        
+        result = repo.search_cars_optimized({"texto": "dolph"})
+        
+        assert [car.modelo for car in result.carros] == ["Dolphin"]
+    
+    def test_existing_database_is_migrated(self, tmp_path, sample_carros):
+        import sqlite3
+        from infra.database.database import DatabaseManager
+        
+        db_path = str(tmp_path / "antigo.db")
+        manager = DatabaseManager(db_path)
+        manager.create_tables()
+        manager.insert_carros(sample_carros)
+        conn = sqlite3.connect(db_path)
+        for statement in ("DROP TRIGGER carros_fts_ai", "DROP TRIGGER carros_fts_ad", "DROP TRIGGER carros_fts_au",
+                          "DROP TABLE carros_fts", "DROP INDEX idx_marca_modelo_norm", "DROP INDEX idx_cor_norm",
+                          "ALTER TABLE carros DROP COLUMN marca_norm", "ALTER TABLE carros DROP COLUMN modelo_norm",
+                          "ALTER TABLE carros DROP COLUMN cor_norm"):
+            conn.execute(statement)
+        conn.commit()
+        conn.close()
+        
+        migrated = DatabaseManager(db_path)
+        migrated.create_tables()
+        
+        assert CarRepository(migrated).search_cars_optimized({"marca": "honda"}).total_encontrados == 2
+
+
+class TestEnumFilters:
+    def test_fuel_and_transmission_are_filtered(self, db_manager):
+        repo = CarRepository(db_manager)
+        
+        result = repo.search_cars_optimized({"combustivel": "Flex", "transmissao": "Automático"})
+        
+        assert [car.modelo for car in result.carros] == ["Corolla"]
+    
+    def test_aliases_and_vehicle_type(self, db_manager):
+        repo = CarRepository(db_manager)
+        
+        assert repo.search_cars_optimized({"combustivel": "Álcool"}).total_encontrados == 1
+        assert repo.search_cars_optimized({"tipo_veiculo": "Sedan"}).total_encontrados == 4
+    
+    def test_fuel_transmission_price_index_is_used(self, db_manager):
+        from sqlalchemy import select, text
+        from infra.database.car_filters import CarFilters
+        from infra.database.models import CarroDB
+        
+        filters = CarFilters(combustivel="flex", transmissao="manual", preco_max=50000)
+        stmt = filters.apply_to_statement(select(CarroDB.id))
+        compiled = stmt.compile(db_manager.engine, compile_kwargs={"literal_binds": True})
+        with db_manager.engine.connect() as conn:
+            plan = " ".join(str(row[-1]) for row in conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+        
+        assert "idx_combustivel_transmissao_preco" in plan
+
+
+class TestKeysetPagination:
+    @pytest.mark.parametrize("order_by", [None, "preco_asc", "preco_desc", "quilometragem_asc", "ano_desc"])
+    def test_cursor_pages_match_full_ordering(self, db_manager, order_by):
+        repo = CarRepository(db_manager)
+        base = {"order_by": order_by} if order_by else {}
+        expected = [car.id for car in repo.search_cars_optimized({**base, "limit": 100}).carros]
+        
+        seen, cursor = [], None
+        while True:
+            page = repo.search_cars_optimized({**base, "limit": 3, "cursor": cursor})
+            assert page.total_encontrados == len(expected)
+            seen.extend(car.id for car in page.carros)
+            cursor = page.next_cursor
+            if not cursor:
+                break
+        
+        assert seen == expected
+    
+    def test_cursor_from_other_ordering_is_rejected(self, db_manager):
+        repo = CarRepository(db_manager)
+        cursor = repo.search_cars_optimized({"order_by": "preco_asc", "limit": 2}).next_cursor
+        
+        with pytest.raises(ValueError):
+            repo.search_cars_optimized({"order_by": "ano_desc", "cursor": cursor})
+
+
+class TestCarsByIds:
+    def test_one_query_in_requested_order(self, db_manager):
+        from sqlalchemy import event
+        repo = CarRepository(db_manager)
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db_manager.read_engine, "before_cursor_execute", listener)
+        try:
+            result = repo.get_cars_by_ids([5, 999, 2, 5, 7])
+        finally:
+            event.remove(db_manager.read_engine, "before_cursor_execute", listener)
+        
+        assert [car.id for car in result.carros] == [5, 2, 7]
+        assert result.nao_encontrados == [999]
+        assert len([s for s in statements if "IN" in s]) == 1
+
+
+class TestCatalogStatistics:
+    def test_snapshot_matches_catalog(self, db_manager):
+        repo = CarRepository(db_manager)
+        
+        stats = repo.get_car_statistics()
+        
+        assert stats["total_carros"] == 8
+        assert stats["por_marca"]["Toyota"] == 2
+        assert stats["por_combustivel"]["flex"] == 4
+        assert repo.get_price_range()["min"] == 25000
+        assert repo.get_year_range() == {"min": 2012, "max": 2024}
+        assert repo.get_available_brands()["marcas"] == ["BYD", "Fiat", "Ford", "Honda", "Toyota"]
+    
+    def test_snapshot_is_updated_incrementally(self, db_manager, sample_carros):
+        repo = CarRepository(db_manager)
+        repo.get_car_statistics()
+        
+        novo = sample_carros[0]
+        novo.marca, novo.placa, novo.chassi = "Audi", "XYZ9Z99", "9BWZZZ377VT999999"
+        db_manager.insert_carros([novo])
+        
+        assert repo.get_car_statistics()["total_carros"] == 9
+        assert "Audi" in repo.get_available_brands()["marcas"]
+        
+        audi_id = repo.search_cars_optimized({"marca": "Audi"}).carros[0].id
+        db_manager.delete_carros([audi_id])
+        
+        assert "Audi" not in repo.get_available_brands()["marcas"]
+        assert repo.get_car_statistics()["total_carros"] == 8
+    
+    def test_own_writes_do_not_reaggregate(self, db_manager, sample_carros, monkeypatch):
+        repo = CarRepository(db_manager)
+        repo.get_car_statistics()
+        calls = []
+        original = db_manager.stats._aggregate
+        monkeypatch.setattr(db_manager.stats, "_aggregate", lambda: calls.append(1) or original())
+        
+        novo = sample_carros[0]
+        novo.placa, novo.chassi = "XYZ9Z99", "9BWZZZ377VT999999"
+        db_manager.insert_carros([novo])
+        
+        assert repo.get_car_statistics()["total_carros"] == 9
+        assert calls == []
+    
+    def test_writes_from_another_manager_reload(self, db_manager, sample_carros):
+        from infra.database.database import DatabaseManager
+        repo = CarRepository(db_manager)
+        assert repo.get_car_statistics()["total_carros"] == 8
+        
+        other = DatabaseManager(db_manager.engine.url.database)
+        novo = sample_carros[0]
+        novo.marca, novo.placa, novo.chassi = "Audi", "XYZ9Z99", "9BWZZZ377VT999999"
+        other.insert_carros([novo])
+        
+        assert repo.get_car_statistics()["total_carros"] == db_manager.count_carros() == 9
+        assert "Audi" in repo.get_available_brands()["marcas"]
+        
+        # Escrita local depois da externa: a versão pulou, então reagrega em vez de somar
+        novo.placa, novo.chassi = "XYZ9Z98", "9BWZZZ377VT999998"
+        db_manager.insert_carros([novo])
+        other.delete_carros([repo.search_cars_optimized({"marca": "Audi", "limit": 1}).carros[0].id])
+        
+        assert repo.get_car_statistics()["total_carros"] == db_manager.count_carros() == 9
+    
+    def test_removing_extreme_value_reloads(self, db_manager):
+        repo = CarRepository(db_manager)
+        uno_id = repo.search_cars_optimized({"modelo": "Uno"}).carros[0].id
+        
+        db_manager.update_carro(uno_id, preco=30000.0)
+        
+        assert repo.get_price_range()["min"] == 30000
+        assert repo.get_car_statistics()["total_carros"] == 8
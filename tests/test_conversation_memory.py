@@ -0,0 +1,52 @@
+from infra.shared.conversation_memory import ConversationMemory
+from infra.shared.tokens import count_message_tokens
+from services.ai_service import AIService
+
+CAR_LIST = "Encontrei 10 carros para você.\n" + "\n".join(
+    f"{i}. Toyota Corolla 2020 - Preto - R$ 85.000,00 - 45.000 km - Flex - Automático" for i in range(1, 11)
+)
+
+
+class TestConversationMemory:
+    def test_keeps_recent_messages_and_summarizes_older_ones(self):
+        memory = ConversationMemory(max_messages=4, max_tokens=10_000)
+        for i in range(6):
+            memory.add("user", f"Pergunta número {i}. Com mais texto depois.")
+
+        assert [m["content"] for m in memory] == [f"Pergunta número {i}. Com mais texto depois." for i in range(2, 6)]
+        assert memory.summary == "- Usuário: Pergunta número 0.\n- Usuário: Pergunta número 1."
+
+        messages = memory.prompt_messages()
+        assert messages[0]["role"] == "system" and "Pergunta número 1." in messages[0]["content"]
+        assert len(messages) == 5
+
+    def test_token_budget_compacts_long_assistant_turns(self):
+        memory = ConversationMemory(max_messages=50, max_tokens=200, summary_tokens=60)
+        for i in range(40):
+            memory.add("user", f"mostre carros toyota {i}")
+            memory.add("assistant", CAR_LIST)
+
+        assert memory.token_count <= 200 + 60
+        # A lista sozinha passa do orçamento: fica cortada, mas continua sendo a última mensagem
+        last = list(memory)[-1]
+        assert last["role"] == "assistant" and last["content"].endswith("…")
+        # Só a primeira frase da lista entra no resumo
+        assert "- Assistente: Encontrei 10 carros para você." in memory.summary
+
+    def test_prompt_size_stays_flat_over_long_chat(self):
+        service = AIService(client=object(), cache=None)
+        memory = ConversationMemory()
+        sizes = []
+        for i in range(300):
+            memory.add("user", f"quero ver opções de sedan até {i} mil")
+            memory.add("assistant", CAR_LIST)
+            sizes.append(count_message_tokens(service._build_messages("oi", memory, {})))
+
+        assert max(sizes[50:]) == max(sizes[-10:])
+        assert len(memory._messages) <= memory.max_messages
+
+    def test_sanitizes_once_on_append(self):
+        memory = ConversationMemory()
+        memory.append({"role": "user", "content": "  olá\x00 mundo \ud800 "})
+
+        assert list(memory) == [{"role": "user", "content": "olá mundo"}]
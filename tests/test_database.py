@@ -0,0 +1,117 @@
+import pytest
+from sqlalchemy import text
+from infra.database.database import DatabaseManager
+from infra.database.car_repository import CarRepository
+
+
+class TestEngineProfiles:
+    def test_concurrent_profile_uses_wal_and_read_only_readers(self, db_manager):
+        with db_manager.engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        with db_manager.read_engine.connect() as conn:
+            assert conn.execute(text("PRAGMA query_only")).scalar() == 1
+            assert conn.execute(text("PRAGMA mmap_size")).scalar() > 0
+
+    def test_search_does_not_wait_for_open_write(self, db_manager, sample_carros):
+        from infra.database.models import CarroDB
+        repo = CarRepository(db_manager)
+        writer = db_manager.get_session()
+        try:
+            novo = sample_carros[0]
+            writer.add(CarroDB(
+                marca=novo.marca, modelo=novo.modelo, ano_fabricacao=novo.ano, ano_modelo=novo.ano_modelo,
+                motorizacao=novo.motorizacao, tipo_combustivel=novo.tipo_combustivel,
+                transmissao=novo.transmissao, numero_portas=novo.numero_portas,
+                tipo_veiculo=novo.tipo_veiculo, quilometragem=novo.quilometragem, cor=novo.cor,
+                preco=novo.preco, placa="ZZZ9Z99", chassi="ZZZZZZZZZZZZZZZZZ"
+            ))
+            writer.flush()
+
+            # Leitor enxerga o último commit, sem bloquear na transação aberta
+            assert repo.search_cars_optimized({}).total_encontrados == 8
+        finally:
+            writer.rollback()
+            writer.close()
+
+    def test_default_profile_keeps_single_engine(self, tmp_path):
+        manager = DatabaseManager(str(tmp_path / "default.db"), profile="default")
+
+        assert manager.read_engine is manager.engine
+
+    def test_unknown_profile_is_rejected(self, tmp_path):
+        with pytest.raises(ValueError):
+            DatabaseManager(str(tmp_path / "x.db"), profile="turbo")
+
+
+def _gerar_carros(sample_carros, quantidade, inicio=100):
+    """Gera carros com placa/chassi únicos a partir dos exemplos"""
+    from model.carros import Carro
+    for i in range(inicio, inicio + quantidade):
+        base = sample_carros[i % len(sample_carros)]
+        yield Carro(
+            marca=base.marca, modelo=base.modelo, ano_fabricacao=base.ano, ano_modelo=base.ano_modelo,
+            motorizacao=base.motorizacao, tipo_combustivel=base.tipo_combustivel,
+            transmissao=base.transmissao, numero_portas=base.numero_portas,
+            tipo_veiculo=base.tipo_veiculo, quilometragem=base.quilometragem, cor=base.cor,
+            preco=base.preco, placa=f"BLK{i:07d}", chassi=f"BULK{i:013d}"
+        )
+
+
+class TestBulkInsert:
+    def test_chunks_from_iterator_keep_stats_and_search_in_sync(self, db_manager, sample_carros):
+        repo = CarRepository(db_manager)
+        assert repo.search_cars_optimized({"marca": "toyota"}).total_encontrados == 2
+
+        report = db_manager.bulk_insert_carros(_gerar_carros(sample_carros, 40), chunk_size=16)
+
+        assert report["total"] == 40
+        assert report["linhas_por_segundo"] > 0
+        assert db_manager.count_carros() == 48
+        assert db_manager.stats.snapshot()["total_carros"] == 48
+        # Colunas normalizadas preenchidas pelo default de Core e cache de total invalidado
+        assert repo.search_cars_optimized({"marca": "toyota"}).total_encontrados == 12
+
+    def test_iterator_is_consumed_chunk_by_chunk(self, db_manager, sample_carros):
+        seen_counts = []
+
+        def carros():
+            for i, carro_obj in enumerate(_gerar_carros(sample_carros, 25)):
+                if i % 10 == 0:
+                    seen_counts.append(db_manager.count_carros())
+                yield carro_obj
+
+        db_manager.bulk_insert_carros(carros(), chunk_size=10)
+
+        assert seen_counts == [8, 18, 28]
+
+    def test_upsert_updates_existing_placa_or_chassi(self, db_manager, sample_carros):
+        original = db_manager.search_by_placa(sample_carros[0].placa)
+        sample_carros[0].preco = 99999
+        sample_carros[1].placa = "NOVA000"
+        sample_carros[1].preco = 11111
+
+        report = db_manager.bulk_insert_carros(sample_carros[:2], upsert=True)
+
+        assert report["total"] == 2
+        assert db_manager.count_carros() == 8
+        atualizado = db_manager.search_by_placa(sample_carros[0].placa)
+        assert atualizado.id == original.id
+        assert atualizado.preco == 99999
+        assert db_manager.search_by_placa("NOVA000").preco == 11111
+        assert db_manager.stats.snapshot()["faixa_preco"]["min"] == 11111
+
+    def test_duplicate_without_upsert_fails(self, db_manager, sample_carros):
+        from sqlalchemy.exc import IntegrityError
+
+        with pytest.raises(IntegrityError):
+            db_manager.bulk_insert_carros(sample_carros[:1])
+
+    def test_deferred_indexes_are_recreated(self, db_manager, sample_carros):
+        from sqlalchemy import inspect
+        before = {index["name"] for index in inspect(db_manager.engine).get_indexes("carros")}
+
+        db_manager.bulk_insert_carros(_gerar_carros(sample_carros, 20), defer_indexes=True)
+
+        after = {index["name"] for index in inspect(db_manager.engine).get_indexes("carros")}
+        assert after == before
+        assert "idx_marca_modelo_norm" in after
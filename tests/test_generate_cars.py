@@ -0,0 +1,72 @@
+import json
+import re
+from factory.generate_cars import (
+    carro_para_dict, gerar_carros_paralelo, gravar_carros, main, placa_por_indice
+)
+from infra.database.database import DatabaseManager
+
+
+def _sem_datas(carros):
+    # Datas são relativas a datetime.now(); o resto deve ser idêntico
+    return [{k: v for k, v in carro_para_dict(c).items() if not k.startswith("data_")} for c in carros]
+
+
+class TestParallelGenerator:
+    def test_plates_are_unique_and_valid(self):
+        placas = [placa_por_indice(i) for i in range(50_000)]
+
+        assert len(set(placas)) == len(placas)
+        assert all(re.fullmatch(r"[A-Z]{3}\d[A-Z]\d{2}", placa) for placa in placas)
+
+    def test_output_does_not_depend_on_worker_count(self):
+        sequencial = list(gerar_carros_paralelo(60, workers=1, seed=7, tamanho_bloco=16))
+        paralelo = list(gerar_carros_paralelo(60, workers=2, seed=7, tamanho_bloco=16))
+        outra_seed = list(gerar_carros_paralelo(60, workers=1, seed=8, tamanho_bloco=16))
+
+        assert _sem_datas(sequencial) == _sem_datas(paralelo)
+        assert _sem_datas(sequencial) != _sem_datas(outra_seed)
+        assert len({c.chassi for c in paralelo}) == 60
+
+    def test_offset_continues_without_collisions(self):
+        primeiro = list(gerar_carros_paralelo(30, workers=1, tamanho_bloco=10))
+        segundo = list(gerar_carros_paralelo(30, workers=1, inicio=30, tamanho_bloco=10))
+
+        placas = {c.placa for c in primeiro + segundo}
+        assert len(placas) == 60
+
+    def test_json_and_jsonl_outputs(self, tmp_path):
+        carros = list(gerar_carros_paralelo(5, workers=1))
+        caminho_json = str(tmp_path / "carros.json")
+        caminho_jsonl = str(tmp_path / "carros.jsonl")
+
+        assert len(list(gravar_carros(carros, caminho_json, len(carros)))) == 5
+        list(gravar_carros(carros, caminho_jsonl, len(carros)))
+
+        with open(caminho_json, encoding="utf-8") as f:
+            documento = json.load(f)
+        with open(caminho_jsonl, encoding="utf-8") as f:
+            linhas = [json.loads(linha) for linha in f]
+        assert documento["total_carros"] == 5
+        assert documento["carros"] == linhas == [carro_para_dict(c) for c in carros]
+
+    def test_cli_streams_into_database(self, tmp_path, capsys):
+        caminho_db = str(tmp_path / "gerado.db")
+
+        main(["--quantidade", "40", "--workers", "1", "--bloco", "15",
+              "--sem-saida", "--database", caminho_db])
+
+        assert DatabaseManager(caminho_db).count_carros() == 40
+        assert "Inseridos 40 carros" in capsys.readouterr().out
+
+    def test_cli_runs_again_on_the_same_database(self, tmp_path, capsys):
+        caminho_db = str(tmp_path / "gerado.db")
+        argv = ["--quantidade", "20", "--workers", "1", "--sem-saida", "--database", caminho_db]
+
+        main(argv)
+        main(argv)
+        assert DatabaseManager(caminho_db).count_carros() == 40
+
+        # Faixa explícita já usada: erro reportado, sem exceção
+        main(argv + ["--inicio", "0"])
+        assert "Erro ao inserir no banco" in capsys.readouterr().out
+        assert DatabaseManager(caminho_db).count_carros() == 40
@@ -0,0 +1,90 @@
+import io
+import json
+import pytest
+from factory.generate_cars import carro_para_dict, salvar_carros_json
+from factory.import_cars import iter_registros_json, importar_catalogo
+from infra.database.database import DatabaseManager
+
+
+@pytest.fixture
+def empty_db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "import.db"))
+    manager.create_tables()
+    return manager
+
+
+class TestStreamingReader:
+    @pytest.mark.parametrize("read_size", [1, 7, 4096])
+    def test_matches_json_load_for_any_read_size(self, sample_carros, tmp_path, read_size):
+        caminho = str(tmp_path / "carros.json")
+        salvar_carros_json(sample_carros, caminho)
+        with open(caminho, encoding="utf-8") as arquivo:
+            esperado = json.load(arquivo)["carros"]
+
+        with open(caminho, encoding="utf-8") as arquivo:
+            registros = list(iter_registros_json(arquivo, read_size=read_size))
+
+        assert registros == esperado
+
+    def test_reads_lazily(self):
+        texto = '{"total_carros": 3, "carros": [{"a": 1}, {"a": 2}, {"a": 3}]}'
+        arquivo = io.StringIO(texto)
+
+        registros = iter_registros_json(arquivo, read_size=8)
+        assert next(registros) == {"a": 1}
+        assert arquivo.tell() < len(texto)
+
+    def test_root_array_and_missing_key(self):
+        assert list(iter_registros_json(io.StringIO('[{"a": 1}, {"a": 2}]'))) == [{"a": 1}, {"a": 2}]
+        with pytest.raises(ValueError):
+            list(iter_registros_json(io.StringIO('{"outros": []}')))
+
+    @pytest.mark.parametrize("read_size", [1, 5, 4096])
+    def test_key_is_found_structurally(self, read_size):
+        # "carros" como valor de outra chave não é o início do array
+        texto = '{"titulo": "carros", "total_carros": 12345, "carros": [{"a": 1}]}'
+
+        assert list(iter_registros_json(io.StringIO(texto), read_size=read_size)) == [{"a": 1}]
+        with pytest.raises(ValueError):
+            list(iter_registros_json(io.StringIO('{"titulo": "carros", "lista": []}'), read_size=read_size))
+
+
+class TestImportCatalog:
+    def test_json_export_round_trip(self, sample_carros, empty_db, tmp_path):
+        caminho = str(tmp_path / "carros.json")
+        salvar_carros_json(sample_carros, caminho)
+
+        relatorio = importar_catalogo(caminho, empty_db, chunk_size=3)
+
+        assert relatorio["total"] == 8
+        assert relatorio["invalidos"] == 0
+        assert empty_db.stats.snapshot()["total_carros"] == 8
+        carro = empty_db.search_by_placa(sample_carros[0].placa)
+        assert carro.tipo_combustivel == sample_carros[0].tipo_combustivel
+        assert carro.marca_norm == "toyota"
+
+    def test_jsonl_with_invalid_records(self, sample_carros, empty_db, tmp_path):
+        caminho = tmp_path / "carros.jsonl"
+        linhas = [carro_para_dict(c) for c in sample_carros[:3]]
+        linhas[1]["tipo_combustivel"] = "vapor"
+        del linhas[2]["placa"]
+        caminho.write_text("\n".join(json.dumps(linha) for linha in linhas) + "\n", encoding="utf-8")
+
+        relatorio = importar_catalogo(str(caminho), empty_db)
+
+        assert relatorio["total"] == 1
+        assert relatorio["invalidos"] == 2
+        assert len(relatorio["erros"]) == 2
+        assert empty_db.count_carros() == 1
+
+    def test_jsonl_malformed_line_counts_as_invalid(self, sample_carros, empty_db, tmp_path):
+        caminho = tmp_path / "carros.jsonl"
+        linhas = [json.dumps(carro_para_dict(c)) for c in sample_carros[:3]]
+        linhas.insert(1, '{"marca": "Toyota", ')
+        caminho.write_text("\n".join(linhas) + "\n", encoding="utf-8")
+
+        relatorio = importar_catalogo(str(caminho), empty_db, chunk_size=1)
+
+        assert relatorio["total"] == 3
+        assert relatorio["invalidos"] == 1
+        assert "linha 2" in relatorio["erros"][0]
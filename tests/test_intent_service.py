@@ -0,0 +1,82 @@
+import pytest
+from services.intent_service import IntentService
+
+
+class TestLocalParser:
+    @pytest.mark.parametrize("user_input, expected", [
+        ("Toyota Corolla preto", {"marca": "Toyota", "modelo": "Corolla", "cor": "Preto"}),
+        ("carros automáticos até 80 mil", {"transmissao": "automatica", "preco_max": 80000}),
+        ("entre 30 e 80 mil", {"preco_min": 30000, "preco_max": 80000}),
+        ("carros de 2020 até 2022", {"ano_min": 2020, "ano_max": 2022}),
+        ("de 50 a 90 mil", {"preco_min": 50000, "preco_max": 90000}),
+        ("Carros de 2020", {"ano_min": 2020, "ano_max": 2020}),
+        ("carros a partir de 2018 até R$ 80.000", {"ano_min": 2018, "preco_max": 80000}),
+        ("suv automático diesel", {"tipo_veiculo": "suv", "transmissao": "automatica", "combustivel": "diesel"}),
+        ("peugeot 2008 flex 4 portas", {"marca": "Peugeot", "modelo": "2008", "combustivel": "flex", "numero_portas": 4}),
+    ])
+    def test_extracts_filters_with_high_confidence(self, user_input, expected):
+        analysis = IntentService.parse_local_query(user_input, ["Toyota", "Peugeot"])
+        
+        assert analysis["filters"] == expected
+        assert analysis["intent"]["needs_search"] is True
+        assert analysis["intent"]["confidence"] >= 0.8
+    
+    def test_leftover_number_defers_to_llm(self):
+        analysis = IntentService.parse_local_query("quero um carro toyota preto automático flex 2020 2022", ["Toyota"])
+        
+        assert analysis["intent"]["confidence"] < 0.8
+    
+    @pytest.mark.parametrize("user_input, expected", [
+        ("toyota corolla automatico ate 100 mil com no maximo 40 mil km",
+         {"marca": "Toyota", "modelo": "Corolla", "transmissao": "automatica", "preco_max": 100000}),
+        ("quero um carro automatico flex com menos de 60 mil km", {"transmissao": "automatica", "combustivel": "flex"}),
+        ("toyota até 50.000 quilômetros rodados", {"marca": "Toyota"}),
+    ])
+    def test_mileage_is_not_price(self, user_input, expected):
+        analysis = IntentService.parse_local_query(user_input, ["Toyota"])
+        
+        assert analysis["filters"] == expected
+        assert analysis["intent"]["confidence"] < 0.8
+    
+    def test_model_infers_brand(self):
+        analysis = IntentService.parse_local_query("quero um civic", [])
+        
+        assert analysis["filters"] == {"marca": "Honda", "modelo": "Civic"}
+    
+    def test_conversation_has_zero_confidence(self):
+        analysis = IntentService.parse_local_query("oi, tudo bem?", ["Toyota"])
+        
+        assert analysis["filters"] == {}
+        assert analysis["intent"]["confidence"] == 0.0
+    
+    def test_unknown_words_lower_confidence(self):
+        analysis = IntentService.parse_local_query("civic ou corolla, qual é melhor?", [])
+        
+        assert analysis["intent"]["confidence"] < 0.8
+    
+    def test_car_number_request(self):
+        analysis = IntentService.parse_local_query("detalhes do carro 3", [])
+        
+        assert analysis["filters"]["car_number"] == 3
+        assert analysis["intent"]["confidence"] == 1.0
+    
+    def test_resolve_car_reference_against_last_shown_ids(self):
+        shown = [41, 7, 19]
+        
+        assert IntentService.resolve_car_reference("detalhes do carro 2", shown) == (2, 7)
+        assert IntentService.resolve_car_reference("me fala mais do terceiro", shown) == (3, 19)
+        assert IntentService.resolve_car_reference("quero ver o último", shown) == (3, 19)
+        assert IntentService.resolve_car_reference("detalhes do carro 9", shown) is None
+        assert IntentService.resolve_car_reference("meu primeiro carro", shown) is None
+        assert IntentService.resolve_car_reference("detalhes do carro 2", []) is None
+    
+    def test_new_searches_are_not_car_references(self):
+        shown = [41, 7, 19]
+        
+        for user_input in ("qual o último modelo da toyota?",
+                           "quero um civic da segunda geração",
+                           "mostre a primeira opção de sedan até 50 mil",
+                           "quero o carro 2 mais barato da honda"):
+            assert IntentService.resolve_car_reference(user_input, shown) is None, user_input
+        
+        assert IntentService.resolve_car_reference("qual a placa do segundo carro?", shown) == (2, 7)
@@ -0,0 +1,133 @@
+import pytest
+from presentation.mcp import CarMCPServer, CarMCPClient, MCPRequest
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def mcp_server(db_manager):
+    return CarMCPServer(db_manager)
+
+
+class TestCatalogContext:
+    async def test_single_call_returns_all_startup_payloads(self, mcp_server):
+        client = CarMCPClient(mcp_server)
+        
+        context = await client.get_catalog_context()
+        
+        assert context["statistics"]["total_carros"] == 8
+        assert context["brands"] == await client.get_available_brands()
+        assert context["price_range"] == await client.get_price_range()
+        assert context["year_range"] == await client.get_year_range()
+
+
+class TestCarsByIds:
+    async def test_details_for_several_cars(self, mcp_server):
+        client = CarMCPClient(mcp_server)
+        
+        result = await client.get_cars_by_ids([3, 1, 42])
+        
+        assert [car["id"] for car in result["carros"]] == [3, 1]
+        assert result["nao_encontrados"] == [42]
+    
+    async def test_ids_are_required(self, mcp_server):
+        client = CarMCPClient(mcp_server)
+        
+        with pytest.raises(Exception, match="car_ids"):
+            await client.get_cars_by_ids([])
+
+
+class TestBlockingWorkOffLoop:
+    async def test_slow_queries_do_not_block_event_loop(self, mcp_server, monkeypatch):
+        import asyncio
+        import time
+        from types import SimpleNamespace
+        
+        def slow_search(params):
+            time.sleep(0.2)
+            return SimpleNamespace(dict=lambda: {"total_encontrados": 0, "carros": []})
+        monkeypatch.setattr(mcp_server.car_repo, "search_cars_optimized", slow_search)
+        client = CarMCPClient(mcp_server)
+        
+        ticks = 0
+        async def ticker():
+            nonlocal ticks
+            for _ in range(10):
+                await asyncio.sleep(0.01)
+                ticks += 1
+        
+        start = time.perf_counter()
+        await asyncio.gather(*[client.search_cars({}) for _ in range(3)], ticker())
+        elapsed = time.perf_counter() - start
+        
+        assert ticks == 10
+        assert elapsed < 0.5
+    
+    async def test_concurrent_real_searches(self, mcp_server):
+        import asyncio
+        client = CarMCPClient(mcp_server)
+        
+        results = await asyncio.gather(*[client.search_cars({"marca": "Toyota"}) for _ in range(8)])
+        
+        assert all(result["total_encontrados"] == 2 for result in results)
+        await mcp_server.stop()
+
+
+class TestInMemoryDatabase:
+    async def test_pool_threads_share_the_database(self, sample_carros):
+        import asyncio
+        from infra.database.database import DatabaseManager
+        server = CarMCPServer(DatabaseManager(":memory:"))
+        await server.start()
+        try:
+            await server._run_blocking(server.db.insert_carros, sample_carros)
+            client = CarMCPClient(server)
+            
+            results = await asyncio.gather(*[client.search_cars({"marca": "Toyota"}) for _ in range(4)])
+        finally:
+            await server.stop()
+        
+        assert all(result["total_encontrados"] == 2 for result in results)
+
+
+class TestBatchRequests:
+    async def test_responses_match_request_ids(self, mcp_server):
+        client = CarMCPClient(mcp_server)
+        
+        responses = await client.batch([
+            MCPRequest(method="get_car_details", params={"car_id": 3}, id="x"),
+            MCPRequest(method="nao_existe", params={}, id="y"),
+            MCPRequest(method="search_cars", params={"marca": "Fiat"}),
+        ])
+        
+        assert [response.id for response in responses] == ["x", "y", None]
+        assert responses[0].result["id"] == 3
+        assert "Método não suportado" in responses[1].error
+        assert responses[2].result["total_encontrados"] == 1
+    
+    async def test_repeated_and_missing_ids_keep_their_positions(self, mcp_server):
+        client = CarMCPClient(mcp_server)
+        
+        responses = await client.batch([
+            MCPRequest(method="get_car_details", params={"car_id": 4}),
+            MCPRequest(method="get_car_details", params={"car_id": 1}, id="1"),
+            MCPRequest(method="get_car_details", params={"car_id": 2}, id="1"),
+        ])
+        
+        assert [response.result["id"] for response in responses] == [4, 1, 2]
+    
+    async def test_batch_uses_one_session(self, mcp_server, monkeypatch):
+        opened = []
+        original = mcp_server.db.get_read_session
+        def counting_get_session():
+            opened.append(1)
+            return original()
+        monkeypatch.setattr(mcp_server.db, "get_read_session", counting_get_session)
+        client = CarMCPClient(mcp_server)
+        
+        responses = await client.batch([
+            MCPRequest(method="get_car_details", params={"car_id": car_id}) for car_id in range(1, 6)
+        ])
+        
+        assert [response.result["id"] for response in responses] == [1, 2, 3, 4, 5]
+        assert len(opened) == 1
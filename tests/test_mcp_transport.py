@@ -0,0 +1,151 @@
+import asyncio
+import json
+import pytest
+import pytest_asyncio
+from presentation.mcp import (
+    CarMCPServer, CarMCPClient, MCPRequest, MCPBatchRequest, MCPConnection, MCPConnectionPool,
+    connect, serve_tcp, serve_unix
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest_asyncio.fixture
+async def tcp_url(db_manager):
+    server = CarMCPServer(db_manager)
+    listener = await serve_tcp(server, "127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    yield f"tcp://127.0.0.1:{port}"
+    listener.close()
+    await listener.wait_closed()
+    await server.stop()
+
+
+class TestJsonRpcTransport:
+    async def test_client_over_tcp(self, tcp_url):
+        connection = await connect(tcp_url)
+        client = CarMCPClient(connection)
+        
+        result = await client.search_cars({"marca": "Honda"})
+        
+        assert result["total_encontrados"] == 2
+        await connection.close()
+    
+    async def test_pipelined_requests_on_one_connection(self, tcp_url):
+        connection = await connect(tcp_url)
+        client = CarMCPClient(connection)
+        
+        results = await asyncio.gather(
+            client.search_cars({"marca": "Toyota"}),
+            client.get_year_range(),
+            client.search_cars({"marca": "Ford"}),
+            client.get_available_brands(),
+        )
+        
+        assert results[0]["total_encontrados"] == 2
+        assert results[1] == {"min": 2012, "max": 2024}
+        assert results[2]["total_encontrados"] == 2
+        assert "BYD" in results[3]["marcas"]
+        await connection.close()
+    
+    async def test_wire_format_is_jsonrpc(self, tcp_url):
+        host, port = tcp_url[len("tcp://"):].rsplit(":", 1)
+        reader, writer = await asyncio.open_connection(host, int(port))
+        
+        writer.write(b'{"jsonrpc": "2.0", "method": "get_year_range", "params": {}, "id": 7}\n')
+        writer.write(b'{"jsonrpc": "2.0", "method": "nao_existe", "id": 8}\n')
+        writer.write(b'isso nao e json\n')
+        await writer.drain()
+        replies = {}
+        for _ in range(3):
+            reply = json.loads(await reader.readline())
+            replies[reply["id"]] = reply
+        
+        assert replies[7] == {"jsonrpc": "2.0", "result": {"min": 2012, "max": 2024}, "id": 7}
+        assert "Método não suportado" in replies[8]["error"]["message"]
+        assert replies[8]["error"]["code"] == -32601
+        assert replies[None]["error"]["code"] == -32700
+        writer.close()
+    
+    async def test_batch_over_tcp(self, tcp_url):
+        connection = await connect(tcp_url)
+        client = CarMCPClient(connection)
+        
+        responses = await client.batch([
+            MCPRequest(method="get_car_details", params={"car_id": 2}, id="a"),
+            MCPRequest(method="get_car_details", params={"car_id": 999}, id="b"),
+            MCPRequest(method="get_year_range", params={}, id="c"),
+        ])
+        
+        assert [response.id for response in responses] == ["a", "b", "c"]
+        assert responses[0].result["id"] == 2
+        assert "não encontrado" in responses[1].error
+        assert responses[2].result == {"min": 2012, "max": 2024}
+        await connection.close()
+    
+    async def test_batch_wire_format(self, tcp_url):
+        host, port = tcp_url[len("tcp://"):].rsplit(":", 1)
+        reader, writer = await asyncio.open_connection(host, int(port))
+        
+        writer.write(json.dumps([
+            {"jsonrpc": "2.0", "method": "get_year_range", "params": {}, "id": 1},
+            {"jsonrpc": "2.0", "method": "get_price_range", "params": {}},
+            {"jsonrpc": "2.0", "id": 3},
+        ]).encode() + b"\n")
+        await writer.drain()
+        batch_reply = json.loads(await reader.readline())
+        writer.write(b"[]\n")
+        await writer.drain()
+        empty_reply = json.loads(await reader.readline())
+        
+        assert [reply["id"] for reply in batch_reply] == [1, 3]
+        assert batch_reply[0]["result"] == {"min": 2012, "max": 2024}
+        assert batch_reply[1]["error"]["code"] == -32600
+        assert empty_reply["error"]["code"] == -32600
+        writer.close()
+    
+    async def test_connection_pool_over_unix_socket(self, db_manager, tmp_path):
+        server = CarMCPServer(db_manager)
+        path = str(tmp_path / "mcp.sock")
+        listener = await serve_unix(server, path)
+        pool = MCPConnectionPool(f"unix://{path}", size=2)
+        await pool.start()
+        client = CarMCPClient(pool)
+        
+        results = await asyncio.gather(*[client.search_cars({"cor": "preto"}) for _ in range(6)])
+        
+        assert all(result["total_encontrados"] == 2 for result in results)
+        await pool.stop()
+        listener.close()
+        await listener.wait_closed()
+        await server.stop()
+    
+    async def test_stdio_server_process(self, db_manager, monkeypatch, tmp_path):
+        monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "carros.db"))
+        connection = await connect("stdio")
+        client = CarMCPClient(connection)
+        
+        result = await client.get_catalog_context()
+        
+        assert result["statistics"]["total_carros"] == 8
+        await connection.close()
+    
+    async def test_request_times_out_when_server_never_answers(self):
+        async def silent(reader, writer):
+            await reader.read()
+            writer.close()
+        
+        listener = await asyncio.start_server(silent, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        connection = MCPConnection(reader, writer, request_timeout=0.1)
+        
+        with pytest.raises(asyncio.TimeoutError):
+            await connection.handle_request(MCPRequest(method="get_year_range", params={}))
+        with pytest.raises(asyncio.TimeoutError):
+            await connection.handle_batch(MCPBatchRequest(requests=[MCPRequest(method="get_year_range", params={})]))
+        
+        assert connection._pending == {}
+        await connection.close()
+        listener.close()
+        await listener.wait_closed()
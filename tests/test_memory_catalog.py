@@ -0,0 +1,107 @@
+import pytest
+from infra.database.car_repository import CarRepository
+
+pytest.importorskip("numpy")
+
+FILTER_CASES = [
+    {},
+    {"marca": "toyota"},
+    {"marca": "Hon", "modelo": "civ"},
+    {"cor": "preto"},
+    {"texto": "ranger"},
+    {"texto": "toyota preto"},
+    {"combustivel": "Álcool"},
+    {"transmissao": "automático", "preco_max": 120000},
+    {"tipo_veiculo": "sedan"},
+    {"ano_min": 2016, "ano_max": 2021},
+    {"preco_min": 40000, "limit": 3, "offset": 1},
+    {"numero_portas": 4, "limit": 2, "offset": 7},
+]
+
+
+def _ids(response):
+    return [car.id for car in response.carros]
+
+
+class TestMemoryCatalog:
+    @pytest.mark.parametrize("filters", FILTER_CASES)
+    @pytest.mark.parametrize("order_by", [None, "preco_asc", "preco_desc", "quilometragem_asc", "ano_desc"])
+    def test_matches_sql_search(self, db_manager, filters, order_by):
+        sql = CarRepository(db_manager, engine="sql")
+        memory = CarRepository(db_manager, engine="memory")
+        params = {**filters, "order_by": order_by} if order_by else filters
+
+        expected = sql.search_cars_optimized(params)
+        result = memory.search_cars_optimized(params)
+
+        assert result.total_encontrados == expected.total_encontrados
+        assert _ids(result) == _ids(expected)
+        assert result.carros == expected.carros
+        assert result.next_cursor == expected.next_cursor
+
+    @pytest.mark.parametrize("order_by", [None, "preco_desc", "ano_desc"])
+    def test_cursor_pages_are_interchangeable_with_sql(self, db_manager, order_by):
+        sql = CarRepository(db_manager, engine="sql")
+        memory = CarRepository(db_manager, engine="memory")
+        params = {"order_by": order_by, "limit": 3}
+
+        seen, cursor, page_number = [], None, 0
+        while True:
+            repo = memory if page_number % 2 == 0 else sql
+            page = repo.search_cars_optimized({**params, "cursor": cursor} if cursor else params)
+            seen.extend(_ids(page))
+            cursor, page_number = page.next_cursor, page_number + 1
+            if not cursor:
+                break
+
+        assert seen == _ids(sql.search_cars_optimized({**params, "limit": 100}))
+
+    def test_kept_in_sync_on_insert_and_delete(self, db_manager, sample_carros):
+        memory = CarRepository(db_manager, engine="memory")
+        assert memory.search_cars_optimized({"marca": "toyota"}).total_encontrados == 2
+
+        novo = sample_carros[0]
+        novo.placa, novo.chassi, novo.cor = "MEM0A00", "MEMORY00000000001", "Verde"
+        db_manager.insert_carros([novo])
+        result = memory.search_cars_optimized({"marca": "toyota", "cor": "verde"})
+        assert _ids(result) == [9]
+
+        db_manager.delete_carros([9, 1])
+        assert memory.search_cars_optimized({"marca": "toyota"}).total_encontrados == 1
+
+    def test_own_inserts_are_appended_without_reload(self, db_manager, sample_carros, monkeypatch):
+        memory = CarRepository(db_manager, engine="memory")
+        memory.search_cars_optimized({})
+        reloads = []
+        original = db_manager.memory_catalog._reload
+        monkeypatch.setattr(db_manager.memory_catalog, "_reload", lambda: reloads.append(1) or original())
+
+        novo = sample_carros[0]
+        novo.placa, novo.chassi = "MEM0A00", "MEMORY00000000001"
+        db_manager.insert_carros([novo])
+
+        assert memory.search_cars_optimized({"marca": "toyota"}).total_encontrados == 3
+        assert reloads == []
+
+    def test_sees_writes_from_another_manager(self, db_manager, sample_carros):
+        from infra.database.database import DatabaseManager
+        memory = CarRepository(db_manager, engine="memory")
+        assert memory.search_cars_optimized({"marca": "toyota"}).total_encontrados == 2
+
+        other = DatabaseManager(db_manager.engine.url.database)
+        novo = sample_carros[0]
+        novo.placa, novo.chassi = "MEM0A00", "MEMORY00000000001"
+        other.insert_carros([novo])
+        other.update_carro(2, cor="Verde")
+
+        assert memory.search_cars_optimized({"marca": "toyota"}).total_encontrados == 3
+        assert _ids(memory.search_cars_optimized({"cor": "verde"})) == [2]
+
+    def test_falls_back_to_sql_without_numpy(self, db_manager, monkeypatch):
+        import infra.database.car_repository as car_repository
+        monkeypatch.setattr(car_repository, "numpy_available", lambda: False)
+
+        repo = CarRepository(db_manager, engine="memory")
+
+        assert db_manager.memory_catalog is None
+        assert repo.search_cars_optimized({"marca": "ford"}).total_encontrados == 2
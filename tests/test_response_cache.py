@@ -0,0 +1,60 @@
+import sqlite3
+from infra.shared import response_cache
+from infra.shared.response_cache import ResponseCache
+
+
+def _disk_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestResponseCache:
+    def test_lru_eviction_and_ttl(self):
+        cache = ResponseCache(max_size=2, ttl_seconds=60)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+        
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        
+        expired = ResponseCache(ttl_seconds=-1)
+        expired.set("a", "1")
+        assert expired.get("a") is None
+    
+    def test_sqlite_backing_store_survives_restart(self, tmp_path):
+        db_path = str(tmp_path / "cache.db")
+        ResponseCache(db_path=db_path).set("chave", "valor")
+        
+        assert ResponseCache(db_path=db_path).get("chave") == "valor"
+
+
+class TestPruning:
+    def test_expired_rows_are_removed_at_startup(self, tmp_path):
+        db_path = str(tmp_path / "cache.db")
+        expired = ResponseCache(ttl_seconds=-1, db_path=db_path)
+        expired.set("a", "1")
+        expired.set("b", "2")
+        assert _disk_rows(db_path) == 2
+        
+        restarted = ResponseCache(db_path=db_path)
+        restarted.set("c", "3")
+        
+        assert _disk_rows(db_path) == 1
+        assert restarted.get("c") == "3"
+    
+    def test_expired_rows_are_removed_periodically(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(response_cache, "PRUNE_EVERY_WRITES", 3)
+        db_path = str(tmp_path / "cache.db")
+        cache = ResponseCache(ttl_seconds=-1, db_path=db_path)
+        
+        cache.set("a", "1")
+        cache.set("b", "2")
+        assert _disk_rows(db_path) == 2
+        
+        cache.set("c", "3")
+        assert _disk_rows(db_path) == 0
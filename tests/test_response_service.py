@@ -0,0 +1,74 @@
+from infra.config.settings import settings
+from infra.shared.tokens import count_tokens
+from services.response_service import ResponseService, SUMMARY_FIELDS, DETAILED_FIELDS
+
+
+def make_cars(n):
+    return [{
+        "id": i, "marca": "Toyota", "modelo": "Corolla", "ano": 2020, "ano_modelo": 2021, "cor": "Preto",
+        "quilometragem": 45000 + i, "preco": 85000.0 + i, "combustivel": "flex", "transmissao": "automático",
+        "placa": f"ABC{i}D12", "numero_portas": 4, "motorizacao": "2.0", "tipo_veiculo": "sedan",
+        "chassi": f"9BWZZZ377VT{i:06d}", "data_cadastro": "2024-01-01T00:00:00",
+        "data_ultima_revisao": "2024-05-01T00:00:00"
+    } for i in range(1, n + 1)]
+
+
+def build(monkeypatch, user_input, results, compact=True):
+    monkeypatch.setattr(settings, "COMPACT_RESULTS_PROMPT", compact)
+    return ResponseService(None)._build_search_prompt(user_input, results)
+
+
+class TestCompactResultsPrompt:
+    def test_fields_follow_the_question(self):
+        assert ResponseService.select_fields("mostre carros toyota", detailed=False) == SUMMARY_FIELDS
+        assert ResponseService.select_fields("detalhes do carro 2", detailed=True) == DETAILED_FIELDS
+        assert ResponseService.select_fields("qual o motor e o câmbio?", detailed=True) == [
+            "marca", "modelo", "ano", "preco", "transmissao", "motorizacao"
+        ]
+        # "cor" não casa dentro de "corolla"
+        assert "cor" not in ResponseService.select_fields("placa do corolla", detailed=True)
+
+    def test_table_rows_keep_positions(self, monkeypatch):
+        results = {"total_encontrados": 1, "carros": make_cars(1), "posicoes": [3]}
+
+        prompt = build(monkeypatch, "qual a placa dele?", results)
+
+        assert "n;marca;modelo;ano;preco;placa\n3;Toyota;Corolla;2020;85001;ABC1D12" in prompt
+
+    def test_much_smaller_than_bullet_prompt(self, monkeypatch):
+        for user_input, results in (("carros toyota", {"total_encontrados": 30, "carros": make_cars(10)}),
+                                    ("detalhes dos carros", {"total_encontrados": 3, "carros": make_cars(3)})):
+            compact = build(monkeypatch, user_input, results)
+            legacy = build(monkeypatch, user_input, results, compact=False)
+
+            assert count_tokens(compact) < 0.7 * count_tokens(legacy)
+
+    def test_token_budget_drops_last_rows(self, monkeypatch):
+        monkeypatch.setattr(settings, "RESULTS_PROMPT_TOKEN_BUDGET", 150)
+        results = {"total_encontrados": 10, "carros": make_cars(10)}
+
+        prompt = build(monkeypatch, "listar todos os carros", results)
+
+        assert count_tokens(prompt) <= 150
+        assert "\n1;Toyota" in prompt and "\n10;Toyota" not in prompt
+        assert "carros similares" in prompt
+        shown = results["ids_exibidos"]
+        assert shown == list(range(1, len(shown) + 1)) and len(shown) < 10
+        assert f"\n{len(shown)};Toyota" in prompt and f"\n{len(shown) + 1};Toyota" not in prompt
+
+
+class TestShownIds:
+    def test_detailed_search_records_only_detailed_cars(self, monkeypatch):
+        for compact in (True, False):
+            results = {"total_encontrados": 8, "carros": make_cars(8)}
+
+            build(monkeypatch, "detalhes dos toyota", results, compact=compact)
+
+            assert results["ids_exibidos"] == [1, 2, 3, 4, 5]
+
+    def test_listing_records_displayed_cars(self, monkeypatch):
+        results = {"total_encontrados": 30, "carros": make_cars(12)}
+
+        build(monkeypatch, "carros toyota", results, compact=False)
+
+        assert results["ids_exibidos"] == list(range(1, 11))
@@ -0,0 +1,220 @@
+import asyncio
+import base64
+import json
+import os
+import struct
+import pytest
+import pytest_asyncio
+from agent_host import AgentHost
+from presentation.mcp import CarMCPServer
+from presentation.web.server import (
+    AgentWebServer, WS_TEXT, WS_PING, WS_PONG, WS_CLOSE, encode_frame, read_frame, websocket_accept_key
+)
+from tests.test_ai_service import make_service
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest_asyncio.fixture
+async def web(db_manager):
+    ai_service, _ = make_service("Claro, posso ajudar!", delay=0.05, max_concurrency=50)
+    host = AgentHost(server=CarMCPServer(db_manager), ai_service=ai_service)
+    await host.start()
+    listener = await AgentWebServer(host).serve("127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    yield host, port
+    listener.close()
+    await listener.wait_closed()
+    await host.stop()
+
+
+async def send_request(reader, writer, method, path, payload=None, headers=None):
+    body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+    lines = [f"{method} {path} HTTP/1.1", "Host: localhost", f"Content-Length: {len(body)}"]
+    lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    response_headers = {}
+    while True:
+        line = await reader.readline()
+        if line == b"\r\n":
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        response_headers[name.strip().lower()] = value.strip()
+
+    if response_headers.get("transfer-encoding") == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            chunk = await reader.readexactly(size + 2)
+            if size == 0:
+                break
+            chunks.append(chunk[:-2])
+        return status, response_headers, b"".join(chunks)
+    return status, response_headers, await reader.readexactly(int(response_headers.get("content-length", 0)))
+
+
+def parse_sse(body: bytes):
+    events = []
+    for block in body.decode("utf-8").strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((fields.get("event", "message"), json.loads(fields["data"])))
+    return events
+
+
+class TestHTTP:
+    async def test_keep_alive_session_and_message(self, web):
+        host, port = web
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+        # Todas as requisições na mesma conexão
+        status, headers, body = await send_request(reader, writer, "POST", "/sessions")
+        assert status == 201 and headers["connection"] == "keep-alive"
+        session_id = json.loads(body)["session_id"]
+
+        status, _, body = await send_request(reader, writer, "POST", f"/sessions/{session_id}/messages",
+                                             {"message": "olá"})
+        assert status == 200
+        assert json.loads(body)["response"] == "Claro, posso ajudar!"
+
+        status, _, body = await send_request(reader, writer, "GET", "/health")
+        assert json.loads(body) == {"status": "ok", "sessions": 1}
+
+        status, _, _ = await send_request(reader, writer, "POST", "/sessions", {"session_id": session_id})
+        assert status == 409
+        assert len(host.sessions[session_id].conversation_history) == 2
+
+        status, _, _ = await send_request(reader, writer, "DELETE", f"/sessions/{session_id}")
+        assert status == 204 and session_id not in host.sessions
+        writer.close()
+
+    async def test_streaming_response_as_server_sent_events(self, web):
+        host, port = web
+        session_id = host.open_session().session_id
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+        status, headers, body = await send_request(
+            reader, writer, "POST", f"/sessions/{session_id}/messages", {"message": "olá"},
+            headers={"Accept": "text/event-stream"}
+        )
+        events = parse_sse(body)
+
+        assert status == 200 and headers["content-type"].startswith("text/event-stream")
+        assert "".join(data["token"] for event, data in events if event == "message").strip() == "Claro, posso ajudar!"
+        assert events[-1] == ("done", {"session_id": session_id, "response": "Claro, posso ajudar!"})
+        writer.close()
+
+    async def test_errors(self, web):
+        _, port = web
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+        assert (await send_request(reader, writer, "GET", "/nada"))[0] == 404
+        assert (await send_request(reader, writer, "GET", "/sessions"))[0] == 405
+        assert (await send_request(reader, writer, "POST", "/sessions/xyz/messages", {"message": "oi"}))[0] == 404
+        assert (await send_request(reader, writer, "POST", "/sessions/xyz/messages", {}))[0] == 400
+
+        status, headers, _ = await send_request(reader, writer, "GET", "/health", headers={"Connection": "close"})
+        assert status == 200 and headers["connection"] == "close"
+        assert await reader.read() == b""
+        writer.close()
+
+    async def test_concurrent_sessions(self, web):
+        host, port = web
+
+        async def converse(i):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            _, _, body = await send_request(reader, writer, "POST", "/sessions")
+            session_id = json.loads(body)["session_id"]
+            _, _, body = await send_request(reader, writer, "POST", f"/sessions/{session_id}/messages",
+                                            {"message": f"cliente {i}"})
+            writer.close()
+            return session_id, json.loads(body)["response"]
+
+        results = await asyncio.gather(*[converse(i) for i in range(20)])
+
+        assert len({session_id for session_id, _ in results}) == 20
+        for i, (session_id, _) in enumerate(results):
+            assert host.sessions[session_id].conversation_history[0]["content"] == f"cliente {i}"
+
+
+async def open_websocket(port, query=""):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    key = base64.b64encode(os.urandom(16)).decode("ascii")
+    writer.write((f"GET /ws{query} HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\n"
+                  f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode())
+    await writer.drain()
+
+    assert b"101" in await reader.readline()
+    headers = {}
+    while (line := await reader.readline()) != b"\r\n":
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    assert headers["sec-websocket-accept"] == websocket_accept_key(key)
+    return reader, writer
+
+
+async def receive_json(reader):
+    _, opcode, payload = await read_frame(reader, 1 << 20)
+    assert opcode == WS_TEXT
+    return json.loads(payload)
+
+
+class TestWebSocket:
+    async def test_streams_tokens_and_keeps_session(self, web):
+        host, port = web
+        reader, writer = await open_websocket(port)
+        session_id = (await receive_json(reader))["session_id"]
+
+        for text in ("olá", json.dumps({"message": "quero um carro"})):
+            writer.write(encode_frame(WS_TEXT, text.encode("utf-8"), mask=True))
+            tokens = []
+            while (message := await receive_json(reader))["type"] == "token":
+                tokens.append(message["data"])
+            assert message == {"type": "done", "response": "Claro, posso ajudar!"}
+            assert "".join(tokens).strip() == "Claro, posso ajudar!"
+
+        assert len(host.sessions[session_id].conversation_history) == 4
+
+        writer.write(encode_frame(WS_PING, b"vivo", mask=True))
+        assert (await read_frame(reader, 1024))[1:] == (WS_PONG, b"vivo")
+
+        writer.write(encode_frame(WS_CLOSE, struct.pack("!H", 1000), mask=True))
+        assert (await read_frame(reader, 1024))[1] == WS_CLOSE
+        assert await reader.read() == b""
+        # Sessão aberta pela conexão é encerrada com ela
+        assert session_id not in host.sessions
+
+    async def test_errors_are_reported_per_message(self, web):
+        host, port = web
+        reader, writer = await open_websocket(port)
+        session_id = (await receive_json(reader))["session_id"]
+
+        async def fail(*args, **kwargs):
+            raise KeyError(f"Sessão não encontrada: {session_id}")
+
+        original, host.handle_message = host.handle_message, fail
+        writer.write(encode_frame(WS_TEXT, b"ola", mask=True))
+        assert (await receive_json(reader))["type"] == "error"
+
+        # O worker continua vivo para a próxima mensagem
+        host.handle_message = original
+        writer.write(encode_frame(WS_TEXT, b"ola", mask=True))
+        while (message := await receive_json(reader))["type"] == "token":
+            pass
+        assert message["type"] == "done"
+
+        writer.write(encode_frame(WS_TEXT, b"\xff\xfe", mask=True))
+        _, opcode, payload = await read_frame(reader, 1024)
+        assert opcode == WS_CLOSE and struct.unpack("!H", payload)[0] == 1007
+
+    async def test_reuses_existing_session(self, web):
+        host, port = web
+        session = host.open_session()
+        reader, writer = await open_websocket(port, f"?session_id={session.session_id}")
+
+        assert (await receive_json(reader))["session_id"] == session.session_id
+        writer.write(encode_frame(WS_CLOSE, mask=True))
+        await reader.read()
+        assert session.session_id in host.sessions